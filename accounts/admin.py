@@ -1,3 +1,48 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin
 
-# Register your models here.
+from .backends import invalidar_usuarios
+from .models import CustomUser, Departamento
+
+
+@admin.register(CustomUser)
+class CustomUserAdmin(UserAdmin):
+    # Campos propios de CustomUser en el formulario de edición y de alta
+    fieldsets = UserAdmin.fieldsets + (
+        ('Laboratorio', {'fields': ('department', 'job_position', 'phone')}),
+    )
+    add_fieldsets = UserAdmin.add_fieldsets + (
+        ('Laboratorio', {'fields': ('first_name', 'last_name', 'email', 'department', 'job_position', 'phone')}),
+    )
+
+    list_display = ('username', 'first_name', 'last_name', 'department', 'job_position', 'is_active', 'is_staff')
+    list_filter = ('department', 'is_active', 'is_staff', 'is_superuser')
+    # search_fields también lo usa el autocompletado del solicitante en SolicitudAdmin
+    search_fields = ('^username', '^first_name', '^last_name', '^email')
+    show_full_result_count = False
+    list_per_page = 50
+    actions = ('activar_usuarios', 'desactivar_usuarios')
+
+    @admin.action(description="Activar usuarios seleccionados", permissions=['change'])
+    def activar_usuarios(self, request, queryset):
+        ids = list(queryset.values_list('pk', flat=True))
+        actualizados = queryset.update(is_active=True)
+        # update() no emite post_save: se invalida aquí el usuario en caché
+        invalidar_usuarios(*ids)
+        self.message_user(request, f"{actualizados} usuario(s) activados.", messages.SUCCESS)
+
+    @admin.action(description="Desactivar usuarios seleccionados", permissions=['change'])
+    def desactivar_usuarios(self, request, queryset):
+        # No se puede desactivar la propia cuenta desde aquí
+        queryset = queryset.exclude(pk=request.user.pk)
+        ids = list(queryset.values_list('pk', flat=True))
+        actualizados = queryset.update(is_active=False)
+        invalidar_usuarios(*ids)
+        self.message_user(request, f"{actualizados} usuario(s) desactivados.", messages.SUCCESS)
+
+
+@admin.register(Departamento)
+class DepartamentoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'prefijo', 'color', 'acceso_total', 'activo')
+    list_filter = ('activo', 'acceso_total')
+    search_fields = ('nombre', 'prefijo')
@@ -0,0 +1,36 @@
+# accounts/backends.py
+"""
+Carga del usuario de la sesión desde la caché.
+
+AuthenticationMiddleware llama a ``get_user`` en cada petición autenticada;
+con ModelBackend eso es una consulta a accounts_customuser. Aquí el usuario
+(con department y job_position, que leen los permisos de todas las vistas)
+se guarda en la caché por USER_CACHE_SECONDS y se invalida desde
+accounts/signals.py al guardarlo o borrarlo, y desde las acciones masivas
+del admin.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def clave_usuario(user_id):
+    return f'accounts:usuario:{user_id}'
+
+
+def invalidar_usuarios(*user_ids):
+    cache.delete_many([clave_usuario(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        clave = clave_usuario(user_id)
+        user = cache.get(clave)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(clave, user, settings.USER_CACHE_SECONDS)
+        # Mismo criterio que ModelBackend (p. ej. is_active=False -> sin sesión)
+        return user if self.user_can_authenticate(user) else None
@@ -1,7 +1,7 @@
 # accounts/forms.py
 
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from .models import CustomUser
+from .models import CustomUser, Departamento
 
 class CustomUserCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
@@ -12,6 +12,7 @@ class CustomUserCreationForm(UserCreationForm):
     # AÑADE ESTE MÉTODO PARA APLICAR LOS ESTILOS
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.fields['department'].queryset = Departamento.objects.para_elegir()
         for field_name, field in self.fields.items():
             # Agrega la clase 'form-control' a todos los campos
             field.widget.attrs['class'] = 'form-control'
@@ -0,0 +1,105 @@
+import accounts.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Los departamentos que estaban fijos en el código (choices y prefijos de
+# Solicitud.generar_codigo_referencia, colores del listado)
+DEPARTAMENTOS = [
+    # nombre, prefijo, color, acceso_total
+    ('Química', 'Q', '#0fa999', False),
+    ('Microbiología', 'M', '#800080', False),
+    ('Dirección', 'D', '#FF8C00', True),
+    ('Proyecto de equipamiento', 'PE', '', False),
+]
+
+
+def departamento_para(Departamento, db, nombre):
+    """Departamento con ese nombre; si no es uno de los conocidos se crea con prefijo GEN."""
+    departamento = Departamento.objects.using(db).filter(nombre=nombre).first()
+    if departamento is None:
+        prefijo, n = 'GEN', 1
+        while Departamento.objects.using(db).filter(prefijo=prefijo).exists():
+            n += 1
+            prefijo = f'GEN{n}'
+        departamento = Departamento.objects.using(db).create(nombre=nombre, prefijo=prefijo, activo=False)
+    return departamento
+
+
+def crear_departamentos(apps, schema_editor):
+    Departamento = apps.get_model('accounts', 'Departamento')
+    db = schema_editor.connection.alias
+    for nombre, prefijo, color, acceso_total in DEPARTAMENTOS:
+        Departamento.objects.using(db).create(nombre=nombre, prefijo=prefijo, color=color, acceso_total=acceso_total)
+
+
+def asignar_departamentos(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Departamento = apps.get_model('accounts', 'Departamento')
+    db = schema_editor.connection.alias
+    nombres = CustomUser.objects.using(db).values_list('department', flat=True).distinct().order_by()
+    for nombre in list(nombres):
+        departamento = departamento_para(Departamento, db, nombre)
+        CustomUser.objects.using(db).filter(department=nombre).update(departamento_nuevo=departamento.pk)
+
+
+def restaurar_nombres(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Departamento = apps.get_model('accounts', 'Departamento')
+    db = schema_editor.connection.alias
+    for departamento in Departamento.objects.using(db):
+        CustomUser.objects.using(db).filter(departamento_nuevo=departamento.pk).update(department=departamento.nombre)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_customuser_department_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Departamento',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('prefijo', models.CharField(help_text='Prefijo de la referencia de sus solicitudes (Ej: M en M-01-2025)', max_length=5, unique=True)),
+                ('color', models.CharField(blank=True, help_text='Color de la referencia en el listado, en hexadecimal (Ej: #800080)', max_length=7)),
+                ('acceso_total', models.BooleanField(default=False, help_text='Sus usuarios ven las solicitudes de todos los departamentos')),
+                ('activo', models.BooleanField(default=True, help_text='Si se ofrece al crear usuarios y solicitudes')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Departamento',
+                'verbose_name_plural': 'Departamentos',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.RunPython(crear_departamentos, migrations.RunPython.noop),
+        # El texto pasa a una FK smallint: columna nueva, copia, y se reemplaza la vieja
+        migrations.AddField(
+            model_name='customuser',
+            name='departamento_nuevo',
+            field=accounts.models.DepartamentoField(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.departamento'),
+        ),
+        migrations.RunPython(asignar_departamentos, restaurar_nombres),
+        # Con default, para que al revertir se pueda volver a agregar la columna de texto
+        migrations.AlterField(
+            model_name='customuser',
+            name='department',
+            field=models.CharField(default='', max_length=50, verbose_name='Departamento'),
+        ),
+        migrations.RemoveField(
+            model_name='customuser',
+            name='department',
+        ),
+        migrations.RenameField(
+            model_name='customuser',
+            old_name='departamento_nuevo',
+            new_name='department',
+        ),
+        migrations.AlterField(
+            model_name='customuser',
+            name='department',
+            field=accounts.models.DepartamentoField(on_delete=django.db.models.deletion.PROTECT, related_name='usuarios', to='accounts.departamento', verbose_name='Departamento'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Las sesiones guardan la ruta del backend que autenticó al usuario y Django
+# solo la acepta si sigue en AUTHENTICATION_BACKENDS. Sin esto, todas las
+# sesiones abiertas antes de usar accounts.backends.CachedModelBackend
+# quedarían cerradas al desplegar.
+ANTERIOR = 'django.contrib.auth.backends.ModelBackend'
+NUEVO = 'accounts.backends.CachedModelBackend'
+
+
+def _cambiar_backend(apps, schema_editor, desde, hacia):
+    from django.contrib.sessions.backends.db import SessionStore
+
+    Session = apps.get_model('sessions', 'Session')
+    db = schema_editor.connection.alias
+    store = SessionStore()
+    for sesion in Session.objects.using(db).iterator():
+        datos = store.decode(sesion.session_data)
+        if datos.get('_auth_user_backend') == desde:
+            datos['_auth_user_backend'] = hacia
+            sesion.session_data = store.encode(datos)
+            sesion.save(update_fields=['session_data'])
+
+
+def a_cacheado(apps, schema_editor):
+    _cambiar_backend(apps, schema_editor, ANTERIOR, NUEVO)
+
+
+def a_model_backend(apps, schema_editor):
+    _cambiar_backend(apps, schema_editor, NUEVO, ANTERIOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_departamento'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(a_cacheado, a_model_backend),
+    ]
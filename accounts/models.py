@@ -1,18 +1,115 @@
+import time
+
+from django.conf import settings
 from django.db import models
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
 from django.contrib.auth.models import AbstractUser
+
+
+class DepartamentoManager(models.Manager):
+    """
+    Los departamentos son pocos y casi nunca cambian: se leen una vez y se
+    guardan en memoria del proceso. La copia se descarta al guardar o borrar
+    un departamento en este proceso, cuando pasa DEPARTAMENTOS_CACHE_SECONDS
+    (cambios hechos desde otro worker) o cuando se pide un id que no está
+    (departamento recién creado).
+    """
+    _en_memoria = None
+    _cargado = 0.0
+
+    def en_memoria(self, recargar=False):
+        """{id: Departamento} de todos los departamentos."""
+        vencido = time.monotonic() - DepartamentoManager._cargado > settings.DEPARTAMENTOS_CACHE_SECONDS
+        if recargar or vencido or DepartamentoManager._en_memoria is None:
+            DepartamentoManager._en_memoria = {d.pk: d for d in self.get_queryset()}
+            DepartamentoManager._cargado = time.monotonic()
+        return DepartamentoManager._en_memoria
+
+    def por_id(self, pk):
+        if pk is None:
+            return None
+        departamento = self.en_memoria().get(pk)
+        if departamento is None:
+            departamento = self.en_memoria(recargar=True).get(pk)
+        return departamento
+
+    def para_elegir(self, actual=None):
+        """Departamentos que ofrecen los formularios: los activos y el ya asignado."""
+        return self.filter(models.Q(activo=True) | models.Q(pk=actual))
+
+    def limpiar_memoria(self):
+        DepartamentoManager._en_memoria = None
+
+
+class Departamento(models.Model):
+    """
+    Departamento o laboratorio. Lo referencian el usuario y la solicitud;
+    se agrega uno nuevo desde el admin, sin cambiar código.
+    """
+    id = models.SmallAutoField(primary_key=True)
+    nombre = models.CharField(max_length=50, unique=True)
+    prefijo = models.CharField(
+        max_length=5,
+        unique=True,
+        help_text="Prefijo de la referencia de sus solicitudes (Ej: M en M-01-2025)"
+    )
+    color = models.CharField(
+        max_length=7,
+        blank=True,
+        help_text="Color de la referencia en el listado, en hexadecimal (Ej: #800080)"
+    )
+    acceso_total = models.BooleanField(
+        default=False,
+        help_text="Sus usuarios ven las solicitudes de todos los departamentos"
+    )
+    activo = models.BooleanField(
+        default=True,
+        help_text="Si se ofrece al crear usuarios y solicitudes"
+    )
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = DepartamentoManager()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Departamento.objects.limpiar_memoria()
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        Departamento.objects.limpiar_memoria()
+        return resultado
+
+    def __str__(self):
+        return self.nombre
+
+    class Meta:
+        verbose_name = "Departamento"
+        verbose_name_plural = "Departamentos"
+        ordering = ['nombre']
+
+
+class DepartamentoDescriptor(ForwardManyToOneDescriptor):
+    """``objeto.departamento`` sale de la copia en memoria, sin consulta."""
+
+    def get_object(self, instance):
+        departamento = Departamento.objects.por_id(getattr(instance, self.field.attname))
+        if departamento is None:
+            return super().get_object(instance)
+        return departamento
+
+
+class DepartamentoField(models.ForeignKey):
+    """FK a Departamento (smallint) que resuelve el objeto con DepartamentoManager.por_id."""
+    forward_related_accessor_class = DepartamentoDescriptor
+
+    def __init__(self, to='accounts.Departamento', **kwargs):
+        kwargs.setdefault('on_delete', models.PROTECT)
+        super().__init__(to, **kwargs)
+
+
 # Create your models here.
 class CustomUser(AbstractUser):
-    # Opciones para el menú desplegable (ComboBox)
-    DEPARTAMENTO_CHOICES = [
-        ('Química', 'Química'),
-        ('Microbiología', 'Microbiología'),
-        ('Dirección', 'Dirección'),
-        ('Proyecto de equipamiento', 'Proyecto de equipamiento'),
-        # Puedes agregar más si es necesario
-    ]
-
-    # Añadimos el atributo 'choices' al campo department
-    department = models.CharField(max_length=50, blank=False, choices=DEPARTAMENTO_CHOICES,verbose_name="Departamento")
+    department = DepartamentoField(related_name='usuarios', verbose_name="Departamento")
     job_position = models.CharField(max_length=80, blank=True,verbose_name="Posición o cargo de trabajo")
     phone = models.CharField(max_length=25, blank=True,verbose_name="Teléfono")
-    REQUIRED_FIELDS = ["first_name","last_name","department"]
\ No newline at end of file
+    REQUIRED_FIELDS = ["first_name","last_name","department"]
@@ -0,0 +1,19 @@
+# accounts/signals.py
+"""Invalida el usuario guardado en la caché (ver backends.py) cuando cambia."""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidar_usuarios
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='usuario_cache_guardado')
+@receiver(post_delete, sender=CustomUser, dispatch_uid='usuario_cache_borrado')
+def usuario_cambiado(sender, instance, using=None, **kwargs):
+    # Perfil, contraseña (set_password + save), is_active, last_login...
+    # Después del commit: si se invalidara antes, otra petición podría volver
+    # a guardar en la caché la fila todavía sin cambios.
+    transaction.on_commit(partial(invalidar_usuarios, instance.pk), using=using)
@@ -0,0 +1,25 @@
+# accounts/tasks.py
+"""
+Tareas en segundo plano de cuentas (se ejecutan con run_workers).
+Ver jobs/registry.py para cómo se registran.
+"""
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+from jobs.registry import tarea
+
+
+@tarea('limpiar_sesiones', descripcion='Borrado de sesiones vencidas')
+def limpiar_sesiones(job):
+    """
+    Borra de django_session las sesiones vencidas (en la caché vencen solas).
+
+    parametros: {'repetir_horas': N} -> se vuelve a encolar para dentro de N
+    horas (Job.reprogramar), así que basta encolarla una vez:
+
+        python manage.py encolar_tarea limpiar_sesiones --parametros '{"repetir_horas": 24}'
+    """
+    borradas = Session.objects.filter(expire_date__lt=timezone.now()).delete()[0]
+    job.mensaje_progreso = f"{borradas} sesiones vencidas borradas"
+
+    job.reprogramar()
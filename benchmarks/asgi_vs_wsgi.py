@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Benchmark: despliegue WSGI (gthread) frente a ASGI (vistas async).
+
+Arranca gunicorn dos veces con gunicorn.conf.py y la misma cantidad de
+workers, una con lraa_project.wsgi (gthread) y otra con lraa_project.asgi
+(uvicorn_worker.UvicornWorker). En cada una mide el listado mientras otros
+clientes descargan exportaciones lentas en bucle, que es el caso que
+queremos mejorar: que una exportación no deje esperando a los demás.
+
+    python benchmarks/asgi_vs_wsgi.py --login usuario:clave --workers 2 \\
+        --slow-path "/reportes/exportar/" --slow-clients 4 --duration 20
+
+Usa la base de datos configurada por las variables de entorno habituales
+(DB_HOST, DB_LOCAL_SQLITE=1, ...), que debe tener datos y el usuario creado.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from http_load import crear_opener, imprimir, medir  # noqa: E402
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+DESPLIEGUES = [
+    ('WSGI (gthread)', 'lraa_project.wsgi:application', {'GUNICORN_WORKER_CLASS': 'gthread'}),
+    ('ASGI (uvicorn)', 'lraa_project.asgi:application', {'GUNICORN_WORKER_CLASS': 'uvicorn_worker.UvicornWorker'}),
+]
+
+
+def esperar_servidor(url, segundos=30):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return
+        except OSError:
+            time.sleep(0.3)
+    raise SystemExit(f'El servidor no respondió en {url}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--login', required=True, help='usuario:clave')
+    parser.add_argument('--port', type=int, default=8059)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--path', action='append', help='Rutas rápidas a medir. Default: /')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--slow-path', default='/reportes/exportar/')
+    parser.add_argument('--slow-clients', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=20)
+    args = parser.parse_args()
+
+    base_url = f'http://127.0.0.1:{args.port}'
+    for nombre, aplicacion, entorno in DESPLIEGUES:
+        servidor = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', aplicacion],
+            cwd=BASE_DIR,
+            env={
+                **os.environ,
+                **entorno,
+                'GUNICORN_BIND': f'127.0.0.1:{args.port}',
+                'GUNICORN_WORKERS': str(args.workers),
+                'GUNICORN_LOGLEVEL': 'warning',
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            esperar_servidor(base_url + '/accounts/login/')
+            opener = crear_opener(base_url, args.login)
+            latencias, errores = medir(
+                base_url, opener, args.path or ['/'], args.concurrency, args.duration,
+                args.slow_path, args.slow_clients,
+            )
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+        print(f'\n== {nombre}: {args.workers} workers ==')
+        imprimir(latencias, errores, args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Benchmark: latencia por petición según la estrategia de conexión a la BD.
+
+Simula el ciclo de una petición de Django (señales request_started /
+request_finished, que es donde Django abre y cierra conexiones) con una
+consulta trivial, desde varios hilos a la vez, y compara:
+
+  * nueva      -> DB_CONN_MAX_AGE=0            (una conexión nueva por petición)
+  * persistente-> DB_CONN_MAX_AGE=60           (una conexión por hilo, reutilizada)
+  * pool       -> DB_CONN_MAX_AGE=0 DB_POOL=1  (conexiones recicladas del pool)
+
+Cada escenario corre en un subproceso propio porque la configuración se lee
+de variables de entorno al cargar settings.py.
+
+Uso contra el MariaDB del docker-compose:
+    docker compose up -d db
+    DB_HOST=127.0.0.1 DB_USER=lraa_ssbs DB_PASSWORD=lraa1928 \\
+        python benchmarks/db_connection_latency.py --threads 8 --requests 200
+
+Uso con SQLite (sin el escenario de pool, que es solo para MySQL):
+    DB_LOCAL_SQLITE=1 python benchmarks/db_connection_latency.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+ESCENARIOS = [
+    ('nueva', {'DB_CONN_MAX_AGE': '0', 'DB_POOL': '0'}),
+    ('persistente', {'DB_CONN_MAX_AGE': '60', 'DB_POOL': '0'}),
+    ('pool', {'DB_CONN_MAX_AGE': '0', 'DB_POOL': '1'}),
+]
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    indice = min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))
+    return valores[indice]
+
+
+def ejecutar_worker(hilos, peticiones):
+    """Se ejecuta dentro del subproceso: mide e imprime un JSON con los resultados."""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lraa_project.settings')
+    import django
+    django.setup()
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+
+    latencias = []
+    lock = threading.Lock()
+
+    def cliente():
+        propias = []
+        for _ in range(peticiones):
+            inicio = time.perf_counter()
+            request_started.send(sender=None)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            request_finished.send(sender=None)
+            propias.append((time.perf_counter() - inicio) * 1000)
+        connection.close()
+        with lock:
+            latencias.extend(propias)
+
+    inicio_total = time.perf_counter()
+    threads = [threading.Thread(target=cliente) for _ in range(hilos)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracion = time.perf_counter() - inicio_total
+
+    print(json.dumps({
+        'peticiones': len(latencias),
+        'req_s': len(latencias) / duracion,
+        'media_ms': statistics.mean(latencias),
+        'p50_ms': percentil(latencias, 50),
+        'p95_ms': percentil(latencias, 95),
+        'p99_ms': percentil(latencias, 99),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8, help='Clientes concurrentes (default: 8)')
+    parser.add_argument('--requests', type=int, default=200, help='Peticiones por cliente (default: 200)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        ejecutar_worker(args.threads, args.requests)
+        return
+
+    print(f"{'escenario':<12} {'req/s':>9} {'media':>9} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)")
+    for nombre, entorno in ESCENARIOS:
+        if nombre == 'pool' and os.environ.get('DB_LOCAL_SQLITE'):
+            continue
+        resultado = subprocess.run(
+            [sys.executable, __file__, '--worker', '--threads', str(args.threads), '--requests', str(args.requests)],
+            env={**os.environ, **entorno},
+            capture_output=True,
+            text=True,
+        )
+        if resultado.returncode != 0:
+            print(f'{nombre:<12} ERROR\n{resultado.stderr}')
+            continue
+        r = json.loads(resultado.stdout.strip().splitlines()[-1])
+        print(f"{nombre:<12} {r['req_s']:>9.1f} {r['media_ms']:>9.2f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Prueba de carga HTTP sencilla (solo librería estándar).
+
+Lanza clientes concurrentes contra las rutas indicadas durante un tiempo fijo
+y muestra, por ruta, throughput y latencias. Con --slow-path se añaden
+clientes que piden algo lento (p. ej. el reporte completo para imprimir)
+para ver cuánto afecta al resto de usuarios.
+
+Comparar el arranque anterior con el perfil de gunicorn.conf.py:
+
+    # A) sync, 3 workers (configuración anterior)
+    gunicorn lraa_project.wsgi:application --bind 0.0.0.0:8058 --workers 3
+    # B) perfil ajustado
+    gunicorn -c gunicorn.conf.py lraa_project.wsgi:application
+
+    python benchmarks/http_load.py --login usuario:clave \\
+        --path / --path /reportes/ \\
+        --slow-path "/reportes/?print=1" --slow-clients 3 \\
+        --concurrency 12 --duration 30
+"""
+import argparse
+import http.cookiejar
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    indice = min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))
+    return valores[indice]
+
+
+def crear_opener(base_url, login):
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    if not login:
+        return opener
+
+    usuario, clave = login.split(':', 1)
+    url_login = urllib.parse.urljoin(base_url, '/accounts/login/')
+    html = opener.open(url_login).read().decode('utf-8', 'replace')
+    token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html)
+    datos = urllib.parse.urlencode({
+        'username': usuario,
+        'password': clave,
+        'csrfmiddlewaretoken': token.group(1) if token else '',
+    }).encode()
+    peticion = urllib.request.Request(url_login, data=datos, headers={'Referer': url_login})
+    opener.open(peticion).read()
+    if not any(c.name == 'sessionid' for c in jar):
+        raise SystemExit('No se pudo iniciar sesión: revise usuario y clave.')
+    return opener
+
+
+def medir(base_url, opener, rutas, concurrency, duracion, slow_path=None, slow_clients=0):
+    """Ejecuta la carga y devuelve ({ruta: [latencias_ms]}, {ruta: errores})."""
+    latencias = defaultdict(list)
+    errores = defaultdict(int)
+    lock = threading.Lock()
+    fin = time.monotonic() + duracion
+
+    def cliente(indice, lista_rutas):
+        i = indice
+        while time.monotonic() < fin:
+            ruta = lista_rutas[i % len(lista_rutas)]
+            i += 1
+            inicio = time.perf_counter()
+            try:
+                with opener.open(urllib.parse.urljoin(base_url, ruta), timeout=120) as respuesta:
+                    respuesta.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            ms = (time.perf_counter() - inicio) * 1000
+            with lock:
+                if ok:
+                    latencias[ruta].append(ms)
+                else:
+                    errores[ruta] += 1
+
+    hilos = [threading.Thread(target=cliente, args=(n, rutas)) for n in range(concurrency)]
+    if slow_path:
+        hilos += [threading.Thread(target=cliente, args=(0, [slow_path])) for _ in range(slow_clients)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return latencias, errores
+
+
+def imprimir(latencias, errores, duracion):
+    print(f"{'ruta':<32} {'n':>6} {'req/s':>8} {'media':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errores':>8}  (ms)")
+    for ruta in sorted(set(latencias) | set(errores)):
+        valores = latencias[ruta]
+        if not valores:
+            print(f'{ruta:<32} {0:>6} {"-":>8} {"-":>9} {"-":>9} {"-":>9} {"-":>9} {errores[ruta]:>8}')
+            continue
+        print(
+            f'{ruta:<32} {len(valores):>6} {len(valores) / duracion:>8.1f} '
+            f'{statistics.mean(valores):>9.1f} {percentil(valores, 50):>9.1f} '
+            f'{percentil(valores, 95):>9.1f} {percentil(valores, 99):>9.1f} {errores[ruta]:>8}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8058')
+    parser.add_argument('--login', help='usuario:clave para las rutas que requieren sesión')
+    parser.add_argument('--path', action='append', help='Ruta a medir (se puede repetir). Default: /')
+    parser.add_argument('--concurrency', type=int, default=10, help='Clientes para --path (default: 10)')
+    parser.add_argument('--slow-path', help='Ruta lenta pedida en bucle por --slow-clients clientes')
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--duration', type=float, default=20, help='Segundos de prueba (default: 20)')
+    args = parser.parse_args()
+
+    opener = crear_opener(args.base_url, args.login)
+    latencias, errores = medir(
+        args.base_url, opener, args.path or ['/'], args.concurrency, args.duration,
+        args.slow_path, args.slow_clients,
+    )
+    imprimir(latencias, errores, args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Benchmark: tiempo de render del listado y del reporte con el motor de
+plantillas de Django y con Jinja2 (solicitudes/jinja2/, ver
+lraa_project/jinja2.py).
+
+Renderiza la página completa de cada uno con 10, 100 y 5.000 filas por
+página, con objetos armados en memoria (sin consultas: solo se mide la
+plantilla), y comprueba antes que los dos motores producen el mismo HTML
+(sin contar espacios entre etiquetas ni el token CSRF, que cambia en cada
+render). Las filas del listado se renderizan todas, sin la caché de
+fragmentos.py: es el costo de una página cuyas filas acaban de cambiar.
+
+Si Jinja2 resulta más rápido, se cambia con LRAA_PLANTILLAS_MOTOR=jinja2.
+
+Uso:
+    python benchmarks/template_render.py
+    python benchmarks/template_render.py --filas 10 100 5000 --repeticiones 10
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+MOTORES = ('django', 'jinja2')
+PLANTILLAS = (
+    ('listado', 'solicitudes/solicitud_list.html'),
+    ('reporte', 'solicitudes/seguimiento_report.html'),
+)
+
+
+def preparar_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lraa_project.settings')
+    # No se consulta la base de datos; SQLite evita depender del servidor
+    os.environ.setdefault('DB_LOCAL_SQLITE', '1')
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.test.utils import override_settings
+    override_settings(
+        # Sin la caché de filas de fragmentos.py
+        CACHES={
+            alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in ('default', 'fragmentos')
+        },
+        # Sin el manifiesto de collectstatic; static() cuesta lo mismo en los dos motores
+        STORAGES={**settings.STORAGES, 'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+        }},
+    ).enable()
+
+
+def armar_filas(cantidad):
+    """``cantidad`` solicitudes con su seguimiento, sin guardar."""
+    from accounts.models import Departamento
+    from solicitudes.models import SeguimientoCompra, Solicitud
+
+    departamentos = [
+        Departamento(pk=1, nombre='Química', prefijo='Q', color='#800080'),
+        Departamento(pk=2, nombre='Microbiología', prefijo='M', color=''),
+    ]
+    seguimientos = []
+    for i in range(1, cantidad + 1):
+        solicitud = Solicitud(
+            pk=i,
+            departamento=departamentos[i % 2],
+            solicitante_id=i % 3 + 1,
+            ref_departamento=f"{departamentos[i % 2].prefijo}-{i:02d}-2026",
+            descripcion_pedido=f"Reactivo <grado analítico> de O'Brien & Hijos, lote {i} " + 'x' * (i % 40),
+            monto_comprometido_sbs=Decimal(1234567 + i),
+        )
+        seguimiento = SeguimientoCompra(
+            pk=i,
+            solicitud=solicitud,
+            sbs_numero=f"{i:03d}-2026" if i % 5 else '',
+            oc_numero=f"4200{i}" if i % 3 else '',
+            proveedor="Proveedor & Cía." if i % 4 else '',
+            monto_oc=Decimal(i * 1234.5).quantize(Decimal('0.01')) if i % 6 else None,
+            tipo_entrega='Total' if i % 2 else 'Parcial',
+            condicion='recorrido,evaluado' if i % 2 else '',
+        )
+        # Anotación de queries.seguimientos_reporte (archivo.py)
+        seguimiento.archivado = i % 10 == 0
+        solicitud.seguimiento = seguimiento
+        seguimientos.append(seguimiento)
+    return seguimientos
+
+
+def armar_contexto(seguimientos):
+    from django.contrib.auth import get_user_model
+    from django.core.paginator import Paginator
+    from django.test import RequestFactory
+
+    from solicitudes.forms import SeguimientoFilterForm
+
+    request = RequestFactory().get('/', {'q': 'reactivo', 'orden': '-monto_oc', 'page': '2'})
+    request.user = get_user_model()(
+        pk=1, username='benchmark', job_position='Asistente Administrativo',
+        department=seguimientos[0].solicitud.departamento,
+    )
+    # Página intermedia: el paginador muestra todos los enlaces
+    page_obj = Paginator(range(len(seguimientos) * 3), len(seguimientos)).page(2)
+    solicitudes = [seguimiento.solicitud for seguimiento in seguimientos]
+    return request, {
+        'solicitudes': solicitudes,
+        'seguimientos': seguimientos,
+        'object_list': seguimientos,
+        'page_obj': page_obj,
+        'paginator': page_obj.paginator,
+        'is_paginated': True,
+        'filter_form': SeguimientoFilterForm(request.GET),
+        'predefinidos': [],
+        'total_monto_oc': sum(seguimiento.monto_oc or 0 for seguimiento in seguimientos),
+    }
+
+
+def normalizar(html):
+    html = re.sub(r'name="csrfmiddlewaretoken" value="[^"]+"', '', html)
+    return re.sub(r'\s+', ' ', re.sub(r'>\s+<', '><', html)).strip()
+
+
+def medir(plantilla, contexto, request, repeticiones):
+    """Milisegundos de cada render."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        plantilla.render(contexto, request)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[10, 100, 5000])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    preparar_django()
+    from django.template.loader import get_template
+
+    print(f"{'filas':>6} {'plantilla':<10} {'django (ms)':>12} {'jinja2 (ms)':>12} {'aceleración':>12}")
+    for cantidad in args.filas:
+        request, contexto = armar_contexto(armar_filas(cantidad))
+        for nombre, plantilla in PLANTILLAS:
+            plantillas = {motor: get_template(plantilla, using=motor) for motor in MOTORES}
+            # Un primer render (compila la plantilla) que además compara las salidas
+            salidas = {motor: normalizar(plantillas[motor].render(contexto, request)) for motor in MOTORES}
+            if salidas['django'] != salidas['jinja2']:
+                sys.exit(f"{nombre}, {cantidad} filas: los motores no producen el mismo HTML")
+
+            medianas = {
+                motor: statistics.median(medir(plantillas[motor], contexto, request, args.repeticiones))
+                for motor in MOTORES
+            }
+            print(
+                f"{cantidad:>6} {nombre:<10} {medianas['django']:>12.2f} {medianas['jinja2']:>12.2f} "
+                f"{medianas['django'] / medianas['jinja2']:>11.2f}x"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# gunicorn.conf.py
+"""
+Perfil de ejecución de gunicorn para Producción.
+
+    gunicorn -c gunicorn.conf.py lraa_project.wsgi:application
+
+Cada valor se puede ajustar por variable de entorno (GUNICORN_*).
+"""
+import multiprocessing
+import os
+
+# --- Red ---
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8058')
+
+# --- Workers ---
+# gthread: cada proceso atiende varias peticiones a la vez con hilos, así una
+# impresión de reporte lenta ocupa un hilo y no el worker completo. Los
+# hilos también comparten la conexión persistente/pool de la BD del proceso.
+# Cada conexión de actualizaciones en vivo abierta ocupa un hilo (hasta
+# LIVE_UPDATES_CONEXIONES_WSGI por proceso, ver settings.py).
+#
+# ASGI (vistas async de solicitudes/async_views.py) con el mismo perfil:
+#   GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker \
+#       gunicorn -c gunicorn.conf.py lraa_project.asgi:application
+# En ese modo cada worker es un event loop y `threads` no se usa.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 9)))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Carga Django una vez en el proceso maestro antes de hacer fork: los workers
+# comparten esa memoria (copy-on-write) y arrancan más rápido.
+preload_app = True
+
+# Reciclar cada worker tras N peticiones (con jitter para que no se
+# reinicien todos a la vez) limita el crecimiento de memoria a largo plazo.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# --- Tiempos ---
+# timeout: un worker sin responder este tiempo se reinicia (el reporte
+# completo para imprimir es la petición más lenta).
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Detrás del proxy inverso (Traefik) las conexiones se reutilizan. El
+# keep-alive debe ser MAYOR que el idle timeout del proxy hacia el backend
+# (90 s por defecto en Traefik); si gunicorn cierra primero, el proxy puede
+# enviar una petición a un socket ya cerrado y devolver un 502.
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 95))
+
+# --- Proxy ---
+# Confiar en X-Forwarded-* del proxy (settings.SECURE_PROXY_SSL_HEADER).
+forwarded_allow_ips = os.environ.get('GUNICORN_FORWARDED_ALLOW_IPS', '*')
+
+# Heartbeat de los workers en memoria: en Docker /tmp puede estar en un
+# overlay lento y provocar timeouts falsos.
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# --- Logs ---
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def pre_fork(server, worker):
+    # Con preload_app el maestro importa Django; si algo abrió una conexión a
+    # la BD durante la carga, se cierra antes del fork para que ningún
+    # worker herede (y comparta) ese socket.
+    from django.db import connections
+    connections.close_all()
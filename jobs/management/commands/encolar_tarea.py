@@ -0,0 +1,27 @@
+# jobs/management/commands/encolar_tarea.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.models import Job
+from jobs.registry import TareaDesconocida, obtener_tarea
+
+
+class Command(BaseCommand):
+    help = "Encola una tarea en segundo plano. Ej.: python manage.py encolar_tarea recalcular_vencimientos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', help='Nombre de la tarea registrada')
+        parser.add_argument('--parametros', default='{}', help='Parámetros en JSON (default: {})')
+
+    def handle(self, *args, **options):
+        try:
+            obtener_tarea(options['tipo'])
+            parametros = json.loads(options['parametros'])
+        except TareaDesconocida as e:
+            raise CommandError(str(e))
+        except json.JSONDecodeError as e:
+            raise CommandError(f"--parametros no es un JSON válido: {e}")
+
+        job = Job.objects.encolar(options['tipo'], parametros=parametros)
+        self.stdout.write(self.style.SUCCESS(f"Tarea encolada: {job}"))
@@ -0,0 +1,94 @@
+# jobs/management/commands/run_workers.py
+import os
+import signal
+import socket
+import threading
+import traceback
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+
+from jobs.models import Job
+from jobs.registry import TareaDesconocida, obtener_tarea
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta las tareas en segundo plano (tabla jobs_job). Cada hilo toma "
+        "tareas con SELECT ... FOR UPDATE SKIP LOCKED, así que se pueden correr "
+        "varios procesos a la vez sin que dos ejecuten la misma tarea."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Hilos de trabajo (default: 2)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Segundos entre consultas cuando no hay tareas (default: 2)')
+        parser.add_argument('--stale-minutes', type=int, default=15, help='Minutos sin latido para reencolar una tarea EN PROCESO (default: 15)')
+        parser.add_argument('--once', action='store_true', help='Procesa las tareas pendientes y termina')
+
+    def handle(self, *args, **options):
+        self.detener = threading.Event()
+        self.options = options
+        signal.signal(signal.SIGTERM, self._senal_detener)
+        signal.signal(signal.SIGINT, self._senal_detener)
+
+        recuperadas = Job.objects.recuperar_huerfanas(options['stale_minutes'])
+        if recuperadas:
+            self.stdout.write(self.style.WARNING(f"{recuperadas} tarea(s) huérfana(s) devueltas a la cola."))
+
+        base = f"{socket.gethostname()}:{os.getpid()}"
+        hilos = [
+            threading.Thread(target=self._bucle, args=(f"{base}:{n}",), name=f"worker-{n}")
+            for n in range(options['concurrency'])
+        ]
+        self.stdout.write(f"Iniciando {len(hilos)} worker(s) ({base}).")
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.stdout.write("Workers detenidos.")
+
+    def _senal_detener(self, signum, frame):
+        self.stdout.write("Deteniendo: se terminan las tareas en curso...")
+        self.detener.set()
+
+    def _bucle(self, nombre_worker):
+        try:
+            while not self.detener.is_set():
+                close_old_connections()
+                try:
+                    job = Job.objects.tomar_siguiente(nombre_worker)
+                except DatabaseError as e:
+                    # Base caída o bloqueada: se reintenta en el siguiente ciclo
+                    self.stderr.write(f"[{nombre_worker}] No se pudo consultar la cola: {e}")
+                    connection.close()
+                    self.detener.wait(self.options['poll_interval'])
+                    continue
+                if job is None:
+                    if self.options['once']:
+                        return
+                    self.detener.wait(self.options['poll_interval'])
+                    continue
+                self._ejecutar(job)
+        finally:
+            connection.close()
+
+    def _ejecutar(self, job):
+        self.stdout.write(f"[{job.worker}] Ejecutando {job} (intento {job.intentos}/{job.max_intentos})")
+        try:
+            funcion = obtener_tarea(job.tipo)
+        except TareaDesconocida as e:
+            # No tiene sentido reintentar
+            job.intentos = job.max_intentos
+            job.marcar_error(str(e))
+            self.stderr.write(str(e))
+            return
+
+        try:
+            funcion(job)
+        except Exception:
+            detalle = traceback.format_exc()
+            job.marcar_error(detalle)
+            self.stderr.write(f"[{job.worker}] Error en {job}:\n{detalle}")
+        else:
+            job.marcar_completado()
+            self.stdout.write(self.style.SUCCESS(f"[{job.worker}] Completado {job}"))
@@ -0,0 +1,167 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from .registry import descripcion_tarea
+
+
+class JobQuerySet(models.QuerySet):
+
+    def encolar(self, tipo, parametros=None, creado_por=None, max_intentos=3, ejecutar_despues=None):
+        """Crea una tarea pendiente. Se ejecutará en el próximo ciclo de un worker (o después de ``ejecutar_despues``)."""
+        return self.create(
+            tipo=tipo,
+            parametros=parametros or {},
+            creado_por=creado_por,
+            max_intentos=max_intentos,
+            ejecutar_despues=ejecutar_despues or timezone.now(),
+        )
+
+    def tomar_siguiente(self, worker):
+        """
+        Reserva la siguiente tarea lista para ejecutarse y la marca EN PROCESO.
+
+        SELECT ... FOR UPDATE SKIP LOCKED: cada worker bloquea la fila que
+        toma y los demás la saltan en lugar de esperar, así varios workers
+        pueden consultar la tabla a la vez sin tomar la misma tarea.
+        """
+        with transaction.atomic():
+            job = (
+                self.select_for_update(skip_locked=True)
+                .filter(estado=Job.PENDIENTE, ejecutar_despues__lte=timezone.now())
+                .order_by('ejecutar_despues', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+            ahora = timezone.now()
+            job.estado = Job.EN_PROCESO
+            job.intentos += 1
+            job.worker = worker
+            job.fecha_inicio = ahora
+            job.fecha_latido = ahora
+            job.save(update_fields=['estado', 'intentos', 'worker', 'fecha_inicio', 'fecha_latido'])
+            return job
+
+    def recuperar_huerfanas(self, minutos):
+        """
+        Devuelve a PENDIENTE las tareas EN PROCESO cuyo worker dejó de dar
+        señales (se cayó o lo reiniciaron a mitad de la tarea).
+        """
+        limite = timezone.now() - timedelta(minutes=minutos)
+        return self.filter(estado=Job.EN_PROCESO, fecha_latido__lt=limite).update(
+            estado=Job.PENDIENTE, worker='', ejecutar_despues=timezone.now(),
+        )
+
+
+class Job(models.Model):
+    """
+    Tarea que se ejecuta fuera del ciclo de la petición HTTP (exportaciones,
+    recálculos masivos, resúmenes) con ``python manage.py run_workers``.
+    """
+    PENDIENTE = 'pendiente'
+    EN_PROCESO = 'en_proceso'
+    COMPLETADO = 'completado'
+    FALLIDO = 'fallido'
+    ESTADO_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_PROCESO, 'En proceso'),
+        (COMPLETADO, 'Completado'),
+        (FALLIDO, 'Fallido'),
+    ]
+
+    tipo = models.CharField(max_length=100, help_text="Nombre de la tarea registrada en jobs.registry")
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default=PENDIENTE)
+
+    creado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+
+    progreso = models.PositiveSmallIntegerField(default=0, help_text="Porcentaje completado (0-100)")
+    mensaje_progreso = models.CharField(max_length=255, blank=True)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=3)
+    error = models.TextField(blank=True)
+
+    archivo = models.FileField(upload_to='jobs/%Y/%m/', blank=True, help_text="Resultado descargable")
+
+    worker = models.CharField(max_length=100, blank=True)
+    ejecutar_despues = models.DateTimeField(default=timezone.now, help_text="No se ejecuta antes de esta fecha (reintentos)")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_latido = models.DateTimeField(null=True, blank=True, help_text="Última señal de vida del worker")
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Tarea en segundo plano"
+        verbose_name_plural = "Tareas en segundo plano"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            # Consulta de los workers: estado = pendiente AND ejecutar_despues <= ahora
+            models.Index(fields=['estado', 'ejecutar_despues'], name='jobs_cola_idx'),
+            models.Index(fields=['creado_por', '-fecha_creacion'], name='jobs_usuario_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_tipo_display()} ({self.get_estado_display()})"
+
+    def get_tipo_display(self):
+        return descripcion_tarea(self.tipo)
+
+    @property
+    def terminado(self):
+        return self.estado in (self.COMPLETADO, self.FALLIDO)
+
+    def reportar_progreso(self, porcentaje, mensaje=''):
+        """Actualiza el avance (y el latido) con un UPDATE directo, sin tocar el resto de campos."""
+        self.progreso = max(0, min(100, int(porcentaje)))
+        self.mensaje_progreso = mensaje[:255]
+        self.fecha_latido = timezone.now()
+        Job.objects.filter(pk=self.pk).update(
+            progreso=self.progreso,
+            mensaje_progreso=self.mensaje_progreso,
+            fecha_latido=self.fecha_latido,
+        )
+
+    def marcar_completado(self):
+        self.estado = self.COMPLETADO
+        self.progreso = 100
+        self.error = ''
+        self.fecha_fin = timezone.now()
+        self.save(update_fields=['estado', 'progreso', 'error', 'fecha_fin', 'archivo', 'mensaje_progreso'])
+
+    def reprogramar(self):
+        """
+        Tareas periódicas: si los parámetros traen ``repetir_horas``, encola la
+        misma tarea para dentro de esas horas (salvo que ya haya otra pendiente
+        del mismo tipo). La tarea lo llama al terminar; así basta encolarla una vez.
+        """
+        horas = self.parametros.get('repetir_horas')
+        if not horas or Job.objects.filter(tipo=self.tipo, estado=Job.PENDIENTE).exclude(pk=self.pk).exists():
+            return None
+        return Job.objects.encolar(
+            self.tipo,
+            parametros=self.parametros,
+            ejecutar_despues=timezone.now() + timedelta(hours=float(horas)),
+        )
+
+    def marcar_error(self, detalle):
+        """Programa un reintento con espera exponencial o, si no quedan, la marca FALLIDA."""
+        self.error = detalle
+        if self.intentos < self.max_intentos:
+            self.estado = self.PENDIENTE
+            self.worker = ''
+            self.ejecutar_despues = timezone.now() + timedelta(seconds=30 * 2 ** (self.intentos - 1))
+        else:
+            self.estado = self.FALLIDO
+            self.fecha_fin = timezone.now()
+        self.save(update_fields=['estado', 'error', 'worker', 'ejecutar_despues', 'fecha_fin'])
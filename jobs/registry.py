@@ -0,0 +1,44 @@
+# jobs/registry.py
+"""
+Registro de tipos de tarea.
+
+Cada app declara sus tareas en su módulo ``tasks.py`` (se cargan solos en
+JobsConfig.ready):
+
+    from jobs.registry import tarea
+
+    @tarea('exportar_reporte_csv', descripcion='Exportación del reporte (CSV)')
+    def exportar_reporte_csv(job):
+        ...
+        job.reportar_progreso(50, 'Escribiendo filas...')
+
+La función recibe el Job; sus parámetros están en ``job.parametros``. Si
+lanza una excepción, el worker reintenta la tarea hasta ``max_intentos``.
+"""
+
+_TAREAS = {}
+
+
+class TareaDesconocida(Exception):
+    pass
+
+
+def tarea(nombre, descripcion=''):
+    def registrar(funcion):
+        funcion.nombre_tarea = nombre
+        funcion.descripcion = descripcion or nombre
+        _TAREAS[nombre] = funcion
+        return funcion
+    return registrar
+
+
+def obtener_tarea(nombre):
+    try:
+        return _TAREAS[nombre]
+    except KeyError:
+        raise TareaDesconocida(f"No hay ninguna tarea registrada con el nombre '{nombre}'.")
+
+
+def descripcion_tarea(nombre):
+    funcion = _TAREAS.get(nombre)
+    return funcion.descripcion if funcion else nombre
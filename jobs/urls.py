@@ -0,0 +1,10 @@
+# jobs/urls.py
+
+from django.urls import path
+from .views import JobListView, JobCreateView, JobDownloadView
+
+urlpatterns = [
+    path('', JobListView.as_view(), name='job-list'),
+    path('nueva/', JobCreateView.as_view(), name='job-create'),
+    path('<int:pk>/descargar/', JobDownloadView.as_view(), name='job-download'),
+]
@@ -0,0 +1,59 @@
+# jobs/views.py
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import FileResponse, Http404, HttpResponseBadRequest
+from django.shortcuts import get_object_or_404, redirect
+from django.views import View
+from django.views.generic import ListView
+
+from .models import Job
+from .registry import descripcion_tarea
+
+
+class JobListView(LoginRequiredMixin, ListView):
+    """Tareas del usuario con su avance y el enlace de descarga cuando terminan."""
+    model = Job
+    template_name = 'jobs/job_list.html'
+    context_object_name = 'jobs'
+    paginate_by = 20
+
+    def get_queryset(self):
+        return Job.objects.filter(creado_por=self.request.user).defer('parametros', 'error')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['hay_pendientes'] = any(not job.terminado for job in context['jobs'])
+        return context
+
+
+class JobCreateView(LoginRequiredMixin, View):
+    """
+    Encola una tarea de las permitidas a los usuarios (settings.JOBS_TIPOS_USUARIO).
+    Los demás campos del POST se guardan como parámetros (p. ej. los filtros
+    del reporte).
+    """
+
+    def post(self, request, *args, **kwargs):
+        tipo = request.POST.get('tipo')
+        if tipo not in settings.JOBS_TIPOS_USUARIO:
+            return HttpResponseBadRequest("Tipo de tarea no permitido.")
+
+        parametros = {
+            clave: valor
+            for clave, valor in request.POST.items()
+            if clave not in ('csrfmiddlewaretoken', 'tipo', 'page', 'print') and valor
+        }
+        job = Job.objects.encolar(tipo, parametros=parametros, creado_por=request.user)
+        messages.success(request, f"Se encoló la tarea #{job.pk}: {descripcion_tarea(tipo)}. Podrá descargarla aquí cuando termine.")
+        return redirect('job-list')
+
+
+class JobDownloadView(LoginRequiredMixin, View):
+    """Descarga el archivo generado. Solo el usuario que creó la tarea puede bajarlo."""
+
+    def get(self, request, pk, *args, **kwargs):
+        job = get_object_or_404(Job, pk=pk, creado_por=request.user, estado=Job.COMPLETADO)
+        if not job.archivo:
+            raise Http404("Esta tarea no generó ningún archivo.")
+        return FileResponse(job.archivo.open('rb'), as_attachment=True, filename=job.archivo.name.rsplit('/', 1)[-1])
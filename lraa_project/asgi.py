@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lraa_project.settings')
+# Con ASGI el listado, el reporte y la exportación usan sus vistas async
+# (solicitudes/async_views.py); ver ASYNC_VIEWS en settings.py.
+os.environ.setdefault('LRAA_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
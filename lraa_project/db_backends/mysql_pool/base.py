@@ -0,0 +1,105 @@
+# lraa_project/db_backends/mysql_pool/base.py
+"""
+Backend MySQL/MariaDB con un pool de conexiones local al proceso.
+
+Django solo trae pool nativo para PostgreSQL. Este backend reutiliza el de
+MySQL y cambia dos cosas:
+
+  * get_new_connection(): antes de abrir una conexión nueva (TCP + auth)
+    toma una libre del pool y comprueba que siga viva con ping().
+  * _close(): en vez de cerrar la conexión la devuelve al pool, salvo que
+    esté dentro de una transacción o haya tenido errores.
+
+Se activa con DB_POOL=1 (ver settings.py). Se configura igual que el pool de
+PostgreSQL de Django:
+
+    'OPTIONS': {'pool': {'max_size': 4}}
+
+Cada proceso (worker de gunicorn) tiene su propio pool; nunca se comparten
+conexiones entre procesos.
+"""
+import os
+import queue
+import threading
+
+from django.db.backends.mysql import base as mysql_base
+
+Database = mysql_base.Database
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Pila (LIFO) de conexiones libres: la más reciente es la más probable de seguir viva."""
+
+    def __init__(self, max_size):
+        self._libres = queue.LifoQueue(maxsize=max_size)
+
+    def tomar(self):
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            return None
+
+    def devolver(self, conexion):
+        try:
+            self._libres.put_nowait(conexion)
+        except queue.Full:
+            return False
+        return True
+
+
+def _cerrar_sin_errores(conexion):
+    try:
+        conexion.close()
+    except Database.Error:
+        pass
+
+
+def get_pool(alias, max_size):
+    # La clave incluye el PID: tras un fork (gunicorn --preload) el hijo no
+    # debe reutilizar sockets abiertos por el proceso padre.
+    clave = (alias, os.getpid())
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None:
+            pool = _pools[clave] = ConnectionPool(max_size)
+        return pool
+
+
+class DatabaseWrapper(mysql_base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # 'pool' viene de OPTIONS pero no es un argumento de Database.connect()
+        kwargs.pop('pool', None)
+        return kwargs
+
+    @property
+    def pool(self):
+        config_pool = self.settings_dict['OPTIONS'].get('pool') or {}
+        return get_pool(self.alias, int(config_pool.get('max_size', 4)))
+
+    def get_new_connection(self, conn_params):
+        while (conexion := self.pool.tomar()) is not None:
+            try:
+                conexion.ping()
+            except Database.Error:
+                _cerrar_sin_errores(conexion)
+                continue
+            return conexion
+        return super().get_new_connection(conn_params)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.in_atomic_block or self.errors_occurred:
+            return super()._close()
+        try:
+            # Por si quedó una transacción abierta con autocommit desactivado
+            self.connection.rollback()
+        except Database.Error:
+            return _cerrar_sin_errores(self.connection)
+        if not self.pool.devolver(self.connection):
+            return super()._close()
@@ -0,0 +1,70 @@
+# lraa_project/jinja2.py
+"""
+Entorno Jinja2 para las plantillas del listado y del reporte (las de
+solicitudes/jinja2/), con los mismos helpers que usan sus versiones de
+Django: ``static``, ``url``, ``querystring``, los filtros de humanize y los
+de Django que usan (``floatformat``, ``truncatechars``, ``default``).
+
+* La salida se escapa con el ``escape`` de Django y no con el de MarkupSafe
+  (que pone ``&#39;`` en lugar de ``&#x27;``): las dos versiones de cada
+  plantilla producen el mismo HTML.
+* Una variable o atributo que falta (p. ej. ``solicitud.seguimiento`` de
+  una solicitud sin seguimiento) queda vacía también al seguir la cadena
+  (ChainableUndefined), como en las plantillas de Django.
+* ``default`` es el de Django (``value or arg``): no hace falta el
+  ``default(x, true)`` de Jinja2 en cada columna.
+
+Se elige con LRAA_PLANTILLAS_MOTOR=jinja2 (settings.PLANTILLAS_MOTOR);
+benchmarks/template_render.py compara los dos motores.
+"""
+from django.contrib.humanize.templatetags import humanize
+from django.template import defaultfilters
+from django.template.defaulttags import querystring as _querystring
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.html import conditional_escape
+from jinja2 import ChainableUndefined, Environment, pass_context
+
+from solicitudes import fragmentos
+from solicitudes.templatetags.iconos import icono
+from solicitudes.templatetags.reporte import orden_columna
+
+
+def url(nombre, *args, **kwargs):
+    """``url('solicitud-detail', pk)``, como ``{% url %}``."""
+    return reverse(nombre, args=args or None, kwargs=kwargs or None)
+
+
+@pass_context
+def querystring(context, **kwargs):
+    """``querystring(page=2)``: los parámetros de la petición con esos cambios, como ``{% querystring %}``."""
+    return _querystring(context, context['request'].GET, **kwargs)
+
+
+@pass_context
+def filas_solicitudes(context, solicitudes):
+    """Las filas del listado, de la caché (ver solicitudes/fragmentos.py)."""
+    return fragmentos.filas_listado(solicitudes, context['capacidades'], motor='jinja2')
+
+
+def environment(**options):
+    # Como el motor de Django: no se quita el salto de línea final de la plantilla
+    options.setdefault('keep_trailing_newline', True)
+    # El backend pone Undefined (o DebugUndefined con DEBUG), que falla al seguir la cadena
+    options['undefined'] = ChainableUndefined
+    env = Environment(finalize=conditional_escape, **options)
+    env.globals.update({
+        'static': static,
+        'url': url,
+        'querystring': querystring,
+        'icono': icono,
+        'orden_columna': pass_context(orden_columna),
+        'filas_solicitudes': filas_solicitudes,
+    })
+    env.filters.update(humanize.register.filters)
+    env.filters.update({
+        'default': defaultfilters.default,
+        'floatformat': defaultfilters.floatformat,
+        'truncatechars': defaultfilters.truncatechars,
+    })
+    return env
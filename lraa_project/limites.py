@@ -0,0 +1,273 @@
+# lraa_project/limites.py
+"""
+Límites de uso por vista, para que un solo usuario no acapare los workers
+ni la base de datos (búsquedas repetidas, reportes para imprimir,
+exportaciones) y para frenar el login por fuerza bruta.
+
+Se configuran por nombre de URL en LIMITES_PETICIONES:
+
+    'seguimiento-report': {
+        'peticiones': 30, 'segundos': 60,   # ventana deslizante
+        'por': 'usuario',                   # o 'ip'
+        'metodos': ('GET',),                # opcional; por defecto todos
+        'concurrentes': 2,                  # opcional; en curso a la vez
+    }
+
+* Ventana deslizante aproximada: contador de la ventana actual más la
+  fracción que aún cuenta de la anterior. Son dos claves de la caché por
+  usuario y vista.
+* Concurrencia: contador de peticiones en curso por usuario y vista. Se
+  libera al cerrar la respuesta (también las que se envían por partes). La
+  clave vence a los LIMITES_CONCURRENCIA_SEGUNDOS por si un proceso muere
+  sin liberarla.
+
+Los contadores necesitan una caché con incr() atómico que conserve el
+vencimiento de la clave (Redis; LocMemCache solo con un proceso, p. ej. en
+las pruebas). FileBasedCache hace incr() con get() y set(): pierde
+incrementos entre workers y reinicia el vencimiento, así que con ella y
+LIMITES_ACTIVOS el middleware no arranca.
+
+Al superar un límite se responde 429 con Retry-After y se suma un disparo
+al contador del día, vista y tipo en la caché: un rechazo no escribe en la
+base, que es justo lo que el límite protege. La tarea
+volcar_disparos_limites los pasa a DisparoLimite (``volcar_disparos``);
+``disparos`` y el comando ``disparos_limites`` suman lo ya volcado y lo
+pendiente.
+"""
+import logging
+import math
+import time
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+
+from solicitudes.models import DisparoLimite
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'limites'
+# Días que un contador de disparos espera en la caché a que lo vuelquen
+DIAS_PENDIENTES = 7
+# Cachés cuyo incr() es atómico y no cambia el vencimiento de la clave
+CACHES_ATOMICAS = (RedisCache, BaseMemcachedCache, LocMemCache)
+
+
+def ip_cliente(request):
+    """
+    IP del cliente. Detrás de LIMITES_PROXIES proxies (Traefik) la toma de
+    X-Forwarded-For contando desde la derecha: lo que agregó el cliente a la
+    izquierda no se puede falsificar hacia ese lado.
+    """
+    proxies = settings.LIMITES_PROXIES
+    reenviada = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and reenviada:
+        direcciones = [d.strip() for d in reenviada.split(',') if d.strip()]
+        if len(direcciones) >= proxies:
+            return direcciones[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _identidad(request, regla):
+    if regla.get('por') == 'ip' or not request.user.is_authenticated:
+        return f"ip:{ip_cliente(request)}"
+    return f"u:{request.user.pk}"
+
+
+def _incr(clave, segundos):
+    """Suma 1 a la clave; si no existe (o acaba de vencer) la crea con ``segundos`` de vida."""
+    cache.add(clave, 0, segundos)
+    try:
+        return cache.incr(clave)
+    except ValueError:
+        cache.add(clave, 0, segundos)
+        return cache.incr(clave)
+
+
+def revisar_ventana(clave, peticiones, segundos):
+    """
+    Cuenta una petición en la ventana deslizante. Devuelve 0 si se admite o
+    los segundos a esperar si se superó el límite (entonces no se cuenta).
+    """
+    ahora = time.time()
+    numero, posicion = divmod(ahora, segundos)
+    actual = f"{PREFIJO}:v:{clave}:{int(numero)}"
+    anterior = f"{PREFIJO}:v:{clave}:{int(numero) - 1}"
+    cuenta = _incr(actual, segundos * 2)
+    previa = cache.get(anterior, 0)
+    peso = 1 - posicion / segundos
+    if previa * peso + cuenta <= peticiones:
+        return 0
+
+    cache.decr(actual)
+    cuenta -= 1
+    if cuenta >= peticiones or not previa:
+        # Hasta la próxima ventana, y que para entonces la actual pese menos
+        espera = segundos - posicion
+    else:
+        # Hasta que la parte que cuenta de la anterior deje lugar
+        espera = segundos * (1 - (peticiones - cuenta) / previa) - posicion
+    return max(1, math.ceil(espera))
+
+
+def tomar_turno(clave, maximo):
+    """Ocupa un lugar entre las peticiones en curso. False si ya hay ``maximo``."""
+    contador = f"{PREFIJO}:c:{clave}"
+    if _incr(contador, settings.LIMITES_CONCURRENCIA_SEGUNDOS) > maximo:
+        cache.decr(contador)
+        return False
+    return True
+
+
+def liberar_turno(clave):
+    try:
+        cache.decr(f"{PREFIJO}:c:{clave}")
+    except ValueError:
+        # La clave ya venció
+        pass
+
+
+def _clave_disparo(dia, nombre, tipo):
+    return f"{PREFIJO}:d:{dia:%Y%m%d}:{nombre}:{tipo}"
+
+
+def registrar_disparo(nombre, tipo, identidad):
+    """Suma el rechazo al contador del día en la caché (ver volcar_disparos)."""
+    _incr(_clave_disparo(timezone.localdate(), nombre, tipo), DIAS_PENDIENTES * 86400)
+    logger.warning("Límite %s superado en %s por %s", tipo, nombre, identidad)
+
+
+def _pendientes(dias):
+    """
+    {(dia, nombre, tipo): veces} que siguen en la caché. Las claves posibles
+    son pocas (vistas de LIMITES_PETICIONES por tipo y día): una get_many.
+    """
+    hoy = timezone.localdate()
+    claves = {
+        _clave_disparo(dia, nombre, tipo): (dia, nombre, tipo)
+        for dia in (hoy - timedelta(days=n) for n in range(dias))
+        for nombre in settings.LIMITES_PETICIONES
+        for tipo in (DisparoLimite.VENTANA, DisparoLimite.CONCURRENCIA)
+    }
+    return {claves[clave]: veces for clave, veces in cache.get_many(list(claves)).items() if veces}
+
+
+def _sumar_disparos(dia, nombre, tipo, veces):
+    fila = {'dia': dia, 'nombre': nombre, 'tipo': tipo}
+    if not DisparoLimite.objects.filter(**fila).update(veces=F('veces') + veces):
+        try:
+            with transaction.atomic():
+                DisparoLimite.objects.create(**fila, veces=veces)
+        except IntegrityError:
+            # Otro worker creó la fila del día entre el UPDATE y el INSERT
+            DisparoLimite.objects.filter(**fila).update(veces=F('veces') + veces)
+
+
+def volcar_disparos():
+    """
+    Pasa a DisparoLimite los disparos contados en la caché y devuelve cuántos.
+    A cada contador se le resta lo volcado (decr): los que llegan mientras
+    tanto quedan para la próxima vez.
+    """
+    total = 0
+    # Un día más: la clave vive DIAS_PENDIENTES días desde el primer disparo
+    for (dia, nombre, tipo), veces in _pendientes(DIAS_PENDIENTES + 1).items():
+        _sumar_disparos(dia, nombre, tipo, veces)
+        try:
+            cache.decr(_clave_disparo(dia, nombre, tipo), veces)
+        except ValueError:
+            # Venció después de leerla; lo que tenía ya está en la base
+            pass
+        total += veces
+    return total
+
+
+def disparos(dias=1):
+    """
+    {(dia, nombre de URL, 'ventana'|'concurrencia'): veces} de los últimos
+    ``dias``: lo volcado a la base más lo que sigue en la caché.
+    """
+    desde = timezone.localdate() - timedelta(days=dias - 1)
+    filas = DisparoLimite.objects.filter(dia__gte=desde, veces__gt=0).values_list('dia', 'nombre', 'tipo', 'veces')
+    conteo = {(dia, nombre, tipo): veces for dia, nombre, tipo, veces in filas}
+    for fila, veces in _pendientes(dias).items():
+        conteo[fila] = conteo.get(fila, 0) + veces
+    return conteo
+
+
+def respuesta_429(espera):
+    response = HttpResponse(
+        f"Demasiadas solicitudes. Intente de nuevo en {espera} segundos.\n",
+        status=429, content_type='text/plain; charset=utf-8',
+    )
+    response['Retry-After'] = str(espera)
+    return response
+
+
+class LimitesMiddleware:
+    """
+    Aplica LIMITES_PETICIONES según el nombre de la URL resuelta. Va después
+    de AuthenticationMiddleware (usa request.user).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.LIMITES_ACTIVOS and not isinstance(caches['default'], CACHES_ATOMICAS):
+            raise ImproperlyConfigured(
+                "LIMITES_ACTIVOS necesita una caché con incr() atómico (CACHE_REDIS_URL); "
+                "con FileBasedCache los contadores se pierden entre workers."
+            )
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        return self._al_responder(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        # process_view es síncrona: con ASGI Django la ejecuta en un hilo,
+        # fuera del event loop, igual que las llamadas a la caché
+        return self._al_responder(request, await self.get_response(request))
+
+    def _al_responder(self, request, response):
+        clave = getattr(request, '_limite_turno', None)
+        if clave:
+            # Se libera cuando el servidor cierra la respuesta, es decir,
+            # después de enviar el último byte de un reporte por partes
+            response._resource_closers.append(lambda: liberar_turno(clave))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.LIMITES_ACTIVOS or request.resolver_match is None:
+            return None
+        nombre = request.resolver_match.url_name
+        regla = settings.LIMITES_PETICIONES.get(nombre)
+        if regla is None or request.method not in regla.get('metodos', (request.method,)):
+            return None
+
+        identidad = _identidad(request, regla)
+        clave = f"{nombre}:{identidad}"
+        espera = revisar_ventana(clave, regla['peticiones'], regla['segundos'])
+        if espera:
+            registrar_disparo(nombre, 'ventana', identidad)
+            return respuesta_429(espera)
+
+        if regla.get('concurrentes'):
+            if not tomar_turno(clave, regla['concurrentes']):
+                registrar_disparo(nombre, 'concurrencia', identidad)
+                return respuesta_429(settings.LIMITES_CONCURRENCIA_ESPERA)
+            request._limite_turno = clave
+        return None
@@ -0,0 +1,192 @@
+# lraa_project/routers.py
+"""
+Enrutamiento de lecturas hacia réplicas de la base de datos.
+
+Por defecto TODO va a la base primaria ('default'). Solo las vistas que lo
+piden explícitamente (listado, detalle, reportes, exportaciones...) leen de
+una réplica, usando ``leer_de_replica()`` o ``ReplicaReadMixin``.
+
+Reglas:
+  * Escrituras: siempre a 'default'.
+  * Lecturas fuera de un bloque de réplica: 'default'.
+  * Lecturas dentro de un bloque de réplica: una réplica sana al azar.
+  * Si el usuario escribió hace poco (cookie de "pin"), se lee de 'default'
+    para garantizar que vea sus propios cambios (read-your-writes).
+  * Si una réplica no responde, se marca como caída unos segundos y se
+    vuelve a 'default'.
+"""
+import asyncio
+import random
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.utils import DatabaseError
+
+# Estado por petición (funciona igual con hilos de WSGI y con tareas de ASGI)
+_usar_replica = ContextVar('usar_replica', default=False)
+_fijado_a_primaria = ContextVar('fijado_a_primaria', default=False)
+
+# Réplicas marcadas como caídas: {alias: timestamp hasta el que se ignoran}
+_replicas_caidas = {}
+_lock = threading.Lock()
+
+
+def get_replicas():
+    """Alias de las réplicas configuradas en settings.DATABASE_REPLICAS."""
+    return [alias for alias in getattr(settings, 'DATABASE_REPLICAS', []) if alias in settings.DATABASES]
+
+
+def marcar_replica_caida(alias):
+    espera = getattr(settings, 'DATABASE_REPLICA_RETRY_SECONDS', 30)
+    with _lock:
+        _replicas_caidas[alias] = time.monotonic() + espera
+
+
+def replica_disponible(alias):
+    """
+    True si la réplica responde. El resultado negativo se recuerda durante
+    DATABASE_REPLICA_RETRY_SECONDS para no pagar un timeout en cada consulta.
+    """
+    with _lock:
+        hasta = _replicas_caidas.get(alias)
+        if hasta is not None:
+            if time.monotonic() < hasta:
+                return False
+            del _replicas_caidas[alias]
+
+    conexion = connections[alias]
+    if conexion.connection is not None or _en_event_loop():
+        # Desde el event loop no se puede abrir una conexión (es síncrono);
+        # el ORM async vuelve a consultar el router en su hilo síncrono y
+        # ahí sí se comprueba la réplica.
+        return True
+    try:
+        conexion.ensure_connection()
+    except DatabaseError:
+        marcar_replica_caida(alias)
+        return False
+    return True
+
+
+def _en_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+@contextmanager
+def leer_de_replica():
+    """Dentro de este bloque las lecturas pueden ir a una réplica."""
+    token = _usar_replica.set(True)
+    try:
+        yield
+    finally:
+        _usar_replica.reset(token)
+
+
+@contextmanager
+def fijar_a_primaria():
+    """Dentro de este bloque todas las lecturas van a la primaria."""
+    token = _fijado_a_primaria.set(True)
+    try:
+        yield
+    finally:
+        _fijado_a_primaria.reset(token)
+
+
+def alias_de_lectura(model):
+    """
+    Alias que usaría una lectura de ``model`` dentro de leer_de_replica().
+    Útil para fijar un queryset con .using() antes de iterarlo fuera del
+    bloque (p. ej. en una respuesta que se envía por partes).
+    """
+    with leer_de_replica():
+        return router.db_for_read(model)
+
+
+class PrimaryReplicaRouter:
+    """Router de Django: escrituras a la primaria, lecturas opcionales a réplicas."""
+
+    def db_for_read(self, model, **hints):
+        if not _usar_replica.get() or _fijado_a_primaria.get():
+            return DEFAULT_DB_ALIAS
+
+        replicas = get_replicas()
+        random.shuffle(replicas)
+        for alias in replicas:
+            if replica_disponible(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplicas contienen los mismos datos
+        pool = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Se permite migrar cualquier alias para poder preparar réplicas
+        # locales (SQLite); en producción la réplica recibe el esquema por
+        # replicación y nunca se ejecuta migrate contra ella.
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Después de una escritura (POST/PUT/PATCH/DELETE) deja una cookie que
+    fija al usuario a la primaria durante DATABASE_REPLICA_PIN_SECONDS, así
+    la redirección posterior (p. ej. tras SeguimientoUpdateView) no lee de
+    una réplica que aún no ha recibido el cambio.
+
+    Funciona tanto con WSGI como con ASGI sin saltos de hilo.
+    """
+    COOKIE_NAME = 'lraa_db_pin'
+    METODOS_ESCRITURA = ('POST', 'PUT', 'PATCH', 'DELETE')
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        token = _fijado_a_primaria.set(self.COOKIE_NAME in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _fijado_a_primaria.reset(token)
+        return self._marcar_escritura(request, response)
+
+    async def __acall__(self, request):
+        token = _fijado_a_primaria.set(self.COOKIE_NAME in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _fijado_a_primaria.reset(token)
+        return self._marcar_escritura(request, response)
+
+    def _marcar_escritura(self, request, response):
+        if request.method in self.METODOS_ESCRITURA and response.status_code < 400:
+            response.set_cookie(
+                self.COOKIE_NAME,
+                '1',
+                max_age=getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 10),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
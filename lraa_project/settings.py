@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'solicitudes',
     'accounts',
+    'jobs',
     'django.contrib.humanize',
 ]
 
@@ -55,6 +57,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'lraa_project.routers.ReplicaPinningMiddleware',
+    'lraa_project.limites.LimitesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,37 +75,113 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'solicitudes.context_processors.live_updates',
+                'solicitudes.context_processors.permisos',
+            ],
+        },
+    },
+    {
+        # Versiones Jinja2 del listado y del reporte (solicitudes/jinja2/);
+        # las usan solo las vistas de PLANTILLAS_MOTOR
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'environment': 'lraa_project.jinja2.environment',
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'solicitudes.context_processors.live_updates',
+                'solicitudes.context_processors.permisos',
             ],
         },
     },
 ]
 
+# Motor ('django' o 'jinja2') de las plantillas del listado y del reporte,
+# las de más filas por página. Ver benchmarks/template_render.py.
+PLANTILLAS_MOTOR = os.environ.get('LRAA_PLANTILLAS_MOTOR', 'django')
+
 WSGI_APPLICATION = 'lraa_project.wsgi.application'
 
+# True cuando se sirve con lraa_project/asgi.py: urls.py usa entonces las
+# versiones async del listado, del reporte y de la exportación.
+ASYNC_VIEWS = os.environ.get('LRAA_ASYNC_VIEWS', '0') == '1'
+# Hilos por proceso para las consultas que las vistas async lanzan en paralelo
+ASYNC_DB_THREADS = int(os.environ.get('ASYNC_DB_THREADS', '4'))
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Todos los valores se pueden sobrescribir por variables de entorno; los
+# valores por defecto son los de Producción.
+# Desarrollo local: DB_USER=root DB_PASSWORD= DB_HOST=127.0.0.1 DB_PORT=3307
+# Acceso externo:   DB_HOST=172.31.1.72 DB_PORT=3346
+#
+# Conexiones persistentes: cada worker reutiliza su conexión durante
+# DB_CONN_MAX_AGE segundos en lugar de abrir una nueva (TCP + autenticación)
+# en cada petición. CONN_HEALTH_CHECKS verifica la conexión al inicio de cada
+# petición y la reabre si MariaDB la cerró (wait_timeout, reinicio...).
+#
+# DB_POOL=1 activa además un pool de conexiones por proceso
+# (lraa_project/db_backends/mysql_pool) de DB_POOL_SIZE conexiones.
+DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+
 DATABASES = {
     'default': {
-        #'ENGINE': 'django.db.backends.mysql',
-        #'NAME': 'bd_lraa_seguimiento_sbs',
-        #'USER': 'root',
-        #'PASSWORD': '',
-        #'HOST': '127.0.0.1',
-        #'PORT': '3307',
-
-        # Código para Producción
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': 'bd_lraa_seguimiento_sbs',
-        'USER': 'lraa_ssbs',
-        'PASSWORD': 'lraa1928',
-        'HOST': 'lraasegsbs-bdlraaseguimientosbs-9xh7lx', #host interno
-        # 'HOST': '172.31.1.72', #host externo
-        'PORT': '3306', #port interno
-        # 'PORT': '3346', #port externo
-    } 
-} 
+        'ENGINE': 'lraa_project.db_backends.mysql_pool' if DB_POOL else 'django.db.backends.mysql',
+        'NAME': os.environ.get('DB_NAME', 'bd_lraa_seguimiento_sbs'),
+        'USER': os.environ.get('DB_USER', 'lraa_ssbs'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'lraa1928'),
+        'HOST': os.environ.get('DB_HOST', 'lraasegsbs-bdlraaseguimientosbs-9xh7lx'), #host interno
+        'PORT': os.environ.get('DB_PORT', '3306'), #port interno
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '5')),
+        },
+    }
+}
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {'max_size': int(os.environ.get('DB_POOL_SIZE', '4'))}
+
+# --- Réplicas de lectura ---
+# DB_REPLICA_HOSTS="host1,host2" añade una réplica por host con las mismas
+# credenciales que 'default'. El listado, el detalle y los reportes leen de
+# ellas (ver lraa_project/routers.py); las escrituras siempre van a 'default'.
+#
+# Prueba local sin MySQL: DB_LOCAL_SQLITE=1 usa db.sqlite3 como primaria y
+# db_replica.sqlite3 como réplica:
+#   DB_LOCAL_SQLITE=1 python manage.py migrate
+#   DB_LOCAL_SQLITE=1 python manage.py migrate --database=replica_1
+if os.environ.get('DB_LOCAL_SQLITE'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        },
+        'replica_1': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db_replica.sqlite3',
+            'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+else:
+    for numero, host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+        DATABASES[f'replica_{numero}'] = {
+            **DATABASES['default'],
+            'HOST': host.strip(),
+            'TEST': {'MIRROR': 'default'},
+        }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['lraa_project.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_PIN_SECONDS = 10   # Tiempo que un usuario lee de la primaria tras escribir
+DATABASE_REPLICA_RETRY_SECONDS = 30 # Tiempo que se ignora una réplica caída
 
 
 # Password validation
@@ -141,18 +221,80 @@ USE_TZ = True
 STATIC_URL = 'static/'
 # STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
-STORAGE = {
-    "staticfiles":{
-        "BACKEND":"whitenoise.storage.CompressedManifestStaticFilesStorage",
-    }
+# En Docker se define STATIC_ROOT fuera de /app: así el volumen del código
+# montado en /app (docker-compose) no oculta los archivos generados por
+# collectstatic durante el build y no hace falta repetirlo al arrancar.
+STATIC_ROOT = Path(os.environ.get('STATIC_ROOT', BASE_DIR / 'staticfiles'))
+# collectstatic copia cada archivo con un hash del contenido en el nombre
+# (bootstrap.min.3f2a….css) y genera sus versiones .gz (y .br si está
+# instalado brotli). WhiteNoise sirve esos nombres con caché "immutable" de
+# un año y elige la versión comprimida según Accept-Encoding; {% static %}
+# resuelve el nombre con hash a partir del manifiesto, así que al cambiar un
+# archivo cambia su URL y no hace falta invalidar nada.
+# (Django 5.x solo lee STORAGES; STATICFILES_STORAGE ya no tiene efecto.)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
 }
+# Los archivos sin hash (p. ej. favicon) se cachean un día
+WHITENOISE_MAX_AGE = 86400
 STATICFILES_DIRS = [
     BASE_DIR / 'solicitudes/static',
     #BASE_DIR / 'static',
 ]
 
+# Archivos generados por las tareas en segundo plano (exportaciones). No se
+# sirven públicamente: se descargan por jobs.views.JobDownloadView.
+MEDIA_URL = 'media/'
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', BASE_DIR / 'media'))
+
+# Actualizaciones en vivo del listado y del detalle (server-sent events,
+# solicitudes/eventos.py). Con ASGI las conexiones esperan en el event loop;
+# con WSGI cada una ocupa un hilo de gunicorn mientras está abierta, así que
+# cada proceso admite a lo sumo LIVE_UPDATES_CONEXIONES_WSGI (el resto de
+# las páginas funciona sin actualizaciones en vivo). Debe quedar por debajo
+# de GUNICORN_THREADS para que siempre haya hilos para las demás peticiones.
+LIVE_UPDATES = os.environ.get('LIVE_UPDATES', '1') == '1'
+LIVE_UPDATES_CONEXIONES_WSGI = int(os.environ.get('LIVE_UPDATES_CONEXIONES_WSGI', '4'))
+# Cada cuánto cada worker busca en la tabla eventos guardados por otros
+# workers (0 = solo los del propio proceso, para un único worker).
+LIVE_UPDATES_POLL_SECONDS = float(os.environ.get('LIVE_UPDATES_POLL_SECONDS', '2'))
+# Duración máxima de una conexión; el navegador reconecta solo (Last-Event-ID).
+LIVE_UPDATES_STREAM_SECONDS = int(os.environ.get('LIVE_UPDATES_STREAM_SECONDS', '300'))
+LIVE_UPDATES_RETENTION_HOURS = 24
+
+# Tareas de jobs/ que un usuario puede encolar desde la web. El resto
+# (p. ej. recalcular_vencimientos) solo con el comando encolar_tarea.
+JOBS_TIPOS_USUARIO = ['exportar_reporte_csv', 'resumen_vencimientos']
+
+# Archivo histórico (solicitudes/archivo.py, tarea archivar_solicitudes): las
+# solicitudes finalizadas o anuladas creadas antes del 1 de enero de hace
+# ARCHIVO_ANIOS_ACTIVOS - 1 años pasan a las tablas de archivo, de a
+# ARCHIVO_LOTE por transacción.
+ARCHIVO_ANIOS_ACTIVOS = int(os.environ.get('ARCHIVO_ANIOS_ACTIVOS', '2'))
+ARCHIVO_LOTE = int(os.environ.get('ARCHIVO_LOTE', '500'))
+
+# Exportación incremental para finanzas (solicitudes/cambios.py, comando
+# exportar_cambios). Cada corrida exporta hasta "ahora - MARGEN" para no
+# saltarse transacciones que todavía no confirmaron.
+CAMBIOS_DIR = Path(os.environ.get('CAMBIOS_DIR', MEDIA_ROOT / 'cambios'))
+CAMBIOS_LOTE = int(os.environ.get('CAMBIOS_LOTE', '5000'))
+CAMBIOS_MARGEN_SEGUNDOS = int(os.environ.get('CAMBIOS_MARGEN_SEGUNDOS', '120'))
+
+# Adjuntos de los seguimientos (solicitudes/adjuntos.py). No se sirven
+# públicamente: la descarga pasa por la vista, que comprueba permisos.
+# Con nginx delante, ADJUNTOS_X_ACCEL_PREFIX hace que nginx envíe el archivo:
+#   location /adjuntos-internos/ { internal; alias /app/media/adjuntos/; }
+ADJUNTOS_ROOT = Path(os.environ.get('ADJUNTOS_ROOT', MEDIA_ROOT / 'adjuntos'))
+ADJUNTOS_X_ACCEL_PREFIX = os.environ.get('ADJUNTOS_X_ACCEL_PREFIX', '')
+ADJUNTOS_MAX_BYTES = int(os.environ.get('ADJUNTOS_MAX_MB', '200')) * 1024 * 1024
+ADJUNTOS_TROZO_MAX_BYTES = 8 * 1024 * 1024
+ADJUNTOS_EXTENSIONES = ('.pdf', '.jpg', '.jpeg', '.png')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -167,4 +309,97 @@ AUTH_USER_MODEL = 'accounts.CustomUser'
 # Redirecciones después del login y logout
 LOGIN_REDIRECT_URL = 'solicitud-list' # A la lista de solicitudes
 LOGOUT_REDIRECT_URL = 'login'         # A la página de login
-LOGIN_URL = 'login'                   # La URL de la página de login
\ No newline at end of file
+LOGIN_URL = 'login'                   # La URL de la página de login
+# Caché compartida por los procesos. En producción (docker-compose) es el
+# servicio redis, con CACHE_REDIS_URL (requiere el paquete "redis"): al
+# llenarse desaloja lo menos usado. Sin CACHE_REDIS_URL (desarrollo, un solo
+# contenedor) se guarda en archivos en disco.
+#
+# El HTML de fragmentos.py va en su propio alias: son la mayoría de las
+# escrituras. FileBasedCache recorre el directorio en cada set (_cull) y, al
+# llegar a MAX_ENTRIES, borra archivos al azar; en otro directorio, los
+# fragmentos no desalojan sesiones, usuarios ni calendarios.
+if os.environ.get('CACHE_REDIS_URL'):
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_REDIS_URL'],
+        }
+        for alias in ('default', 'fragmentos')
+    }
+else:
+    CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'lraa_cache'))
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        },
+        'fragmentos': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_DIR, 'fragmentos'),
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        },
+    }
+
+# Sesiones en la caché con escritura también en la base (write-through): la
+# lectura de cada petición no consulta django_session y, si la caché se
+# vacía, las sesiones siguen en la tabla. Las vencidas se borran con la
+# tarea limpiar_sesiones (accounts/tasks.py).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# El usuario de la sesión se lee de la caché (accounts/backends.py); se
+# invalida al guardarlo (perfil, contraseña, activación, grupos). Las
+# sesiones abiertas con ModelBackend se pasaron a este backend en la
+# migración accounts 0004.
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+USER_CACHE_SECONDS = int(os.environ.get('USER_CACHE_SECONDS', '3600'))
+
+# Los departamentos se guardan en memoria de cada proceso
+# (accounts.models.DepartamentoManager); un cambio hecho desde otro worker
+# se ve a lo sumo pasado este tiempo.
+DEPARTAMENTOS_CACHE_SECONDS = int(os.environ.get('DEPARTAMENTOS_CACHE_SECONDS', '300'))
+
+# HTML de las filas del listado y de los paneles del detalle en la caché
+# (solicitudes/fragmentos.py). La clave cambia al guardar la solicitud, así
+# que este tiempo solo limita cuánto ocupan las copias que ya no se usan.
+FRAGMENTOS_CACHE_SECONDS = int(os.environ.get('FRAGMENTOS_CACHE_SECONDS', '86400'))
+
+# Calendario ICS de vencimientos y servicios (solicitudes/calendario.py):
+# días hacia atrás y hacia adelante que incluye, y cuánto dura en la caché
+# si nada lo invalida antes.
+CALENDARIO_DIAS_ATRAS = int(os.environ.get('CALENDARIO_DIAS_ATRAS', '30'))
+CALENDARIO_DIAS_ADELANTE = int(os.environ.get('CALENDARIO_DIAS_ADELANTE', '365'))
+CALENDARIO_CACHE_SECONDS = int(os.environ.get('CALENDARIO_CACHE_SECONDS', '3600'))
+
+# Límites de uso por nombre de URL (lraa_project/limites.py): peticiones por
+# ventana deslizante de 'segundos', por usuario o por IP, y cuántas pueden
+# estar en curso a la vez. Al superarlos se responde 429 con Retry-After.
+# Los rechazos se cuentan en la caché; para pasarlos a la base:
+#   python manage.py encolar_tarea volcar_disparos_limites --parametros '{"repetir_horas": 0.25}'
+# Los contadores necesitan Redis (incr() atómico): sin CACHE_REDIS_URL están
+# apagados, y LIMITES_ACTIVOS=1 con la caché en archivos es un error.
+LIMITES_ACTIVOS = os.environ.get('LIMITES_ACTIVOS', '1' if os.environ.get('CACHE_REDIS_URL') else '0') == '1'
+LIMITES_PETICIONES = {
+    # Fuerza bruta en el login: intentos por IP
+    'login': {'peticiones': 10, 'segundos': 300, 'por': 'ip', 'metodos': ('POST',)},
+    # Búsqueda del listado (cada tecla puede pedir un fragmento)
+    'solicitud-list': {'peticiones': 120, 'segundos': 60},
+    'solicitud-duplicados': {'peticiones': 60, 'segundos': 60},
+    'proveedor-autocomplete': {'peticiones': 120, 'segundos': 60},
+    # Reporte (con ?print=1 trae todas las filas) y exportaciones
+    'seguimiento-report': {'peticiones': 30, 'segundos': 60, 'concurrentes': 2},
+    'seguimiento-export': {'peticiones': 6, 'segundos': 60, 'concurrentes': 1},
+    'job-create': {'peticiones': 10, 'segundos': 300, 'metodos': ('POST',)},
+    # Guardar o actualizar un reporte predefinido recalcula su instantánea
+    'reporte-predefinido-create': {'peticiones': 10, 'segundos': 300, 'metodos': ('POST',)},
+    'reporte-predefinido-refresh': {'peticiones': 6, 'segundos': 60, 'concurrentes': 1},
+    # Calendario ICS: sin sesión, por IP (los clientes preguntan cada pocos minutos)
+    'calendario-feed': {'peticiones': 60, 'segundos': 60, 'por': 'ip'},
+}
+# Vencimiento del contador de peticiones en curso (por si un worker muere
+# sin liberarlo) y Retry-After cuando se rechaza por concurrencia.
+LIMITES_CONCURRENCIA_SEGUNDOS = 300
+LIMITES_CONCURRENCIA_ESPERA = 5
+# Proxies delante de gunicorn que agregan X-Forwarded-For (Traefik); 0 = usar REMOTE_ADDR
+LIMITES_PROXIES = int(os.environ.get('LIMITES_PROXIES', '1'))
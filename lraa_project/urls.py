@@ -25,6 +25,8 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')), 
     # URLs de la app de solicitudes
     path('solicitudes/', include('solicitudes.urls')),
+    # Exportaciones y tareas en segundo plano
+    path('tareas/', include('jobs.urls')),
     path('', include('solicitudes.urls')),
     # ...
 ]
\ No newline at end of file
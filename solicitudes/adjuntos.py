@@ -0,0 +1,324 @@
+# solicitudes/adjuntos.py
+"""
+Adjuntos de los seguimientos: documentos de respaldo de cada etapa (SBS,
+evaluación, orden de compra, recibido conforme) guardados en el servidor en
+vez de enlaces externos que se rompen.
+
+Subida por partes (reanudable), pensada para PDF escaneados grandes:
+
+  1. POST  solicitud/<pk>/adjuntos/      etapa, nombre, tamano -> {id, url, recibido}
+  2. PUT   adjuntos/subidas/<id>/        un trozo del archivo, con
+         Content-Range: bytes <inicio>-<fin>/<total>
+     El trozo se copia del cuerpo de la petición al archivo parcial por
+     bloques, sin cargarlo entero en memoria. Si <inicio> no coincide con lo
+     ya recibido se responde 409 con el valor correcto. Mientras se lee el
+     cuerpo no hay transacción abierta: dos trozos de la misma subida se
+     excluyen con un flock sobre el archivo parcial, y ``recibido`` avanza
+     con un UPDATE condicionado a su valor anterior.
+  3. GET   adjuntos/subidas/<id>/        {recibido} para retomar tras un corte.
+
+Con el último trozo (ya sin bloqueos) se calcula el SHA-256 y el archivo pasa a
+ADJUNTOS_ROOT/contenido/ab/cd/<sha256>; si ese contenido ya existía se
+descarta la copia (deduplicación) y el Adjunto nuevo apunta al existente.
+
+Descarga: si ADJUNTOS_X_ACCEL_PREFIX está definido, la vista solo comprueba
+permisos y responde con X-Accel-Redirect; nginx envía el archivo (con
+Range) desde una location interna. Si no, FileResponse con soporte de
+Range: gunicorn la envía con sendfile() (sin copiar los bytes por Python).
+"""
+import fcntl
+import hashlib
+import mimetypes
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import ProtectedError
+from django.http import FileResponse, HttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header, quote_etag
+
+from .models import Adjunto, ContenidoAdjunto, SeguimientoCompra, SeguimientoCompraArchivado, SubidaAdjunto
+
+BLOQUE = 64 * 1024
+_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+_CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class SubidaInvalida(Exception):
+    """Error del cliente en la subida; ``estado`` es el código HTTP a devolver."""
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def raiz():
+    return Path(settings.ADJUNTOS_ROOT)
+
+
+def ruta_contenido(contenido):
+    return raiz() / contenido.ruta_relativa
+
+
+def ruta_parcial(subida):
+    return raiz() / 'subidas' / f"{subida.pk}.part"
+
+
+def adjuntos_por_etapa(seguimiento):
+    """{etapa: [Adjunto, ...]} para la página de detalle."""
+    por_etapa = {etapa: [] for etapa, _ in Adjunto.ETAPA_CHOICES}
+    for adjunto in Adjunto.objects.filter(seguimiento_id=seguimiento.pk).select_related('contenido'):
+        por_etapa[adjunto.etapa].append(adjunto)
+    return por_etapa
+
+
+# --- Subida ---
+
+def iniciar_subida(seguimiento, usuario, etapa, nombre, tamano):
+    nombre = os.path.basename((nombre or '').replace('\\', '/')).strip()[:255]
+    if etapa not in dict(Adjunto.ETAPA_CHOICES):
+        raise SubidaInvalida("Etapa desconocida.")
+    if not nombre or Path(nombre).suffix.lower() not in settings.ADJUNTOS_EXTENSIONES:
+        raise SubidaInvalida(f"Solo se aceptan archivos {', '.join(settings.ADJUNTOS_EXTENSIONES)}.")
+    try:
+        tamano = int(tamano)
+    except (TypeError, ValueError):
+        raise SubidaInvalida("Tamaño inválido.")
+    if not 0 < tamano <= settings.ADJUNTOS_MAX_BYTES:
+        raise SubidaInvalida(f"El archivo supera el máximo de {settings.ADJUNTOS_MAX_BYTES // (1024 * 1024)} MB.", 413)
+
+    subida = SubidaAdjunto.objects.create(
+        seguimiento=seguimiento, etapa=etapa, nombre=nombre, tamano=tamano, subido_por=usuario,
+    )
+    ruta = ruta_parcial(subida)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.touch()
+    return subida
+
+
+def recibir_trozo(subida_id, usuario, content_range, longitud, cuerpo):
+    """
+    Agrega al archivo parcial el trozo que viene en ``cuerpo`` (objeto con
+    read(), p. ej. el request). Devuelve (subida, adjunto); adjunto es None
+    mientras falten trozos.
+    """
+    coincidencia = _CONTENT_RANGE.match(content_range or '')
+    if not coincidencia:
+        raise SubidaInvalida("Falta la cabecera Content-Range: bytes inicio-fin/total.")
+    inicio, fin, total = (int(valor) for valor in coincidencia.groups())
+    if longitud != fin - inicio + 1 or longitud > settings.ADJUNTOS_TROZO_MAX_BYTES:
+        raise SubidaInvalida("Content-Length no coincide con Content-Range o el trozo es demasiado grande.")
+
+    subida = SubidaAdjunto.objects.get(pk=subida_id, subido_por=usuario)
+    if total != subida.tamano or fin >= subida.tamano:
+        raise SubidaInvalida("El rango no corresponde al tamaño declarado.")
+
+    with open(ruta_parcial(subida), 'r+b') as parcial:
+        # Un trozo a la vez por subida; se libera al cerrar el archivo
+        try:
+            fcntl.flock(parcial, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise SubidaInvalida("Ya se está recibiendo otro trozo de esta subida.", 409)
+        # Releído con el archivo bloqueado: ningún otro trozo lo mueve ahora
+        subida.recibido = SubidaAdjunto.objects.filter(pk=subida.pk).values_list('recibido', flat=True).get()
+        if inicio != subida.recibido:
+            raise SubidaInvalida("El trozo no empieza donde termina lo recibido.", 409)
+
+        parcial.seek(inicio)
+        restante = longitud
+        while restante:
+            datos = cuerpo.read(min(BLOQUE, restante))
+            if not datos:
+                raise SubidaInvalida("El cuerpo de la petición terminó antes de tiempo.")
+            parcial.write(datos)
+            restante -= len(datos)
+        # Si el trozo anterior se reintentó, descarta lo que sobró
+        parcial.truncate()
+        parcial.flush()
+
+        avanzo = SubidaAdjunto.objects.filter(pk=subida.pk, recibido=inicio).update(
+            recibido=fin + 1, fecha_actualizacion=timezone.now(),
+        )
+        if not avanzo:
+            raise SubidaInvalida("La subida cambió mientras se recibía el trozo.", 409)
+        subida.recibido = fin + 1
+
+    if subida.recibido < subida.tamano:
+        return subida, None
+    return subida, _completar(subida)
+
+
+def _sha256(ruta):
+    resumen = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        while bloque := archivo.read(1024 * 1024):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+def _completar(subida):
+    """Mueve el archivo completo a su lugar por contenido y crea el Adjunto."""
+    parcial = ruta_parcial(subida)
+    sha256 = _sha256(parcial)
+    tipo = mimetypes.guess_type(subida.nombre)[0] or 'application/octet-stream'
+    try:
+        with transaction.atomic():
+            contenido, creado = ContenidoAdjunto.objects.get_or_create(
+                sha256=sha256, defaults={'tamano': subida.tamano, 'tipo_contenido': tipo},
+            )
+    except IntegrityError:
+        # Otra subida del mismo archivo terminó a la vez
+        contenido, creado = ContenidoAdjunto.objects.get(sha256=sha256), False
+
+    destino = ruta_contenido(contenido)
+    if creado or not destino.exists():
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(parcial, destino)
+    else:
+        parcial.unlink()
+
+    with transaction.atomic():
+        adjunto = Adjunto.objects.create(
+            seguimiento_id=subida.seguimiento_id, etapa=subida.etapa, contenido=contenido,
+            nombre=subida.nombre, subido_por=subida.subido_por,
+        )
+        subida.delete()
+    return adjunto
+
+
+# --- Descarga ---
+
+def solicitud_de(adjunto):
+    """Solicitud (activa o archivada) del adjunto, para comprobar permisos."""
+    for modelo in (SeguimientoCompra, SeguimientoCompraArchivado):
+        seguimiento = modelo.objects.select_related('solicitud').filter(pk=adjunto.seguimiento_id).first()
+        if seguimiento:
+            return seguimiento.solicitud
+    return None
+
+
+def _rango(cabecera, tamano):
+    """(inicio, fin) de un único rango 'bytes=a-b'; None si no aplica; ValueError si no se puede satisfacer."""
+    coincidencia = _RANGO.match(cabecera.strip())
+    if not coincidencia or coincidencia.groups() == ('', ''):
+        return None
+    inicio, fin = coincidencia.groups()
+    if inicio == '':
+        # bytes=-N: los últimos N bytes
+        inicio, fin = max(tamano - int(fin), 0), tamano - 1
+    else:
+        inicio, fin = int(inicio), min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio > fin or inicio >= tamano:
+        raise ValueError
+    return inicio, fin
+
+
+class _Tramo:
+    """
+    Parte de un archivo abierto, para FileResponse. read() no pasa del final
+    del rango; fileno() permite que gunicorn use sendfile() desde la
+    posición actual con el Content-Length de la respuesta.
+    """
+
+    def __init__(self, archivo, inicio, longitud):
+        archivo.seek(inicio)
+        self._archivo = archivo
+        self._restante = longitud
+
+    def read(self, tamano=-1):
+        if self._restante <= 0:
+            return b''
+        tamano = self._restante if tamano is None or tamano < 0 else min(tamano, self._restante)
+        datos = self._archivo.read(tamano)
+        self._restante -= len(datos)
+        return datos
+
+    def fileno(self):
+        return self._archivo.fileno()
+
+    def close(self):
+        self._archivo.close()
+
+
+def respuesta_descarga(request, adjunto):
+    contenido = adjunto.contenido
+    etag = quote_etag(contenido.sha256)
+    disposicion = content_disposition_header(request.GET.get('descargar') == '1', adjunto.nombre)
+
+    if settings.ADJUNTOS_X_ACCEL_PREFIX:
+        response = HttpResponse(content_type=contenido.tipo_contenido)
+        response['X-Accel-Redirect'] = settings.ADJUNTOS_X_ACCEL_PREFIX.rstrip('/') + '/' + contenido.ruta_relativa
+    elif request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        tamano = contenido.tamano
+        rango = None
+        cabecera = request.headers.get('Range')
+        # If-Range: si el cliente tiene otra versión, se envía el archivo completo
+        if cabecera and request.headers.get('If-Range', etag) == etag:
+            try:
+                rango = _rango(cabecera, tamano)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f"bytes */{tamano}"
+                return response
+        archivo = open(ruta_contenido(contenido), 'rb')
+        if rango:
+            inicio, fin = rango
+            response = FileResponse(_Tramo(archivo, inicio, fin - inicio + 1), status=206, content_type=contenido.tipo_contenido)
+            response['Content-Range'] = f"bytes {inicio}-{fin}/{tamano}"
+            response['Content-Length'] = fin - inicio + 1
+        else:
+            response = FileResponse(archivo, content_type=contenido.tipo_contenido)
+            response['Content-Length'] = tamano
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Content-Disposition'] = disposicion
+    # El contenido de un adjunto no cambia nunca (se identifica por su hash)
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+# --- Limpieza ---
+
+def limpiar(horas_subidas=24):
+    """
+    Borra las subidas abandonadas, los adjuntos de seguimientos eliminados y
+    los contenidos que ya no usa ningún adjunto. Devuelve (subidas, adjuntos, contenidos).
+    """
+    limite = timezone.now() - timedelta(hours=horas_subidas)
+    subidas = 0
+    for subida in SubidaAdjunto.objects.filter(fecha_actualizacion__lt=limite):
+        ruta_parcial(subida).unlink(missing_ok=True)
+        subida.delete()
+        subidas += 1
+    # Parciales de subidas que se borraron con su seguimiento
+    directorio = raiz() / 'subidas'
+    if directorio.exists():
+        vigentes = {f"{pk}.part" for pk in SubidaAdjunto.objects.values_list('pk', flat=True)}
+        for parcial in directorio.iterdir():
+            if parcial.name not in vigentes and parcial.stat().st_mtime < limite.timestamp():
+                parcial.unlink(missing_ok=True)
+
+    huerfanos = Adjunto.objects.exclude(
+        seguimiento_id__in=SeguimientoCompra.objects.values('pk'),
+    ).exclude(
+        seguimiento_id__in=SeguimientoCompraArchivado.objects.values('pk'),
+    )
+    adjuntos = huerfanos.delete()[0]
+
+    contenidos = 0
+    for contenido in ContenidoAdjunto.objects.filter(adjuntos__isnull=True):
+        try:
+            contenido.delete()
+        except ProtectedError:
+            # Se adjuntó otra vez mientras tanto
+            continue
+        ruta_contenido(contenido).unlink(missing_ok=True)
+        contenidos += 1
+    return subidas, adjuntos, contenidos
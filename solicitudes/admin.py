@@ -1,3 +1,268 @@
-from django.contrib import admin
+from datetime import datetime
 
-# Register your models here.
+from django.contrib import admin, messages
+from django.db import router, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from accounts.models import Departamento
+
+from .eventos import registrar_al_confirmar, resumen_solicitud
+from .models import (
+    InstantaneaReporte, Proveedor, ReportePredefinido, SeguimientoCompra, SeguimientoCompraArchivado, Solicitud,
+    SolicitudArchivada,
+)
+
+
+# --- Filtros ---
+# Los filtros por defecto de Django para campos sin choices hacen un
+# SELECT DISTINCT sobre toda la tabla en cada carga del listado. Estos usan
+# valores fijos o consultas que resuelve un índice.
+
+class AnioFilter(admin.SimpleListFilter):
+    """Filtra por el año de fecha_creacion con un rango (usa el índice de la fecha)."""
+    title = 'año'
+    parameter_name = 'anio'
+    campo_fecha = 'fecha_creacion'
+    modelo = Solicitud
+
+    def lookups(self, request, model_admin):
+        # MIN/MAX sobre una columna indexada: dos lecturas del índice, no un DISTINCT
+        rango = self.modelo.objects.aggregate(desde=Min('fecha_creacion'), hasta=Max('fecha_creacion'))
+        if not rango['desde']:
+            return []
+        desde = timezone.localtime(rango['desde']).year
+        hasta = timezone.localtime(rango['hasta']).year
+        return [(str(anio), str(anio)) for anio in range(hasta, desde - 1, -1)]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        anio = int(self.value())
+        inicio = timezone.make_aware(datetime(anio, 1, 1))
+        fin = timezone.make_aware(datetime(anio + 1, 1, 1))
+        return queryset.filter(**{
+            f'{self.campo_fecha}__gte': inicio,
+            f'{self.campo_fecha}__lt': fin,
+        })
+
+
+class SeguimientoAnioFilter(AnioFilter):
+    campo_fecha = 'solicitud__fecha_creacion'
+
+
+class ArchivoAnioFilter(AnioFilter):
+    modelo = SolicitudArchivada
+
+
+class CondicionFilter(admin.SimpleListFilter):
+    """Condición exacta, igual que el filtro del reporte (el campo guarda 'valor1,valor2')."""
+    title = 'condición'
+    parameter_name = 'condicion'
+
+    def lookups(self, request, model_admin):
+        return SeguimientoCompra.CONDICION_CHOICES
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(condicion=self.value())
+        return queryset
+
+
+class DepartamentoSeguimientoFilter(admin.SimpleListFilter):
+    title = 'departamento'
+    parameter_name = 'departamento'
+
+    def lookups(self, request, model_admin):
+        # De la copia en memoria, sin consulta
+        departamentos = Departamento.objects.en_memoria().values()
+        return [(str(d.pk), d.nombre) for d in sorted(departamentos, key=lambda d: d.nombre)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(solicitud__departamento_id=self.value())
+        return queryset
+
+
+# --- Acciones masivas ---
+# Cada acción es un único UPDATE sobre la selección (queryset.update), sin
+# cargar ni guardar las filas una por una. update() no toca los campos
+# auto_now, por eso se asigna fecha_actualizacion a mano. Tampoco emite
+# post_save: los eventos de las actualizaciones en vivo (ver signals.py) se
+# registran aquí, uno por fila, al confirmarse la transacción.
+
+def _eventos_actualizadas(modelo, pks, using):
+    if modelo is SeguimientoCompra:
+        seguimientos = modelo.objects.using(using).filter(pk__in=pks).select_related('solicitud__departamento')
+        filas = [(seguimiento.solicitud, seguimiento) for seguimiento in seguimientos]
+    else:
+        solicitudes = modelo.objects.using(using).filter(pk__in=pks).select_related('departamento', 'seguimiento')
+        filas = [(solicitud, None) for solicitud in solicitudes]
+    for solicitud, seguimiento in filas:
+        registrar_al_confirmar(
+            'actualizada', solicitud.pk, solicitud.departamento_id, resumen_solicitud(solicitud, seguimiento),
+            using=using,
+        )
+
+
+def _accion_update(nombre, descripcion, **valores):
+    def accion(modeladmin, request, queryset):
+        # Las PKs antes del UPDATE: puede cambiar el campo por el que filtra el listado
+        pks = list(queryset.values_list('pk', flat=True))
+        using = router.db_for_write(queryset.model)
+        with transaction.atomic(using=using):
+            actualizados = queryset.model.objects.using(using).filter(pk__in=pks).update(
+                fecha_actualizacion=timezone.now(), **valores,
+            )
+            _eventos_actualizadas(queryset.model, pks, using)
+        modeladmin.message_user(request, f"{actualizados} registro(s) actualizados.", messages.SUCCESS)
+    accion.short_description = descripcion
+    accion.allowed_permissions = ('change',)
+    accion.__name__ = nombre
+    return accion
+
+
+@admin.register(Solicitud)
+class SolicitudAdmin(admin.ModelAdmin):
+    list_display = (
+        'ref_departamento', 'departamento', 'solicitante', 'tipo_compra',
+        'urgente', 'monto_comprometido_sbs', 'fecha_creacion',
+    )
+    list_display_links = ('ref_departamento',)
+    list_filter = ('departamento', AnioFilter, 'tipo_compra', 'urgente')
+    list_select_related = ('solicitante',)
+    search_fields = ('^ref_departamento', 'descripcion_pedido')
+    autocomplete_fields = ('solicitante',)
+    readonly_fields = ('ref_departamento', 'fecha_creacion', 'fecha_actualizacion')
+    date_hierarchy = 'fecha_creacion'
+    ordering = ('-fecha_creacion',)
+    show_full_result_count = False
+    list_per_page = 50
+    actions = (
+        _accion_update('marcar_urgentes', "Marcar como urgentes", urgente='Aplica'),
+        _accion_update('marcar_no_urgentes', "Marcar como no urgentes", urgente='No Aplica'),
+    )
+
+
+@admin.register(SeguimientoCompra)
+class SeguimientoCompraAdmin(admin.ModelAdmin):
+    list_display = (
+        'referencia', 'departamento', 'solicitante', 'sbs_numero', 'oc_numero',
+        'condicion', 'status_final_compra', 'vencimiento_oc',
+    )
+    list_filter = (DepartamentoSeguimientoFilter, SeguimientoAnioFilter, CondicionFilter, 'status_final_compra')
+    list_select_related = ('solicitud', 'solicitud__solicitante')
+    search_fields = ('^solicitud__ref_departamento', '^sbs_numero', '^oc_numero')
+    autocomplete_fields = ('solicitud',)
+    # proveedor_catalogo se asigna en save() a partir del texto de proveedor
+    readonly_fields = ('vencimiento_oc', 'proveedor_catalogo', 'fecha_actualizacion')
+    date_hierarchy = 'solicitud__fecha_creacion'
+    ordering = ('-solicitud__fecha_creacion',)
+    show_full_result_count = False
+    list_per_page = 50
+    actions = tuple(
+        _accion_update(f'condicion_{codigo}', f"Cambiar condición a «{etiqueta}»", condicion=codigo)
+        for codigo, etiqueta in SeguimientoCompra.CONDICION_CHOICES
+    ) + tuple(
+        _accion_update(f'status_final_{n}', f"Cambiar estado final a «{etiqueta}»", status_final_compra=codigo)
+        for n, (codigo, etiqueta) in enumerate(SeguimientoCompra.STATUS_FINAL_CHOICES)
+    )
+
+    @admin.display(description='Referencia', ordering='solicitud__ref_departamento')
+    def referencia(self, obj):
+        return obj.solicitud.ref_departamento
+
+    @admin.display(description='Departamento', ordering='solicitud__departamento__nombre')
+    def departamento(self, obj):
+        return obj.solicitud.departamento
+
+    @admin.display(description='Solicitante', ordering='solicitud__solicitante__username')
+    def solicitante(self, obj):
+        return obj.solicitud.solicitante
+
+
+@admin.register(Proveedor)
+class ProveedorAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'clave', 'cantidad_oc', 'total_oc')
+    search_fields = ('^clave', '^nombre')
+    readonly_fields = ('clave', 'fecha_creacion')
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        # Totales agrupados por la FK (índice de proveedor_catalogo_id)
+        return super().get_queryset(request).annotate(
+            cantidad=Count('seguimientos'),
+            total=Sum('seguimientos__monto_oc'),
+        )
+
+    @admin.display(description='Órdenes de compra', ordering='cantidad')
+    def cantidad_oc(self, obj):
+        return obj.cantidad
+
+    @admin.display(description='Monto total OC', ordering='total')
+    def total_oc(self, obj):
+        return obj.total or 0
+
+
+# --- Archivo histórico (solo consulta; lo llena la tarea archivar_solicitudes) ---
+
+class SoloLecturaAdmin(admin.ModelAdmin):
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SolicitudArchivada)
+class SolicitudArchivadaAdmin(SoloLecturaAdmin):
+    list_display = (
+        'ref_departamento', 'departamento', 'solicitante', 'tipo_compra',
+        'monto_comprometido_sbs', 'fecha_creacion', 'fecha_archivado',
+    )
+    list_filter = ('departamento', ArchivoAnioFilter, 'tipo_compra')
+    list_select_related = ('solicitante',)
+    search_fields = ('^ref_departamento', 'descripcion_pedido')
+    date_hierarchy = 'fecha_creacion'
+    ordering = ('-fecha_creacion',)
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(SeguimientoCompraArchivado)
+class SeguimientoCompraArchivadoAdmin(SoloLecturaAdmin):
+    list_display = ('referencia', 'sbs_numero', 'oc_numero', 'condicion', 'status_final_compra', 'monto_oc')
+    list_filter = (CondicionFilter, 'status_final_compra')
+    list_select_related = ('solicitud',)
+    search_fields = ('^solicitud__ref_departamento', '^sbs_numero', '^oc_numero')
+    ordering = ('-solicitud__fecha_creacion',)
+    show_full_result_count = False
+    list_per_page = 50
+
+    @admin.display(description='Referencia', ordering='solicitud__ref_departamento')
+    def referencia(self, obj):
+        return obj.solicitud.ref_departamento
+
+
+# --- Reportes predefinidos (ver predefinidos.py) ---
+
+class InstantaneaReporteInline(admin.TabularInline):
+    model = InstantaneaReporte
+    fields = ('alcance', 'fecha_calculo', 'total_filas', 'total_monto_oc', 'archivo')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ReportePredefinido)
+class ReportePredefinidoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'propietario', 'departamento', 'fecha_creacion')
+    list_filter = ('departamento',)
+    list_select_related = ('propietario',)
+    search_fields = ('nombre',)
+    inlines = [InstantaneaReporteInline]
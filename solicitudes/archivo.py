@@ -0,0 +1,103 @@
+# solicitudes/archivo.py
+"""
+Archivo histórico de solicitudes cerradas.
+
+Las solicitudes finalizadas o anuladas de años anteriores casi no se
+consultan, pero hacen crecer los índices del listado y del reporte. Esta
+tarea las mueve, con su seguimiento, a SolicitudArchivada y
+SeguimientoCompraArchivado (misma forma, mismos ids). El reporte las sigue
+mostrando con la casilla "Incluir archivo" (queries.seguimientos_reporte).
+
+Se procesa por lotes de ARCHIVO_LOTE solicitudes y cada lote es una
+transacción: se copian con bulk_create y se borran de las tablas activas.
+Si el proceso se corta, lo ya archivado queda archivado y el resto sigue
+en las tablas activas; basta volver a ejecutarlo. Al borrar se emite el
+evento 'eliminada' (signals.py), así el listado en vivo las quita, y la
+exportación incremental las informa como archivadas.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cambios import nombre_tabla
+from .models import RegistroBorrado, SeguimientoCompra, SeguimientoCompraArchivado, Solicitud, SolicitudArchivada
+
+# Valores de SeguimientoCompra.condicion que cierran una solicitud
+CONDICIONES_CERRADAS = ('finalizado', 'anulado')
+
+
+def fecha_limite(anios_activos=None):
+    """Se archivan las solicitudes creadas antes de esta fecha (1 de enero)."""
+    if anios_activos is None:
+        anios_activos = settings.ARCHIVO_ANIOS_ACTIVOS
+    anio = timezone.localdate().year - max(int(anios_activos), 1) + 1
+    return timezone.make_aware(datetime(anio, 1, 1))
+
+
+def archivables(limite):
+    """Solicitudes creadas antes de ``limite`` cuyo seguimiento está cerrado."""
+    # condicion guarda 'valor1,valor2'
+    cerradas = Q()
+    for condicion in CONDICIONES_CERRADAS:
+        cerradas |= Q(seguimiento__condicion__contains=condicion)
+    return Solicitud.objects.filter(cerradas, fecha_creacion__lt=limite)
+
+
+def _copia(modelo, original):
+    """Instancia de ``modelo`` con los mismos valores de columna que ``original``."""
+    return modelo(**{
+        campo.attname: getattr(original, campo.attname)
+        for campo in modelo._meta.concrete_fields
+        if hasattr(original, campo.attname)
+    })
+
+
+def archivar_lote(ids, limite):
+    """Mueve al archivo las solicitudes ``ids`` que sigan siendo archivables. Devuelve cuántas."""
+    with transaction.atomic():
+        # Se vuelve a comprobar con las filas bloqueadas: pudieron reabrirse
+        # entre la selección del lote y este momento.
+        solicitudes = list(
+            archivables(limite).select_for_update().filter(pk__in=ids).order_by('pk')
+        )
+        if not solicitudes:
+            return 0
+        seguimientos = list(SeguimientoCompra.objects.filter(solicitud__in=solicitudes).order_by('pk'))
+
+        SolicitudArchivada.objects.bulk_create([_copia(SolicitudArchivada, s) for s in solicitudes])
+        SeguimientoCompraArchivado.objects.bulk_create([_copia(SeguimientoCompraArchivado, s) for s in seguimientos])
+        # El seguimiento se borra en cascada
+        Solicitud.objects.filter(pk__in=[s.pk for s in solicitudes]).delete()
+        # Las lápidas que deja el borrado (signals.py) no son bajas para la
+        # exportación incremental (cambios.py): las filas siguen en el archivo
+        for modelo, filas in ((Solicitud, solicitudes), (SeguimientoCompra, seguimientos)):
+            RegistroBorrado.objects.filter(
+                tabla=nombre_tabla(modelo), objeto_id__in=[f.pk for f in filas],
+            ).update(motivo=RegistroBorrado.ARCHIVADA)
+    return len(solicitudes)
+
+
+def archivar(anios_activos=None, lote=None, progreso=None):
+    """
+    Archiva todas las solicitudes archivables, de a ``lote`` por transacción.
+    ``progreso(archivadas, total)`` se llama después de cada lote.
+    """
+    limite = fecha_limite(anios_activos)
+    lote = lote or settings.ARCHIVO_LOTE
+    queryset = archivables(limite).order_by('pk')
+    total = queryset.count()
+    archivadas = 0
+    ultimo = 0
+    while True:
+        # Por rango de la PK: cada lote empieza donde terminó el anterior
+        ids = list(queryset.filter(pk__gt=ultimo).values_list('pk', flat=True)[:lote])
+        if not ids:
+            break
+        ultimo = ids[-1]
+        archivadas += archivar_lote(ids, limite)
+        if progreso:
+            progreso(archivadas, max(total, archivadas, 1))
+    return archivadas
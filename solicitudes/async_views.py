@@ -0,0 +1,241 @@
+# solicitudes/async_views.py
+"""
+Versiones asíncronas (ASGI) del listado, del reporte y de su exportación.
+
+Se usan cuando la aplicación corre con lraa_project/asgi.py (ver urls.py). En
+vez de bloquear un worker mientras espera a la base de datos, la vista cede el
+event loop y el servidor puede atender otras peticiones.
+
+Las consultas independientes (filas de la página, conteo total y suma del
+monto) se lanzan a la vez con asyncio.gather. Los métodos async del ORM
+(acount, aaggregate...) ejecutan todas las consultas de una petición en un
+mismo hilo, una tras otra; por eso ``_en_paralelo`` las envía a un pequeño
+pool de hilos propio, donde cada hilo conserva su conexión (CONN_MAX_AGE)
+y las consultas realmente se solapan. La exportación usa aiterator().
+
+SolicitudEventosView (actualizaciones en vivo) espera los eventos sin
+ocupar un hilo; con WSGI se usa la versión de views.py (ver eventos.py).
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.mixins import AccessMixin
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import close_old_connections
+from django.db.models import Sum
+from django.http import Http404, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.views import View
+
+from lraa_project.routers import alias_de_lectura, leer_de_replica
+
+from .eventos import (
+    BLOQUE_PENDIENTES, broker, corresponde, mensaje_sse, pendientes, respuesta_sse, ultimo_recibido,
+)
+from .exports import NOMBRE_ARCHIVO_CSV, afilas_csv
+from .impresion import apartes_impresion, nombre_usuario, respuesta_impresion
+from .forms import SeguimientoFilterForm
+from .mixins import es_fragmento, marcar_vary_fragmento, plantilla_para
+from .models import ReportePredefinido
+from .permisos import capacidades
+from .queries import pagina_por_cursor, solicitudes_listado, seguimientos_reporte
+
+_db_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix='lraa-db')
+
+
+def _ejecutar_consulta(funcion):
+    # Igual que al inicio y al final de una petición: descarta conexiones
+    # caducadas o rotas según CONN_MAX_AGE / CONN_HEALTH_CHECKS.
+    close_old_connections()
+    try:
+        return funcion()
+    finally:
+        close_old_connections()
+
+
+async def _en_paralelo(funcion):
+    """Ejecuta ``funcion`` (una consulta síncrona del ORM) en el pool de hilos de BD."""
+    return await sync_to_async(_ejecutar_consulta, thread_sensitive=False, executor=_db_executor)(funcion)
+
+
+async def _paginar(request, queryset, por_pagina, *consultas_extra, por_cursor=None):
+    """
+    Devuelve (page_obj, resultados_extra). Obtiene las filas de la página y el
+    conteo total a la vez, junto con cualquier consulta extra (p. ej. totales).
+    ``por_cursor``, si se da, devuelve las filas de la página sin OFFSET o
+    None si no aplica (ver queries.pagina_por_cursor).
+    """
+    try:
+        numero = int(request.GET.get('page') or 1)
+    except ValueError:
+        raise Http404('Página inválida.')
+    if numero < 1:
+        raise Http404('Página inválida.')
+
+    inicio = (numero - 1) * por_pagina
+
+    def filas():
+        pagina = por_cursor() if por_cursor else None
+        return pagina if pagina is not None else list(queryset[inicio:inicio + por_pagina])
+
+    resultados = await asyncio.gather(
+        _en_paralelo(filas),
+        _en_paralelo(queryset.count),
+        *(_en_paralelo(consulta) for consulta in consultas_extra),
+    )
+    object_list, total, extra = resultados[0], resultados[1], resultados[2:]
+
+    paginator = Paginator(queryset, por_pagina)
+    paginator.count = total  # ya calculado; evita que Paginator repita el COUNT
+    try:
+        paginator.validate_number(numero)
+    except InvalidPage as e:
+        raise Http404(str(e))
+    return Page(object_list, numero, paginator), extra
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """
+    Equivalente de LoginRequiredMixin para vistas async: carga el usuario con
+    request.auser() en lugar de acceder a request.user (que haría una
+    consulta síncrona dentro del event loop).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        return self._async_dispatch(request, *args, **kwargs)
+
+    async def _async_dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        # El alcance depende del departamento del usuario, que puede requerir
+        # una consulta (accounts.models.DepartamentoManager): se calcula
+        # aquí, fuera del event loop, y queda guardado en las capacidades
+        await sync_to_async(lambda: capacidades(request.user).ve_todo)()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncSolicitudListView(AsyncLoginRequiredMixin, View):
+    template_name = 'solicitudes/solicitud_list.html'
+    fragment_template_name = 'solicitudes/partials/solicitud_list_resultados.html'
+    paginate_by = 10
+
+    async def get(self, request, *args, **kwargs):
+        with leer_de_replica():
+            queryset = solicitudes_listado(request.user, request.GET.get('q'))
+            page_obj, _ = await _paginar(request, queryset, self.paginate_by)
+
+        template = plantilla_para(request, self.template_name, self.fragment_template_name)
+        return marcar_vary_fragmento(TemplateResponse(request, template, {
+            'solicitudes': page_obj.object_list,
+            'object_list': page_obj.object_list,
+            'page_obj': page_obj,
+            'paginator': page_obj.paginator,
+            'is_paginated': page_obj.has_other_pages(),
+        }, using=settings.PLANTILLAS_MOTOR))
+
+
+class AsyncSeguimientoReportView(AsyncLoginRequiredMixin, View):
+    template_name = 'solicitudes/seguimiento_report.html'
+    fragment_template_name = 'solicitudes/partials/seguimiento_report_resultados.html'
+    paginate_by = 10
+
+    async def get(self, request, *args, **kwargs):
+        filter_form = SeguimientoFilterForm(request.GET)
+        with leer_de_replica():
+            queryset = seguimientos_reporte(request.user, filter_form)
+
+            if request.GET.get('print'):
+                # Reporte completo para imprimir: sin paginación, por partes (ver impresion.py)
+                queryset = queryset.using(await sync_to_async(alias_de_lectura)(queryset.model))
+                return respuesta_impresion(request, apartes_impresion(queryset, nombre_usuario(request.user)))
+
+            orden = filter_form.cleaned_data.get('orden') if filter_form.is_valid() else ''
+            page_obj, (totales,) = await _paginar(
+                request, queryset, self.paginate_by,
+                lambda: queryset.aggregate(total=Sum('monto_oc')),
+                por_cursor=lambda: pagina_por_cursor(
+                    queryset, orden, request.GET.get('despues'), request.GET.get('antes'), self.paginate_by,
+                ),
+            )
+
+            predefinidos = None
+            if not es_fragmento(request):
+                predefinidos = await _en_paralelo(
+                    lambda: list(ReportePredefinido.objects.disponibles_para(request.user))
+                )
+
+        template = plantilla_para(request, self.template_name, self.fragment_template_name)
+        return marcar_vary_fragmento(TemplateResponse(request, template, {
+            'predefinidos': predefinidos,
+            'seguimientos': page_obj.object_list,
+            'object_list': page_obj.object_list,
+            'page_obj': page_obj,
+            'paginator': page_obj.paginator,
+            'is_paginated': page_obj.has_other_pages(),
+            'filter_form': filter_form,
+            'total_monto_oc': totales['total'] or 0.00,
+        }, using=settings.PLANTILLAS_MOTOR))
+
+
+class AsyncSeguimientoExportView(AsyncLoginRequiredMixin, View):
+    """
+    Exporta el reporte filtrado a CSV. La respuesta se envía por partes a
+    medida que llegan las filas (aiterator), sin cargar todo en memoria ni
+    ocupar un worker mientras tanto.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        queryset = seguimientos_reporte(request.user, SeguimientoFilterForm(request.GET))
+        # Se fija la réplica aquí: el cuerpo se genera después de que la
+        # vista retorna, ya fuera de cualquier bloque leer_de_replica().
+        queryset = queryset.using(await sync_to_async(alias_de_lectura)(queryset.model))
+        response = StreamingHttpResponse(afilas_csv(queryset), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{NOMBRE_ARCHIVO_CSV}"'
+        return response
+
+
+class SolicitudEventosView(AsyncLoginRequiredMixin, View):
+    """
+    Server-sent events con los cambios de las solicitudes que el usuario ve
+    en el listado (mismo alcance por departamento). Ver eventos.py.
+
+    Al reconectar, el navegador envía Last-Event-ID y se le reenvían desde la
+    tabla los eventos que se perdió. La conexión se cierra sola a los
+    LIVE_UPDATES_STREAM_SECONDS y el navegador vuelve a abrirla.
+    """
+    intervalo_ping = 20
+
+    async def get(self, request, *args, **kwargs):
+        departamento = capacidades(request.user).departamento_visible
+        return respuesta_sse(self._flujo(departamento, ultimo_recibido(request)))
+
+    async def _flujo(self, departamento, desde):
+        loop = asyncio.get_running_loop()
+        # Suscrito antes de leer los pendientes, para no perder nada entre medio
+        suscriptor = broker.suscribir()
+        _, cola = suscriptor
+        try:
+            yield "retry: 5000\n\n"
+            while desde:
+                bloque = await _en_paralelo(lambda: pendientes(desde, departamento))
+                for evento in bloque:
+                    desde = evento.pk
+                    yield mensaje_sse(evento.como_mensaje())
+                if len(bloque) < BLOQUE_PENDIENTES:
+                    break
+
+            fin = loop.time() + settings.LIVE_UPDATES_STREAM_SECONDS
+            while (restante := fin - loop.time()) > 0:
+                try:
+                    mensaje = await asyncio.wait_for(cola.get(), timeout=min(self.intervalo_ping, restante))
+                except asyncio.TimeoutError:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield ": ping\n\n"
+                    continue
+                if corresponde(mensaje, desde, departamento):
+                    yield mensaje_sse(mensaje)
+        finally:
+            broker.desuscribir(suscriptor)
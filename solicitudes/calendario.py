@@ -0,0 +1,243 @@
+# solicitudes/calendario.py
+"""
+Calendario ICS con el vencimiento de las OC, los nuevos plazos de entrega y
+las fechas de los servicios (mantenimiento, calibración, caracterización),
+para suscribirse desde Outlook, Google Calendar, etc.
+
+* Cada usuario tiene un enlace con token (TokenCalendario); el calendario se
+  descarga sin sesión. ``nuevo_token`` revoca el anterior.
+* El contenido depende solo del alcance de permisos
+  (Capacidades.departamento_visible): quienes ven lo mismo comparten el
+  calendario de la caché, como las instantáneas de predefinidos.py.
+* Se arma con una consulta por campo de fecha, cada una por el rango de su
+  índice: de CALENDARIO_DIAS_ATRAS a CALENDARIO_DIAS_ADELANTE días de hoy.
+* Queda en la caché hasta que cambia un seguimiento que está en él o que
+  ahora cae en su rango (``cambio_seguimiento``, desde signals.py), hasta el
+  recálculo masivo de vencimientos (``invalidar``) o hasta cambiar el día.
+* Lleva ETag (resumen del contenido): un cliente que pregunta cada pocos
+  minutos recibe 304 sin cuerpo, y con el token y el usuario en la caché
+  no toca la base de datos.
+
+Se calcula contra 'default' y no contra la réplica: se regenera justo
+después del commit que lo invalidó y la réplica podría no tenerlo todavía.
+"""
+import hashlib
+import secrets
+from datetime import UTC, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from accounts.backends import CachedModelBackend
+from accounts.models import Departamento
+
+from .exports import CHUNK_SIZE
+from .models import SeguimientoCompra, TokenCalendario
+
+PREFIJO = 'calendario'
+# (campo de fecha, título del evento)
+EVENTOS = (
+    ('vencimiento_oc', "Vence OC"),
+    ('nuevo_plazo_entrega', "Nuevo plazo de entrega"),
+    ('fecha_inicial_mant_calib_caract', "Servicio"),
+)
+SERVICIOS = (
+    ('mantenimiento', "mantenimiento"),
+    ('calibracion', "calibración"),
+    ('caracterizacion', "caracterización"),
+)
+PRODID = '-//LRAA//Seguimiento SBS//ES'
+# Cada cuánto se sugiere a los clientes volver a preguntar
+REFRESCO = 'PT15M'
+
+
+# --- Token ---
+
+def _clave_token(token):
+    return f"{PREFIJO}:token:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+def nuevo_token(usuario):
+    """Genera (o reemplaza) el token del usuario y lo devuelve."""
+    anterior = TokenCalendario.objects.filter(usuario=usuario).values_list('token', flat=True).first()
+    token = secrets.token_urlsafe(32)
+    TokenCalendario.objects.update_or_create(usuario=usuario, defaults={'token': token})
+    if anterior:
+        cache.delete(_clave_token(anterior))
+    return token
+
+
+def usuario_del_token(token):
+    """El usuario (activo) del token, o None. Token y usuario salen de la caché."""
+    clave = _clave_token(token)
+    user_id = cache.get(clave)
+    if user_id is None:
+        user_id = TokenCalendario.objects.filter(token=token).values_list('usuario_id', flat=True).first()
+        if user_id is None:
+            return None
+        cache.set(clave, user_id, settings.CALENDARIO_CACHE_SECONDS)
+    # Usuario de la caché de accounts/backends.py (None si se desactivó o se borró)
+    return CachedModelBackend().get_user(user_id)
+
+
+# --- Contenido ---
+
+def _rango(hoy):
+    return hoy - timedelta(days=settings.CALENDARIO_DIAS_ATRAS), hoy + timedelta(days=settings.CALENDARIO_DIAS_ADELANTE)
+
+
+def _clave(alcance, hoy):
+    return f"{PREFIJO}:{alcance or 'todos'}:{hoy:%Y%m%d}"
+
+
+def _texto(valor):
+    """Escapa un valor de texto (RFC 5545, 3.3.11)."""
+    return (
+        str(valor).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _plegar(linea):
+    """Parte las líneas de más de 75 octetos sin cortar un carácter UTF-8."""
+    partes = []
+    actual = ''
+    for caracter in linea:
+        if len((actual + caracter).encode()) > (75 if not partes else 74):
+            partes.append(actual)
+            actual = ''
+        actual += caracter
+    partes.append(actual)
+    return '\r\n '.join(partes)
+
+
+def _titulo(campo, titulo, seguimiento):
+    if campo == 'vencimiento_oc' and seguimiento.oc_numero:
+        titulo = f"{titulo} {seguimiento.oc_numero}"
+    elif campo == 'fecha_inicial_mant_calib_caract':
+        servicios = [nombre for atributo, nombre in SERVICIOS if getattr(seguimiento, atributo)]
+        if servicios:
+            titulo = f"{titulo} de {', '.join(servicios)}"
+    return f"{titulo} · {seguimiento.solicitud.ref_departamento}"
+
+
+def _evento(campo, titulo, seguimiento, url_detalle):
+    solicitud = seguimiento.solicitud
+    fecha = getattr(seguimiento, campo)
+    detalle = [
+        solicitud.descripcion_pedido,
+        f"SBS: {seguimiento.sbs_numero or '--'}",
+        f"OC: {seguimiento.oc_numero or '--'}",
+        f"Proveedor: {seguimiento.proveedor or '--'}",
+    ]
+    return [
+        'BEGIN:VEVENT',
+        f'UID:{campo}-{seguimiento.pk}@lraa-seguimiento-sbs',
+        # Última modificación y no la hora de generar: el mismo contenido da el mismo ETag
+        f"DTSTAMP:{seguimiento.fecha_actualizacion.astimezone(UTC):%Y%m%dT%H%M%SZ}",
+        f'DTSTART;VALUE=DATE:{fecha:%Y%m%d}',
+        f'DTEND;VALUE=DATE:{fecha + timedelta(days=1):%Y%m%d}',
+        f'SUMMARY:{_texto(_titulo(campo, titulo, seguimiento))}',
+        f'DESCRIPTION:{_texto(chr(10).join(detalle))}',
+        f'URL:{url_detalle(solicitud.pk)}',
+        'TRANSP:TRANSPARENT',
+        'END:VEVENT',
+    ]
+
+
+def generar(alcance, url_detalle):
+    """
+    Arma el calendario del alcance. Devuelve {'ics', 'etag', 'solicitudes'}:
+    el contenido, su ETag y los ids de las solicitudes que aparecen (para
+    saber si un cambio lo afecta).
+    """
+    hoy = timezone.localdate()
+    desde, hasta = _rango(hoy)
+    departamento = Departamento.objects.por_id(alcance) if alcance else None
+    lineas = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{_texto('Seguimiento SBS' + (f' - {departamento}' if departamento else ''))}",
+        f'X-WR-TIMEZONE:{settings.TIME_ZONE}',
+        f'REFRESH-INTERVAL;VALUE=DURATION:{REFRESCO}',
+        f'X-PUBLISHED-TTL:{REFRESCO}',
+    ]
+    solicitudes = set()
+    base = (
+        SeguimientoCompra.objects.using('default').del_alcance(alcance)
+        .select_related('solicitud')
+        .only(
+            'id', 'solicitud_id', 'sbs_numero', 'oc_numero', 'proveedor', 'fecha_actualizacion',
+            'mantenimiento', 'calibracion', 'caracterizacion', *(campo for campo, _ in EVENTOS),
+            'solicitud__ref_departamento', 'solicitud__descripcion_pedido',
+        )
+    )
+    for campo, titulo in EVENTOS:
+        consulta = base.filter(**{f'{campo}__range': (desde, hasta)}).order_by(campo, 'id')
+        for seguimiento in consulta.iterator(chunk_size=CHUNK_SIZE):
+            solicitudes.add(seguimiento.solicitud_id)
+            lineas.extend(_evento(campo, titulo, seguimiento, url_detalle))
+    lineas.append('END:VCALENDAR')
+
+    ics = ('\r\n'.join(_plegar(linea) for linea in lineas) + '\r\n').encode()
+    return {
+        'ics': ics,
+        'etag': f'"{hashlib.sha1(ics).hexdigest()}"',
+        'solicitudes': solicitudes,
+    }
+
+
+def calendario(alcance, url_detalle):
+    """El calendario del alcance, de la caché o recién generado."""
+    clave = _clave(alcance, timezone.localdate())
+    entrada = cache.get(clave)
+    if entrada is None:
+        entrada = generar(alcance, url_detalle)
+        cache.set(clave, entrada, settings.CALENDARIO_CACHE_SECONDS)
+    return entrada
+
+
+# --- Invalidación ---
+
+def _claves_de_hoy(*alcances):
+    """Claves de hoy de los ``alcances`` (por defecto todos: cada departamento y None)."""
+    hoy = timezone.localdate()
+    return [_clave(alcance, hoy) for alcance in (alcances or (None, *Departamento.objects.en_memoria()))]
+
+
+def invalidar():
+    """Descarta todos los calendarios (cambios masivos, p. ej. recalcular_vencimientos)."""
+    cache.delete_many(_claves_de_hoy())
+
+
+def cambio_seguimiento(solicitud_id, departamento_id, fechas=()):
+    """
+    Descarta los calendarios que afecta el cambio de la solicitud
+    ``solicitud_id`` o de su seguimiento: los que ya la muestran (también
+    el del departamento anterior si la solicitud cambió de departamento) y,
+    si alguna de sus ``fechas`` cae en el rango, los que ahora la mostrarían.
+    """
+    desde, hasta = _rango(timezone.localdate())
+    nuevos = set()
+    if any(fecha and desde <= fecha <= hasta for fecha in fechas):
+        nuevos = set(_claves_de_hoy(None, departamento_id))
+    guardados = cache.get_many(_claves_de_hoy())
+    afectados = [
+        clave for clave, entrada in guardados.items()
+        if clave in nuevos or solicitud_id in entrada['solicitudes']
+    ]
+    if afectados:
+        cache.delete_many(afectados)
+
+
+def cambio_solicitud(solicitud):
+    """Como ``cambio_seguimiento``, para una solicitud guardada (referencia, descripción, departamento)."""
+    fechas = (
+        SeguimientoCompra.objects.filter(solicitud_id=solicitud.pk)
+        .values_list(*(campo for campo, _ in EVENTOS)).first()
+    )
+    cambio_seguimiento(solicitud.pk, solicitud.departamento_id, fechas or ())
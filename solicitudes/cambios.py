@@ -0,0 +1,182 @@
+# solicitudes/cambios.py
+"""
+Exportación incremental de solicitudes y seguimientos (comando
+``exportar_cambios`` y tarea del mismo nombre).
+
+Cada corrida exporta las filas con fecha_actualizacion en la ventana
+(marca de agua anterior, ahora - CAMBIOS_MARGEN_SEGUNDOS] y las lápidas de
+RegistroBorrado de la misma ventana. El margen deja fuera las transacciones
+que guardaron hace un instante y todavía no confirmaron; las toma la
+corrida siguiente.
+
+Los archivos van a CAMBIOS_DIR/<destino>/<hasta>/, uno por bloque de
+CAMBIOS_LOTE filas (``solicitudes-00001.jsonl.gz``...), y al final
+``manifiesto.json`` con la ventana y la lista de archivos. Cada tabla se
+recorre por rangos de la PK con SELECT simples (lecturas consistentes de
+InnoDB, sin bloqueos). El avance se guarda en PuntoControlCambios después de
+escribir cada bloque: si el proceso se corta, la siguiente ejecución retoma
+la misma ventana desde el último bloque completo y reescribe el que quedó a
+medias, así que el resultado es el mismo.
+
+Con ``completo`` se exporta todo (sin ventana inferior ni lápidas). Las
+solicitudes movidas al archivo histórico aparecen como lápidas con motivo
+'archivada'.
+"""
+import csv
+import gzip
+import json
+import os
+from datetime import timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Min
+from django.utils import timezone
+
+from accounts.models import Departamento
+
+from .models import InstantaneaReporte, PuntoControlCambios, RegistroBorrado, SeguimientoCompra, Solicitud
+
+FORMATOS = ('jsonl', 'csv')
+
+# Nombre en la exportación -> modelo. Las lápidas usan los mismos nombres.
+# Las solicitudes traen departamento_id; el nombre sale de 'departamentos'.
+TABLAS = {
+    'departamentos': Departamento,
+    'solicitudes': Solicitud,
+    'seguimientos': SeguimientoCompra,
+}
+TABLA_BORRADOS = 'borrados'
+
+
+def nombre_tabla(modelo):
+    for nombre, tabla in TABLAS.items():
+        if tabla is modelo:
+            return nombre
+    return modelo._meta.db_table
+
+
+def _columnas(modelo):
+    # La PK va primero (concrete_fields empieza por 'id'): el avance se guarda por ella
+    return [campo.attname for campo in modelo._meta.concrete_fields]
+
+
+def _consultas(punto):
+    """(nombre, queryset, columnas) de cada tabla para la ventana de la corrida."""
+    ventana = {'fecha_actualizacion__lte': punto.corrida_hasta}
+    if punto.corrida_desde:
+        ventana['fecha_actualizacion__gt'] = punto.corrida_desde
+    consultas = [
+        (nombre, modelo.objects.filter(**ventana), _columnas(modelo))
+        for nombre, modelo in TABLAS.items()
+    ]
+    if punto.corrida_desde:
+        borrados = RegistroBorrado.objects.filter(fecha__gt=punto.corrida_desde, fecha__lte=punto.corrida_hasta)
+        consultas.append((TABLA_BORRADOS, borrados, _columnas(RegistroBorrado)))
+    return consultas
+
+
+def _escribir(ruta, columnas, filas, formato):
+    """Escribe el bloque en un temporal y lo renombra: el archivo final está completo o no existe."""
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    with gzip.open(temporal, 'wt', encoding='utf-8', newline='') as salida:
+        if formato == 'csv':
+            writer = csv.writer(salida)
+            writer.writerow(columnas)
+            writer.writerows(filas)
+        else:
+            for fila in filas:
+                salida.write(json.dumps(dict(zip(columnas, fila)), cls=DjangoJSONEncoder, ensure_ascii=False))
+                salida.write('\n')
+    os.replace(temporal, ruta)
+
+
+def directorio_corrida(punto):
+    marca = punto.corrida_hasta.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    sufijo = '' if punto.corrida_desde else '-completo'
+    return Path(settings.CAMBIOS_DIR) / punto.nombre / f"{marca}{sufijo}"
+
+
+def iniciar_corrida(punto, formato, completo=False):
+    punto.corrida_desde = None if completo else punto.marca_agua
+    punto.corrida_hasta = timezone.now() - timedelta(seconds=settings.CAMBIOS_MARGEN_SEGUNDOS)
+    punto.corrida_formato = formato
+    punto.avance = {}
+    punto.save()
+
+
+def exportar_cambios(nombre='default', formato='jsonl', completo=False, lote=None, progreso=None):
+    """
+    Ejecuta (o retoma) la corrida del destino ``nombre`` y devuelve el
+    manifiesto. ``progreso(tabla, filas)`` se llama después de cada bloque.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato} (opciones: {', '.join(FORMATOS)})")
+    lote = lote or settings.CAMBIOS_LOTE
+    punto, _ = PuntoControlCambios.objects.get_or_create(nombre=nombre)
+    if completo or not punto.en_curso:
+        # Una corrida a medias se retoma con su ventana y su formato, salvo
+        # que se pida explícitamente una exportación completa
+        iniciar_corrida(punto, formato, completo)
+
+    directorio = directorio_corrida(punto)
+    directorio.mkdir(parents=True, exist_ok=True)
+    extension = 'csv.gz' if punto.corrida_formato == 'csv' else 'jsonl.gz'
+
+    for tabla, queryset, columnas in _consultas(punto):
+        estado = punto.avance.setdefault(tabla, {'ultimo_pk': 0, 'archivos': [], 'filas': 0, 'terminada': False})
+        while not estado['terminada']:
+            filas = list(
+                queryset.filter(pk__gt=estado['ultimo_pk']).order_by('pk').values_list(*columnas)[:lote]
+            )
+            if filas:
+                archivo = f"{tabla}-{len(estado['archivos']) + 1:05d}.{extension}"
+                _escribir(directorio / archivo, columnas, filas, punto.corrida_formato)
+                estado['archivos'].append(archivo)
+                estado['ultimo_pk'] = filas[-1][0]
+                estado['filas'] += len(filas)
+            estado['terminada'] = len(filas) < lote
+            # Punto de control: el bloque ya está en disco
+            PuntoControlCambios.objects.filter(pk=punto.pk).update(avance=punto.avance, fecha_actualizacion=timezone.now())
+            if progreso:
+                progreso(tabla, estado['filas'])
+
+    manifiesto = {
+        'destino': punto.nombre,
+        'desde': punto.corrida_desde,
+        'hasta': punto.corrida_hasta,
+        'completo': punto.corrida_desde is None,
+        'formato': punto.corrida_formato,
+        'tablas': {
+            tabla: {'filas': estado['filas'], 'archivos': estado['archivos']}
+            for tabla, estado in punto.avance.items()
+        },
+    }
+    with open(directorio / 'manifiesto.json', 'w', encoding='utf-8') as salida:
+        json.dump(manifiesto, salida, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2)
+
+    punto.marca_agua = punto.corrida_hasta
+    punto.corrida_desde = punto.corrida_hasta = None
+    punto.corrida_formato = ''
+    punto.avance = {}
+    punto.save()
+    purgar_borrados()
+    manifiesto['directorio'] = str(directorio)
+    return manifiesto
+
+
+def purgar_borrados():
+    """
+    Borra las lápidas que ya exportaron todos los destinos y que ya no
+    necesita ninguna instantánea de reporte predefinido: predefinidos.py
+    busca en ellas lo borrado o archivado después de su fecha_calculo.
+    """
+    if PuntoControlCambios.objects.filter(marca_agua__isnull=True).exists():
+        return 0
+    exportado = PuntoControlCambios.objects.aggregate(minimo=Min('marca_agua'))['minimo']
+    if exportado is None:
+        return 0
+    calculado = InstantaneaReporte.objects.aggregate(minimo=Min('fecha_calculo'))['minimo']
+    limite = min(exportado, calculado) if calculado else exportado
+    return RegistroBorrado.objects.filter(fecha__lte=limite).delete()[0]
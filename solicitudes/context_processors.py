@@ -0,0 +1,14 @@
+# solicitudes/context_processors.py
+from django.conf import settings
+
+from .permisos import capacidades
+
+
+def live_updates(request):
+    """Indica a las plantillas si deben abrir la conexión de actualizaciones en vivo."""
+    return {'live_updates': settings.LIVE_UPDATES}
+
+
+def permisos(request):
+    """``capacidades`` del usuario (permisos.py) para mostrar u ocultar acciones."""
+    return {'capacidades': capacidades(request.user)}
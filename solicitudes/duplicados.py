@@ -0,0 +1,174 @@
+# solicitudes/duplicados.py
+"""
+Detección de solicitudes casi duplicadas (misma compra pedida dos veces,
+a veces desde departamentos distintos).
+
+Comparar la descripción nueva con todas las existentes no escala. En su
+lugar cada solicitud guarda una firma MinHash de su descripción
+(FirmaSolicitud) y sus claves LSH (CubetaLSH):
+
+  * La descripción normalizada (textos.normalizar_nombre) se parte en
+    fragmentos de LONGITUD_FRAGMENTO caracteres ("shingles").
+  * La firma son NUM_HASHES mínimos de funciones hash distintas sobre esos
+    fragmentos. La proporción de posiciones iguales entre dos firmas estima
+    la similitud de Jaccard de las descripciones.
+  * La firma se corta en BANDAS bandas; cada banda da una clave. Dos
+    descripciones parecidas coinciden con alta probabilidad en al menos una
+    banda, así que los candidatos salen de un IN sobre el índice de
+    CubetaLSH.clave, no de recorrer la tabla: los MAX_CANDIDATOS que
+    coinciden en más bandas.
+
+Los candidatos se filtran además por banda de monto (escala logarítmica,
+±1 banda) y por similitud estimada >= UMBRAL_SIMILITUD. El índice se
+actualiza al guardar (signals.py); ``duplicados_solicitudes --reindexar``
+lo construye para las solicitudes existentes.
+"""
+import hashlib
+import math
+import random
+import struct
+import zlib
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import CubetaLSH, FirmaSolicitud, Solicitud
+from .textos import normalizar_nombre
+
+LONGITUD_FRAGMENTO = 5
+NUM_HASHES = 64
+BANDAS = 16                       # 16 bandas de 4 valores: umbral de coincidencia ~0.5
+FILAS_POR_BANDA = NUM_HASHES // BANDAS
+UMBRAL_SIMILITUD = 0.6
+FACTOR_BANDA_MONTO = 1.25         # Cada banda de monto abarca un 25 % más que la anterior
+MAX_CANDIDATOS = 200
+
+_PRIMO = (1 << 61) - 1
+_MASCARA = (1 << 32) - 1
+# Semilla fija: las firmas guardadas tienen que seguir siendo comparables
+_azar = random.Random(20250101)
+_COEFICIENTES = [(_azar.randrange(1, _PRIMO), _azar.randrange(0, _PRIMO)) for _ in range(NUM_HASHES)]
+_FORMATO_FIRMA = f'<{NUM_HASHES}I'
+
+
+def fragmentos(texto):
+    """Conjunto de hashes (crc32) de los fragmentos de la descripción normalizada."""
+    normalizado = normalizar_nombre(texto)
+    if len(normalizado) <= LONGITUD_FRAGMENTO:
+        return {zlib.crc32(normalizado.encode())} if normalizado else set()
+    return {
+        zlib.crc32(normalizado[i:i + LONGITUD_FRAGMENTO].encode())
+        for i in range(len(normalizado) - LONGITUD_FRAGMENTO + 1)
+    }
+
+
+def minhash(texto):
+    """Firma MinHash (tupla de NUM_HASHES enteros de 32 bits), o None si no hay texto."""
+    valores = fragmentos(texto)
+    if not valores:
+        return None
+    return tuple(
+        min(((a * x + b) % _PRIMO) & _MASCARA for x in valores)
+        for a, b in _COEFICIENTES
+    )
+
+
+def claves_lsh(firma):
+    """Una clave de 63 bits por banda (el número de banda forma parte de la clave)."""
+    claves = []
+    for banda in range(BANDAS):
+        valores = firma[banda * FILAS_POR_BANDA:(banda + 1) * FILAS_POR_BANDA]
+        resumen = hashlib.blake2b(struct.pack(f'<H{FILAS_POR_BANDA}I', banda, *valores), digest_size=8).digest()
+        claves.append(int.from_bytes(resumen, 'little') >> 1)
+    return claves
+
+
+def banda_monto(monto):
+    valor = float(monto or 0)
+    # NaN, infinito o un Decimal fuera del rango de float: sin banda
+    if not math.isfinite(valor) or valor <= 0:
+        return 0
+    return int(math.floor(math.log(valor, FACTOR_BANDA_MONTO)))
+
+
+def similitud(firma_a, firma_b):
+    """Estimación de la similitud de Jaccard entre dos descripciones."""
+    return sum(1 for a, b in zip(firma_a, firma_b) if a == b) / NUM_HASHES
+
+
+def empaquetar(firma):
+    return struct.pack(_FORMATO_FIRMA, *firma)
+
+
+def desempaquetar(datos):
+    return struct.unpack(_FORMATO_FIRMA, bytes(datos))
+
+
+def indexar(solicitud):
+    """Guarda (o actualiza) la firma y las claves LSH de la solicitud."""
+    firma = minhash(solicitud.descripcion_pedido)
+    if firma is None:
+        FirmaSolicitud.objects.filter(solicitud=solicitud).delete()
+        CubetaLSH.objects.filter(solicitud=solicitud).delete()
+        return
+    datos = empaquetar(firma)
+    banda = banda_monto(solicitud.monto_comprometido_sbs)
+    actual = FirmaSolicitud.objects.filter(solicitud=solicitud).values_list('minhash', 'banda_monto').first()
+    if actual and bytes(actual[0]) == datos and actual[1] == banda:
+        return
+    with transaction.atomic():
+        FirmaSolicitud.objects.update_or_create(solicitud=solicitud, defaults={'minhash': datos, 'banda_monto': banda})
+        if not actual or bytes(actual[0]) != datos:
+            CubetaLSH.objects.filter(solicitud=solicitud).delete()
+            CubetaLSH.objects.bulk_create([CubetaLSH(solicitud=solicitud, clave=c) for c in claves_lsh(firma)])
+
+
+def indexar_lote(solicitudes):
+    """Indexa solicitudes que todavía no tienen firma (reindexado masivo)."""
+    firmas, cubetas = [], []
+    for solicitud in solicitudes:
+        firma = minhash(solicitud.descripcion_pedido)
+        if firma is None:
+            continue
+        firmas.append(FirmaSolicitud(
+            solicitud=solicitud, minhash=empaquetar(firma), banda_monto=banda_monto(solicitud.monto_comprometido_sbs),
+        ))
+        cubetas += [CubetaLSH(solicitud=solicitud, clave=c) for c in claves_lsh(firma)]
+    with transaction.atomic():
+        FirmaSolicitud.objects.bulk_create(firmas)
+        CubetaLSH.objects.bulk_create(cubetas)
+    return len(firmas)
+
+
+def candidatos(descripcion, monto, excluir=None, umbral=UMBRAL_SIMILITUD, solicitudes=None):
+    """
+    Solicitudes probablemente duplicadas de (descripcion, monto), de la más a
+    la menos parecida: lista de (solicitud, similitud). ``solicitudes``
+    restringe la búsqueda (p. ej. a un año o a los ids de un queryset).
+    """
+    firma = minhash(descripcion)
+    if firma is None:
+        return []
+    ids = CubetaLSH.objects.filter(clave__in=claves_lsh(firma))
+    if excluir:
+        ids = ids.exclude(solicitud_id=excluir)
+    # Las que coinciden en más bandas primero: el corte no deja fuera al
+    # duplicado real por solicitudes que solo comparten fragmentos comunes
+    ids = ids.values('solicitud_id').annotate(bandas=Count('id')).order_by('-bandas', 'solicitud_id')
+    ids = ids.values_list('solicitud_id', flat=True)[:MAX_CANDIDATOS]
+
+    banda = banda_monto(monto)
+    firmas = FirmaSolicitud.objects.filter(
+        solicitud_id__in=list(ids), banda_monto__range=(banda - 1, banda + 1),
+    ).values_list('solicitud_id', 'minhash')
+    parecidas = {}
+    for solicitud_id, datos in firmas:
+        valor = similitud(firma, desempaquetar(datos))
+        if valor >= umbral:
+            parecidas[solicitud_id] = valor
+    if not parecidas:
+        return []
+
+    queryset = solicitudes if solicitudes is not None else Solicitud.objects.all()
+    encontradas = queryset.filter(pk__in=parecidas).select_related('seguimiento')
+    return sorted(((s, parecidas[s.pk]) for s in encontradas), key=lambda par: -par[1])
@@ -0,0 +1,260 @@
+# solicitudes/eventos.py
+"""
+Actualizaciones en vivo del listado y del detalle (server-sent events).
+
+Cuando se guarda una Solicitud o su SeguimientoCompra (signals.py), al
+confirmarse la transacción:
+
+  1. se inserta un EventoSolicitud con un resumen del cambio, y
+  2. se publica en el ``broker`` de este proceso, que lo entrega enseguida a
+     las conexiones SSE abiertas en el mismo proceso.
+
+Con varios workers, el que guardó no es necesariamente el que tiene abierta
+la conexión del usuario. Por eso, mientras haya suscriptores, un hilo de
+cada proceso consulta la tabla cada LIVE_UPDATES_POLL_SECONDS por los
+eventos con id mayor al último visto (una lectura por rango de la PK) y los
+publica también. Un evento que llega por las dos vías se entrega una vez.
+
+La conexión SSE es SolicitudEventosView: con ASGI la async (async_views.py),
+que espera en una asyncio.Queue; con WSGI la de views.py, que ocupa un hilo
+de gunicorn mientras está abierta y espera en una queue.Queue. Por eso con
+WSGI cada proceso admite a lo sumo LIVE_UPDATES_CONEXIONES_WSGI a la vez.
+"""
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Max
+from django.db.utils import DatabaseError
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import EventoSolicitud, SeguimientoCompra
+
+# Eventos por consulta al reenviar los perdidos al reconectar
+BLOQUE_PENDIENTES = 500
+
+
+class Broker:
+    """Reparte eventos a las colas de las conexiones SSE de este proceso."""
+
+    def __init__(self, max_vistos=2000):
+        self._suscriptores = set()
+        self._lock = threading.Lock()
+        self._vistos = deque(maxlen=max_vistos)
+        self._vistos_set = set()
+        self._sondeo = None
+
+    def suscribir(self):
+        """Cola de eventos para la conexión que llama (debe correr en un event loop)."""
+        suscriptor = (asyncio.get_running_loop(), asyncio.Queue(maxsize=100))
+        with self._lock:
+            self._suscriptores.add(suscriptor)
+            self._iniciar_sondeo()
+        return suscriptor
+
+    def suscribir_hilo(self, maximo):
+        """
+        Cola de eventos (queue.Queue) para una conexión que espera en su
+        propio hilo (WSGI). None si ya hay ``maximo`` conexiones así.
+        """
+        suscriptor = (None, queue.Queue(maxsize=100))
+        with self._lock:
+            if sum(1 for loop, _ in self._suscriptores if loop is None) >= maximo:
+                return None
+            self._suscriptores.add(suscriptor)
+            self._iniciar_sondeo()
+        return suscriptor
+
+    def desuscribir(self, suscriptor):
+        with self._lock:
+            self._suscriptores.discard(suscriptor)
+
+    def publicar(self, mensaje):
+        """Entrega el mensaje a todos los suscriptores. Se puede llamar desde cualquier hilo."""
+        with self._lock:
+            if mensaje['id'] in self._vistos_set:
+                return
+            if len(self._vistos) == self._vistos.maxlen:
+                self._vistos_set.discard(self._vistos[0])
+            self._vistos.append(mensaje['id'])
+            self._vistos_set.add(mensaje['id'])
+            suscriptores = list(self._suscriptores)
+
+        for suscriptor in suscriptores:
+            loop, cola = suscriptor
+            if loop is None:
+                try:
+                    cola.put_nowait(mensaje)
+                except queue.Full:
+                    pass
+                continue
+            try:
+                loop.call_soon_threadsafe(self._entregar, cola, mensaje)
+            except RuntimeError:
+                # El event loop de esa conexión ya se cerró
+                self.desuscribir(suscriptor)
+
+    @staticmethod
+    def _entregar(cola, mensaje):
+        try:
+            cola.put_nowait(mensaje)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: se descarta; al reconectar recupera
+            # lo perdido desde la tabla con Last-Event-ID.
+            pass
+
+    # --- Sondeo de la tabla (eventos guardados por otros workers) ---
+
+    def _iniciar_sondeo(self):
+        if self._sondeo is None and settings.LIVE_UPDATES_POLL_SECONDS > 0:
+            self._sondeo = threading.Thread(target=self._sondear, name='lraa-eventos', daemon=True)
+            self._sondeo.start()
+
+    def _hay_suscriptores(self):
+        with self._lock:
+            if not self._suscriptores:
+                self._sondeo = None
+                return False
+            return True
+
+    def _sondear(self):
+        intervalo = settings.LIVE_UPDATES_POLL_SECONDS
+        proxima_purga = 0
+        try:
+            ultimo = EventoSolicitud.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+            while self._hay_suscriptores():
+                time.sleep(intervalo)
+                close_old_connections()
+                try:
+                    nuevos = list(EventoSolicitud.objects.filter(id__gt=ultimo).order_by('id')[:500])
+                    if time.monotonic() >= proxima_purga:
+                        purgar_eventos()
+                        proxima_purga = time.monotonic() + 3600
+                except DatabaseError:
+                    connection.close()
+                    continue
+                for evento in nuevos:
+                    ultimo = evento.pk
+                    self.publicar(evento.como_mensaje())
+        finally:
+            with self._lock:
+                if self._sondeo is threading.current_thread():
+                    self._sondeo = None
+            connection.close()
+
+
+broker = Broker()
+
+
+def purgar_eventos():
+    """Borra los eventos más viejos que LIVE_UPDATES_RETENTION_HOURS."""
+    limite = timezone.now() - timedelta(hours=settings.LIVE_UPDATES_RETENTION_HOURS)
+    return EventoSolicitud.objects.filter(fecha__lt=limite).delete()[0]
+
+
+def ultimo_recibido(request):
+    """Id del último evento que recibió el navegador (0 en la primera conexión)."""
+    try:
+        # ?desde= lo usa la página al reabrir la conexión tras estar oculta
+        return int(request.headers.get('Last-Event-ID') or request.GET.get('desde') or 0)
+    except ValueError:
+        return 0
+
+
+def respuesta_sse(flujo):
+    response = StreamingHttpResponse(flujo, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # que nginx no acumule el flujo
+    return response
+
+
+class FlujoHilo:
+    """
+    Cuerpo de la respuesta SSE con WSGI. Al cerrarse la respuesta libera la
+    suscripción, aunque el servidor no haya llegado a iterar el generador
+    (entonces su finally no corre).
+    """
+
+    def __init__(self, suscriptor, generador):
+        self.suscriptor = suscriptor
+        self.generador = generador
+
+    def __iter__(self):
+        return self.generador
+
+    def close(self):
+        self.generador.close()
+        broker.desuscribir(self.suscriptor)
+
+
+def pendientes(desde, departamento):
+    """
+    Hasta BLOQUE_PENDIENTES eventos del alcance con id mayor a ``desde``, en
+    orden. Al reconectar se piden bloques hasta recibir uno incompleto.
+    """
+    eventos = EventoSolicitud.objects.filter(id__gt=desde).order_by('id')
+    if departamento is not None:
+        eventos = eventos.filter(departamento_id=departamento)
+    return list(eventos[:BLOQUE_PENDIENTES])
+
+
+def corresponde(mensaje, desde, departamento):
+    """Si un mensaje del broker va a una conexión que ya envió hasta ``desde``."""
+    return mensaje['id'] > desde and (departamento is None or mensaje['departamento_id'] == departamento)
+
+
+def mensaje_sse(mensaje):
+    datos = json.dumps({k: v for k, v in mensaje.items() if k != 'departamento_id'}, ensure_ascii=False, separators=(',', ':'))
+    return f"id: {mensaje['id']}\nevent: cambio\ndata: {datos}\n\n"
+
+
+def resumen_solicitud(solicitud, seguimiento=None):
+    """Lo que necesitan las páginas para actualizar la fila o avisar del cambio."""
+    if seguimiento is None:
+        try:
+            seguimiento = solicitud.seguimiento
+        except SeguimientoCompra.DoesNotExist:
+            seguimiento = None
+    return {
+        'ref': solicitud.ref_departamento,
+        'descripcion': solicitud.descripcion_pedido,
+        'departamento': solicitud.departamento.nombre,
+        'monto_sbs': str(solicitud.monto_comprometido_sbs),
+        'sbs_numero': seguimiento.sbs_numero if seguimiento else '',
+        'oc_numero': seguimiento.oc_numero if seguimiento else '',
+        'fecha_publicacion_oc': seguimiento.fecha_publicacion_oc.isoformat() if seguimiento and seguimiento.fecha_publicacion_oc else None,
+        'condiciones': seguimiento.get_condiciones_list() if seguimiento else [],
+        'status_final': seguimiento.status_final_compra if seguimiento else '',
+    }
+
+
+def registrar_evento(tipo, solicitud_pk, departamento_id, datos=None):
+    """Guarda el evento y lo publica en este proceso. Se llama con registrar_al_confirmar."""
+    evento = EventoSolicitud.objects.create(
+        solicitud_pk=solicitud_pk,
+        departamento_id=departamento_id,
+        datos={'tipo': tipo, 'solicitud': solicitud_pk, **(datos or {})},
+    )
+    broker.publicar(evento.como_mensaje())
+    return evento
+
+
+def registrar_al_confirmar(tipo, solicitud_pk, departamento_id, datos=None, using=None):
+    """
+    Registra el evento cuando se confirme la transacción, de mejor esfuerzo:
+    si falla (p. ej. el INSERT), se anota en el log y la petición sigue; el
+    cambio ya está guardado.
+    """
+    # Una función y no un partial: con robust=True Django registra el error con
+    # el __qualname__ del callback, que partial no tiene
+    def registrar():
+        registrar_evento(tipo, solicitud_pk, departamento_id, datos)
+
+    transaction.on_commit(registrar, using=using, robust=True)
@@ -0,0 +1,69 @@
+# solicitudes/exports.py
+"""
+Exportación del reporte de seguimientos a CSV.
+
+Las filas se generan una a una desde un iterador del queryset, de modo que la
+respuesta se envía por partes sin cargar todo el reporte en memoria.
+"""
+import csv
+
+# (encabezado, función que obtiene el valor de un SeguimientoCompra)
+COLUMNAS_REPORTE = [
+    ('# REFERENCIA', lambda s: s.solicitud.ref_departamento),
+    ('NÚMERO SBS', lambda s: s.sbs_numero),
+    ('NÚMERO OC', lambda s: s.oc_numero),
+    ('DESCRIPCIÓN', lambda s: s.solicitud.descripcion_pedido),
+    ('TIPO ENTREGA', lambda s: s.get_tipo_entrega_display()),
+    ('PROVEEDOR', lambda s: s.proveedor),
+    ('MONTO OC', lambda s: s.monto_oc if s.monto_oc is not None else ''),
+    ('CONDICIÓN', lambda s: s.condicion),
+    ('STATUS', lambda s: s.status_final_compra),
+    ('VENCIMIENTO OC', lambda s: s.vencimiento_oc or ''),
+]
+
+NOMBRE_ARCHIVO_CSV = 'reporte_seguimientos.csv'
+CHUNK_SIZE = 500
+
+
+class _Eco:
+    """Objeto tipo archivo para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def _encabezado(writer):
+    # BOM para que Excel reconozca UTF-8 (tildes y ñ)
+    return '\ufeff' + writer.writerow([titulo for titulo, _ in COLUMNAS_REPORTE])
+
+
+def _fila(writer, seguimiento):
+    return writer.writerow([valor(seguimiento) for _, valor in COLUMNAS_REPORTE])
+
+
+def filas_csv(queryset):
+    writer = csv.writer(_Eco())
+    yield _encabezado(writer)
+    bloque = []
+    for seguimiento in queryset.iterator(chunk_size=CHUNK_SIZE):
+        bloque.append(_fila(writer, seguimiento))
+        if len(bloque) >= CHUNK_SIZE:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+async def afilas_csv(queryset):
+    # Se envía un bloque de filas por vez y no fila a fila: cada parte es un
+    # mensaje ASGI y miles de mensajes pequeños saturan el event loop.
+    writer = csv.writer(_Eco())
+    yield _encabezado(writer)
+    bloque = []
+    async for seguimiento in queryset.aiterator(chunk_size=CHUNK_SIZE):
+        bloque.append(_fila(writer, seguimiento))
+        if len(bloque) >= CHUNK_SIZE:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
@@ -1,5 +1,16 @@
+import copy
+from datetime import date
+from decimal import Decimal
+
 from django import forms
+from django.urls import reverse_lazy
+from django.utils.html import format_html, html_safe
+from django.utils.safestring import mark_safe
+
+from accounts.models import Departamento
+
 from .models import Solicitud, SeguimientoCompra
+from .permisos import capacidades
 
 class SolicitudForm(forms.ModelForm):
     # ... (este formulario no necesita cambios)
@@ -15,6 +26,7 @@ class SolicitudForm(forms.ModelForm):
         
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.fields['departamento'].queryset = Departamento.objects.para_elegir(self.instance.departamento_id)
         for field_name, field in self.fields.items():
             # Esto asignará 'form-select' automáticamente a nuestro nuevo campo 'urgente'
             if isinstance(field.widget, forms.Select):
@@ -33,7 +45,6 @@ class SeguimientoCompraForm(forms.ModelForm):
     )
 
     def __init__(self, *args, **kwargs):
-        user = kwargs.pop('user', None) # El ', None' evita el KeyError si no existe
         super().__init__(*args, **kwargs)
 
         # 🌟 NUEVO: Convertir el texto guardado ("valor1,valor2") a lista para que 
@@ -41,37 +52,6 @@ class SeguimientoCompraForm(forms.ModelForm):
         if self.instance and self.instance.pk and self.instance.condicion:
             self.initial['condicion'] = self.instance.condicion.split(',')
 
-        roles_permitidos = ['Asistente Administrativo', 'Director Encargado']
-        can_edit = user and user.job_position in roles_permitidos
-        
-        for field_name, field in self.fields.items():
-            current_classes = field.widget.attrs.get('class', '')
-            
-            # --- 1. Aplicación de Clases Base de Bootstrap ---
-            if isinstance(field.widget, forms.CheckboxInput):
-                if 'form-check-input' not in current_classes:
-                    field.widget.attrs['class'] = (current_classes + ' form-check-input').strip()
-            elif isinstance(field.widget, forms.CheckboxSelectMultiple):
-                field.widget.attrs['class'] = 'form-check-input'
-            elif isinstance(field.widget, forms.Select):
-                if 'form-select' not in current_classes:
-                    field.widget.attrs['class'] = (current_classes + ' form-select').strip()
-            else:
-                if 'form-control' not in current_classes:
-                    field.widget.attrs['class'] = (current_classes + ' form-control').strip()
-
-            # --- 2. Aplicación de Restricciones ---
-            if not can_edit:
-                # 🌟 CORRECCIÓN: Agregamos forms.CheckboxSelectMultiple aquí para que se 
-                # deshabilite si no tiene permisos, ya que 'readonly' no funciona en checkboxes.
-                if isinstance(field.widget, (forms.CheckboxInput, forms.CheckboxSelectMultiple)):
-                    field.widget.attrs['disabled'] = True
-                else:
-                    field.widget.attrs['readonly'] = True
-                    current_classes = field.widget.attrs.get('class', '')
-                    if 'bg-light' not in current_classes:
-                        field.widget.attrs['class'] = (current_classes + ' bg-light').strip()
-
     # 2. Guardar valores (De ['valor1', 'valor2'] a "valor1,valor2")
     def clean_condicion(self):
         data = self.cleaned_data.get('condicion')
@@ -81,11 +61,12 @@ class SeguimientoCompraForm(forms.ModelForm):
 
     class Meta:
         model = SeguimientoCompra
-        exclude = ('solicitud', 'observacion_1', 'observacion_2', 'fecha_inicial_mant_calib_caract') # Excluimos los que no están en el diseño
+        exclude = ('solicitud', 'proveedor_catalogo', 'observacion_1', 'observacion_2', 'fecha_inicial_mant_calib_caract') # Excluimos los que no están en el diseño
         
         widgets = {
             
             'plazo_entrega': forms.NumberInput(attrs={'id': 'id_plazo_entrega'}),
+            'proveedor': forms.TextInput(attrs={'data-autocompletar-url': reverse_lazy('proveedor-autocomplete')}),
             'tipo_plazo': forms.Select(attrs={'id': 'id_tipo_plazo_entrega'}),
             'fecha_publicacion_oc': forms.DateInput(attrs={'type': 'date', 'id': 'id_fecha_publicacion_oc'}, format='%Y-%m-%d'),
             'vencimiento_oc': forms.DateInput(
@@ -105,6 +86,136 @@ class SeguimientoCompraForm(forms.ModelForm):
         }
 
 
+def _agregar_clase(widget, clase):
+    clases = widget.attrs.get('class', '').split()
+    if clase not in clases:
+        widget.attrs['class'] = ' '.join(clases + [clase])
+
+
+def _preparar_widgets(form_class, solo_lectura):
+    """
+    Resuelve una sola vez, al importar el módulo, las clases de Bootstrap y
+    las restricciones de cada widget. Cada instancia del formulario copia
+    base_fields ya preparados, sin recorrer los campos en __init__.
+    """
+    # Los campos declarados (condicion) se comparten con la clase padre
+    form_class.base_fields = copy.deepcopy(form_class.base_fields)
+    for field in form_class.base_fields.values():
+        widget = field.widget
+        # --- 1. Aplicación de Clases Base de Bootstrap ---
+        if isinstance(widget, forms.CheckboxSelectMultiple):
+            widget.attrs['class'] = 'form-check-input'
+        elif isinstance(widget, forms.CheckboxInput):
+            _agregar_clase(widget, 'form-check-input')
+        elif isinstance(widget, forms.Select):
+            _agregar_clase(widget, 'form-select')
+        else:
+            _agregar_clase(widget, 'form-control')
+
+        # --- 2. Aplicación de Restricciones ---
+        if solo_lectura:
+            # 'readonly' no funciona en checkboxes: se deshabilitan
+            if isinstance(widget, (forms.CheckboxInput, forms.CheckboxSelectMultiple)):
+                widget.attrs['disabled'] = True
+            else:
+                widget.attrs['readonly'] = True
+                _agregar_clase(widget, 'bg-light')
+
+
+class SeguimientoCompraLecturaForm(SeguimientoCompraForm):
+    """El mismo formulario con todos los campos en solo lectura."""
+
+
+_preparar_widgets(SeguimientoCompraForm, solo_lectura=False)
+_preparar_widgets(SeguimientoCompraLecturaForm, solo_lectura=True)
+
+
+def formulario_seguimiento(user):
+    """Clase de formulario de seguimiento que corresponde al usuario."""
+    if capacidades(user).puede_editar_seguimiento:
+        return SeguimientoCompraForm
+    return SeguimientoCompraLecturaForm
+
+
+@html_safe
+class CampoLectura:
+    """
+    Un campo de SeguimientoLectura. Ofrece lo que usa solicitud_detail.html
+    de un BoundField (label, value, errors, id_for_label, iterar las
+    opciones de condicion y el HTML del campo) sin widgets ni formularios.
+    """
+    errors = ''
+    id_for_label = ''
+
+    def __init__(self, field, valor):
+        self.field = field
+        self.label = field.label
+        self.value = valor
+
+    def _texto(self):
+        valor = self.value
+        if valor in (None, ''):
+            return ''
+        if isinstance(valor, date):
+            return valor.strftime('%d/%m/%Y')
+        if isinstance(valor, Decimal):
+            return f'{valor:,.2f}'
+        if getattr(self.field, 'choices', None):
+            return dict(self.field.choices).get(valor, valor)
+        return valor
+
+    def __iter__(self):
+        # Opciones de condicion: {% for check in seguimiento_form.condicion %}
+        marcadas = set(self.value)
+        for clave, etiqueta in self.field.choices:
+            yield OpcionLectura(etiqueta, clave in marcadas)
+
+    def __str__(self):
+        widget = self.field.widget
+        if isinstance(widget, forms.CheckboxInput):
+            return OpcionLectura(self.label, self.value).tag
+        if isinstance(widget, forms.Textarea):
+            return format_html('<div class="form-control bg-light texto-multilinea">{}</div>', self._texto())
+        return format_html('<div class="form-control bg-light">{}</div>', self._texto() or mark_safe('&nbsp;'))
+
+
+class OpcionLectura:
+
+    def __init__(self, choice_label, marcada):
+        self.choice_label = choice_label
+        self.id_for_label = ''
+        self.tag = format_html(
+            '<input type="checkbox" class="form-check-input" disabled{}>',
+            mark_safe(' checked') if marcada else '',
+        )
+
+
+class SeguimientoLectura:
+    """
+    Valores del seguimiento para quien no puede editarlo: se muestran con
+    el mismo aspecto que el formulario en solo lectura, pero sin instanciar
+    un formulario (campos, widgets, valores iniciales) en cada visita.
+    """
+    campos = SeguimientoCompraForm.base_fields
+
+    def __init__(self, seguimiento):
+        self.instance = seguimiento
+
+    def __getitem__(self, nombre):
+        return self._campo(nombre)
+
+    def __getattr__(self, nombre):
+        if nombre.startswith('_') or nombre not in self.campos:
+            raise AttributeError(nombre)
+        return self._campo(nombre)
+
+    def _campo(self, nombre):
+        valor = getattr(self.instance, nombre)
+        if nombre == 'condicion':
+            valor = self.instance.condicion.split(',') if self.instance.condicion else []
+        return CampoLectura(self.campos[nombre], valor)
+
+
 # --- AGREGA ESTA NUEVA CLASE AL FINAL DEL ARCHIVO ---
 class SeguimientoFilterForm(forms.Form):
     """
@@ -148,8 +259,15 @@ class SeguimientoFilterForm(forms.Form):
     proveedor = forms.CharField(
         required=False,
         label="Proveedor",
-        widget=forms.TextInput(attrs={'class': 'form-control form-control-sm', 'placeholder': 'Nombre del proveedor'})
+        widget=forms.TextInput(attrs={
+            'class': 'form-control form-control-sm',
+            'placeholder': 'Nombre del proveedor',
+            'data-autocompletar-url': reverse_lazy('proveedor-autocomplete'),
+            'data-autocompletar-id': 'id_proveedor_id',
+        })
     )
+    # Lo llena el autocompletado al elegir un proveedor del catálogo
+    proveedor_id = forms.IntegerField(required=False, widget=forms.HiddenInput())
     # 🌟 NUEVO CAMPO PARA FILTRAR POR AÑO
     anio = forms.IntegerField(
         required=False,
@@ -161,4 +279,38 @@ class SeguimientoFilterForm(forms.Form):
         required=False,
         label="Código / Ref.",
         widget=forms.TextInput(attrs={'class': 'form-control form-control-sm', 'placeholder': 'Ej: M-01-2025'})
-    )
\ No newline at end of file
+    )
+    # Suma al reporte las solicitudes cerradas de años anteriores (solicitudes/archivo.py)
+    incluir_archivo = forms.BooleanField(
+        required=False,
+        label="Incluir archivo",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    # Valores de ?orden= que acepta queries.ORDENES_REPORTE ('-' = descendente)
+    ORDEN_CHOICES = [
+        ('', 'Más recientes'),
+        ('fecha', 'Más antiguas'),
+        ('-monto_oc', 'Monto OC (mayor a menor)'),
+        ('monto_oc', 'Monto OC (menor a mayor)'),
+        ('vencimiento_oc', 'Vencimiento OC (próximo primero)'),
+        ('-vencimiento_oc', 'Vencimiento OC (lejano primero)'),
+        ('proveedor', 'Proveedor (A-Z)'),
+        ('-proveedor', 'Proveedor (Z-A)'),
+        ('sbs_numero', 'N° SBS (ascendente)'),
+        ('-sbs_numero', 'N° SBS (descendente)'),
+    ]
+    orden = forms.ChoiceField(
+        choices=ORDEN_CHOICES,
+        required=False,
+        label="Ordenar por",
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+
+
+class DuplicadosForm(forms.Form):
+    """Parámetros GET del aviso de duplicados (SolicitudDuplicadosView)."""
+    descripcion = forms.CharField(required=False)
+    # DecimalField rechaza NaN e Infinity; el máximo es el de
+    # Solicitud.monto_comprometido_sbs (1e400 no llega a duplicados.banda_monto)
+    monto = forms.DecimalField(required=False, min_value=0, max_value=Decimal('99999999.99'))
+    excluir = forms.IntegerField(required=False, min_value=1)
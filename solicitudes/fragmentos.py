@@ -0,0 +1,170 @@
+# solicitudes/fragmentos.py
+"""
+HTML ya renderizado de las filas del listado y de los paneles de solo
+lectura del detalle, guardado en la caché 'fragmentos' (ver settings.CACHES).
+
+* La clave lleva la versión de lo que se muestra: pk y fecha_actualizacion
+  de la solicitud, de su seguimiento y del departamento (nombre y color).
+  Al guardar cualquiera de ellos la clave cambia y la copia anterior deja
+  de usarse sola, sin borrar nada; vence a los FRAGMENTOS_CACHE_SECONDS.
+  Los update() del admin y de las tareas también mueven fecha_actualizacion.
+* La clave lleva además un resumen de la plantilla (y de la URL del sprite
+  de iconos, que tiene hash): al desplegar un cambio no se sirve HTML viejo.
+* Una página del listado es una sola get_many: una fila sin cambios cuesta
+  esa búsqueda y no un render. Las que faltan se renderizan y se guardan
+  juntas con set_many.
+* Lo que depende de quien mira queda fuera o en la clave: los botones de
+  editar y borrar de la fila (``editable``) y, en el detalle, el botón de
+  editar y el formulario de quien puede editar el seguimiento.
+
+Las plantillas se renderizan sin request (sin context processors), así que
+sirven igual desde la vista síncrona y la async. Las filas del listado
+salen de la plantilla del motor que renderiza la página (``motor``, ver
+settings.PLANTILLAS_MOTOR); su versión va en la clave como cualquier otra.
+"""
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.templatetags.static import static
+from django.utils.safestring import mark_safe
+
+from .forms import SeguimientoLectura
+from .models import SeguimientoCompra
+from .templatetags.iconos import SPRITE
+
+PREFIJO = 'fragmentos'
+PLANTILLA_FILA = 'solicitudes/partials/solicitud_list_fila.html'
+PLANTILLA_DATOS = 'solicitudes/partials/solicitud_datos.html'
+PLANTILLA_SEGUIMIENTO = 'solicitudes/partials/seguimiento_campos.html'
+PLANTILLA_ADJUNTOS = 'solicitudes/partials/adjuntos_etapa.html'
+
+
+def _resumen(plantilla):
+    """
+    crc32 del código de la plantilla, calculado una vez por plantilla
+    compilada: los loaders con caché (el de Django por defecto, el entorno de
+    Jinja2) devuelven la misma en cada get_template. El de Django tiene el
+    código en memoria; el de Jinja2 no lo guarda y hay que leerlo.
+    """
+    compilada = plantilla.template
+    if not hasattr(compilada, 'version_fragmento'):
+        if hasattr(compilada, 'source'):
+            fuente = compilada.source
+        else:
+            entorno = plantilla.backend.env
+            fuente = entorno.loader.get_source(entorno, compilada.name)[0]
+        compilada.version_fragmento = format(zlib.crc32(fuente.encode()), 'x')
+    return compilada.version_fragmento
+
+
+def _version(*plantillas):
+    """Resumen de las plantillas (ya cargadas) y de la URL del sprite."""
+    sprite = format(zlib.crc32(static(SPRITE).encode()), 'x')
+    return '-'.join([*(_resumen(plantilla) for plantilla in plantillas), sprite])
+
+
+def _marca(fecha):
+    return int(fecha.timestamp() * 1_000_000) if fecha else 0
+
+
+def _seguimiento(solicitud):
+    try:
+        return solicitud.seguimiento
+    except SeguimientoCompra.DoesNotExist:
+        return None
+
+
+def _clave(*partes):
+    return ':'.join(str(parte) for parte in (PREFIJO, *partes))
+
+
+def _version_departamento(solicitud):
+    departamento = solicitud.departamento
+    return _marca(departamento.fecha_actualizacion) if departamento else 0
+
+
+def _version_fila(solicitud):
+    """Lo que cambia cuando cambia algo de lo que muestra la fila."""
+    seguimiento = _seguimiento(solicitud)
+    return (
+        solicitud.pk,
+        _marca(solicitud.fecha_actualizacion),
+        _marca(seguimiento.fecha_actualizacion) if seguimiento else 0,
+        _version_departamento(solicitud),
+    )
+
+
+def en_cache(elementos, renderizar):
+    """
+    HTML de cada (clave, objeto) de ``elementos``, en el mismo orden. Una
+    sola get_many para todos; los que faltan se renderizan con
+    ``renderizar(objeto)`` y se guardan con una sola set_many.
+    """
+    cache = caches['fragmentos']
+    elementos = list(elementos)
+    guardados = cache.get_many([clave for clave, _ in elementos])
+    nuevos = {}
+    resultado = []
+    for clave, objeto in elementos:
+        html = guardados.get(clave)
+        if html is None:
+            html = nuevos[clave] = renderizar(objeto)
+        resultado.append(mark_safe(html))
+    if nuevos:
+        cache.set_many(nuevos, settings.FRAGMENTOS_CACHE_SECONDS)
+    return resultado
+
+
+def filas_listado(solicitudes, capacidades, motor=None):
+    """HTML de las filas <tr> de una página del listado."""
+    plantilla = get_template(PLANTILLA_FILA, using=motor)
+    version = _version(plantilla)
+
+    def renderizar(fila):
+        solicitud, editable = fila
+        return plantilla.render({'solicitud': solicitud, 'editable': editable})
+
+    filas = [(solicitud, capacidades.puede_editar(solicitud)) for solicitud in solicitudes]
+    return mark_safe(''.join(en_cache(
+        ((_clave('fila', version, *_version_fila(solicitud), int(editable)), (solicitud, editable))
+         for solicitud, editable in filas),
+        renderizar,
+    )))
+
+
+def datos_solicitud(solicitud):
+    """
+    Panel con los datos de la solicitud en el detalle. Un cambio de nombre
+    del solicitante se ve cuando vence la copia.
+    """
+    plantilla = get_template(PLANTILLA_DATOS)
+    clave = _clave(
+        'datos', _version(plantilla), solicitud.pk, _marca(solicitud.fecha_actualizacion),
+        _version_departamento(solicitud), solicitud.solicitante_id,
+    )
+    return en_cache([(clave, solicitud)], lambda objeto: plantilla.render({'object': objeto}))[0]
+
+
+def seguimiento_lectura(seguimiento, adjuntos_por_etapa):
+    """
+    Campos del seguimiento para quien no puede editarlo (SeguimientoLectura),
+    con los adjuntos de cada etapa. Es igual para todos los que solo leen.
+    """
+    # La vista ya los leyó (adjuntos.adjuntos_por_etapa); subir o borrar uno
+    # no toca el seguimiento, así que van en la clave
+    adjuntos = '.'.join(str(adjunto.pk) for lista in adjuntos_por_etapa.values() for adjunto in lista)
+    plantilla = get_template(PLANTILLA_SEGUIMIENTO)
+    clave = _clave(
+        'seguimiento', _version(plantilla, get_template(PLANTILLA_ADJUNTOS)),
+        seguimiento.pk, _marca(seguimiento.fecha_actualizacion), zlib.crc32(adjuntos.encode()),
+    )
+
+    def renderizar(objeto):
+        return plantilla.render({
+            'seguimiento_form': SeguimientoLectura(objeto),
+            'adjuntos_por_etapa': adjuntos_por_etapa,
+        })
+
+    return en_cache([(clave, seguimiento)], renderizar)[0]
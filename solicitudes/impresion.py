@@ -0,0 +1,105 @@
+# solicitudes/impresion.py
+"""
+Reporte completo para imprimir (?print=1), enviado por partes.
+
+En lugar de armar toda la página en memoria antes de enviar el primer
+byte, se envía el inicio de la página, después las filas en bloques a
+medida que se leen y al final el total, que se va sumando al recorrer las
+filas (sin un aggregate aparte). Las filas se leen por cursor, de a
+CHUNK_SIZE (queries.recorrer_por_cursor) y no con ``.iterator()``, que en
+MySQL/MariaDB trae igual todo el resultado al worker. El tiempo hasta el
+primer byte y la memoria del worker no dependen de cuántas filas traiga el
+filtro.
+
+La respuesta se comprime con gzip a medida que se envía. Solo esta: la
+página de impresión no lleva el token CSRF ni repite lo que envía el
+usuario, así que no expone secretos a BREACH como lo haría comprimir todo
+el sitio con GZipMiddleware.
+"""
+from decimal import Decimal
+
+from django.http import StreamingHttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.template.loader import get_template
+
+from .exports import CHUNK_SIZE
+from .queries import arecorrer_por_cursor, recorrer_por_cursor
+
+PLANTILLA_INICIO = 'solicitudes/partials/seguimiento_report_imprimir_inicio.html'
+PLANTILLA_FILAS = 'solicitudes/partials/seguimiento_report_filas.html'
+PLANTILLA_FIN = 'solicitudes/partials/seguimiento_report_imprimir_fin.html'
+# Filas por parte enviada: bloques pequeños llenan el event loop de mensajes,
+# grandes atrasan el primer byte (ver exports.afilas_csv)
+FILAS_POR_PARTE = 200
+
+
+class _Impresion:
+    """
+    Arma las partes de la página. Las plantillas se renderizan sin request
+    (sin context processors), así que no hacen consultas y sirven igual
+    desde la vista síncrona y la async.
+    """
+
+    def __init__(self, usuario):
+        self.filas = get_template(PLANTILLA_FILAS)
+        self.contexto = {'usuario': usuario}
+        self.bloque = []
+        self.total_filas = 0
+        self.total_monto_oc = Decimal(0)
+
+    def inicio(self):
+        return get_template(PLANTILLA_INICIO).render(self.contexto)
+
+    def agregar(self, seguimiento):
+        """Suma la fila; devuelve el HTML del bloque cuando se completa."""
+        self.bloque.append(seguimiento)
+        self.total_filas += 1
+        self.total_monto_oc += seguimiento.monto_oc or 0
+        if len(self.bloque) >= FILAS_POR_PARTE:
+            return self._enviar_bloque()
+        return None
+
+    def _enviar_bloque(self):
+        html = self.filas.render({'seguimientos': self.bloque})
+        self.bloque = []
+        return html
+
+    def fin(self):
+        resto = self._enviar_bloque() if self.bloque else ''
+        return resto + get_template(PLANTILLA_FIN).render({
+            **self.contexto,
+            'total_filas': self.total_filas,
+            'total_monto_oc': self.total_monto_oc,
+        })
+
+
+def partes_impresion(queryset, usuario):
+    impresion = _Impresion(usuario)
+    yield impresion.inicio()
+    for seguimiento in recorrer_por_cursor(queryset, CHUNK_SIZE):
+        parte = impresion.agregar(seguimiento)
+        if parte:
+            yield parte
+    yield impresion.fin()
+
+
+async def apartes_impresion(queryset, usuario):
+    impresion = _Impresion(usuario)
+    yield impresion.inicio()
+    async for seguimiento in arecorrer_por_cursor(queryset, CHUNK_SIZE):
+        parte = impresion.agregar(seguimiento)
+        if parte:
+            yield parte
+    yield impresion.fin()
+
+
+def respuesta_impresion(request, partes):
+    """StreamingHttpResponse de la página, comprimida si el navegador acepta gzip."""
+    response = StreamingHttpResponse(partes, content_type='text/html; charset=utf-8')
+    # GZipMiddleware solo para esta respuesta; comprime también las que se
+    # envían por partes (y las async), bloque por bloque
+    return GZipMiddleware(lambda request: response).process_response(request, response)
+
+
+def nombre_usuario(user):
+    return user.get_full_name() or user.username
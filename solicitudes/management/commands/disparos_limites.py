@@ -0,0 +1,22 @@
+# solicitudes/management/commands/disparos_limites.py
+from django.core.management.base import BaseCommand
+
+from lraa_project.limites import disparos
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra cuántas veces se rechazaron peticiones por los límites de uso "
+        "(LIMITES_PETICIONES, ver lraa_project/limites.py), por día y vista."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=7, help='Días hacia atrás (default: 7)')
+
+    def handle(self, *args, **options):
+        conteo = disparos(options['dias'])
+        if not conteo:
+            self.stdout.write("Sin peticiones rechazadas.")
+            return
+        for (dia, nombre, tipo), veces in sorted(conteo.items(), reverse=True):
+            self.stdout.write(f"{dia:%Y-%m-%d}  {nombre:<24} {tipo:<13} {veces:>6}")
@@ -0,0 +1,85 @@
+# solicitudes/management/commands/duplicados_solicitudes.py
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from solicitudes import duplicados
+from solicitudes.models import Solicitud
+
+
+class Command(BaseCommand):
+    help = (
+        "Informa los grupos de solicitudes casi duplicadas de un año (índice "
+        "MinHash/LSH, ver solicitudes/duplicados.py). Con --reindexar construye "
+        "antes la firma de las solicitudes que no la tienen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--anio', type=int, default=None, help='Año de creación (default: el actual)')
+        parser.add_argument('--umbral', type=float, default=duplicados.UMBRAL_SIMILITUD,
+                            help=f'Similitud mínima entre 0 y 1 (default: {duplicados.UMBRAL_SIMILITUD})')
+        parser.add_argument('--reindexar', action='store_true', help='Indexa las solicitudes sin firma')
+        parser.add_argument('--lote', type=int, default=500, help='Solicitudes por lote al reindexar (default: 500)')
+
+    def handle(self, *args, **options):
+        if options['reindexar']:
+            self._reindexar(options['lote'])
+
+        anio = options['anio'] or timezone.localdate().year
+        del_anio = Solicitud.objects.filter(
+            fecha_creacion__gte=timezone.make_aware(datetime(anio, 1, 1)),
+            fecha_creacion__lt=timezone.make_aware(datetime(anio + 1, 1, 1)),
+        )
+        grupos = self._agrupar(del_anio, options['umbral'])
+        if not grupos:
+            self.stdout.write(f"Sin posibles duplicados en {anio}.")
+            return
+
+        for numero, grupo in enumerate(grupos, start=1):
+            self.stdout.write(self.style.WARNING(f"Grupo {numero} ({len(grupo)} solicitudes)"))
+            for solicitud in grupo:
+                self.stdout.write(
+                    f"  {solicitud.ref_departamento:<14} {solicitud.departamento.nombre:<26} "
+                    f"B/. {solicitud.monto_comprometido_sbs:>12}  {solicitud.descripcion_pedido[:60]}"
+                )
+        self.stdout.write(self.style.SUCCESS(f"{len(grupos)} grupo(s) de posibles duplicados en {anio}."))
+
+    def _reindexar(self, lote):
+        pendientes = Solicitud.objects.filter(firma__isnull=True).only('id', 'descripcion_pedido', 'monto_comprometido_sbs').order_by('pk')
+        total = 0
+        ultimo = 0
+        while True:
+            bloque = list(pendientes.filter(pk__gt=ultimo)[:lote])
+            if not bloque:
+                break
+            ultimo = bloque[-1].pk
+            total += duplicados.indexar_lote(bloque)
+        self.stdout.write(f"{total} solicitud(es) indexadas.")
+
+    def _agrupar(self, solicitudes, umbral):
+        """Une en grupos (union-find) cada solicitud con sus candidatos del mismo conjunto."""
+        padre = {}
+
+        def raiz(pk):
+            while padre.setdefault(pk, pk) != pk:
+                padre[pk] = padre[padre[pk]]
+                pk = padre[pk]
+            return pk
+
+        por_id = {}
+        for solicitud in solicitudes.order_by('pk').iterator(chunk_size=500):
+            por_id[solicitud.pk] = solicitud
+            for candidata, _ in duplicados.candidatos(
+                solicitud.descripcion_pedido, solicitud.monto_comprometido_sbs,
+                excluir=solicitud.pk, umbral=umbral, solicitudes=solicitudes,
+            ):
+                padre[raiz(candidata.pk)] = raiz(solicitud.pk)
+
+        grupos = {}
+        for pk in padre:
+            grupos.setdefault(raiz(pk), []).append(por_id[pk])
+        return sorted(
+            (sorted(grupo, key=lambda s: s.pk) for grupo in grupos.values() if len(grupo) > 1),
+            key=lambda grupo: grupo[0].pk,
+        )
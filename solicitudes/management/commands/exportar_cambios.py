@@ -0,0 +1,36 @@
+# solicitudes/management/commands/exportar_cambios.py
+from django.core.management.base import BaseCommand, CommandError
+
+from solicitudes.cambios import FORMATOS, exportar_cambios
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta las solicitudes y seguimientos cambiados (y los borrados) desde "
+        "la corrida anterior, en archivos JSON Lines o CSV comprimidos. Si la "
+        "corrida anterior quedó a medias, la retoma. Ver solicitudes/cambios.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destino', default='default', help='Nombre del punto de control (default: default)')
+        parser.add_argument('--formato', choices=FORMATOS, default='jsonl', help='jsonl o csv (default: jsonl)')
+        parser.add_argument('--completo', action='store_true', help='Exporta todas las filas, no solo las cambiadas')
+        parser.add_argument('--lote', type=int, default=None, help='Filas por archivo (default: CAMBIOS_LOTE)')
+
+    def handle(self, *args, **options):
+        if options['lote'] is not None and options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor que 0.")
+
+        def progreso(tabla, filas):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {tabla}: {filas} filas")
+
+        manifiesto = exportar_cambios(
+            nombre=options['destino'],
+            formato=options['formato'],
+            completo=options['completo'],
+            lote=options['lote'],
+            progreso=progreso,
+        )
+        resumen = ', '.join(f"{tabla}: {datos['filas']}" for tabla, datos in manifiesto['tablas'].items())
+        self.stdout.write(self.style.SUCCESS(f"Exportado en {manifiesto['directorio']} ({resumen})"))
@@ -0,0 +1,20 @@
+# solicitudes/management/commands/refrescar_reportes_predefinidos.py
+from django.core.management.base import BaseCommand
+
+from solicitudes import predefinidos
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula las instantáneas de los reportes predefinidos afectadas por "
+        "cambios desde su último cálculo (ver solicitudes/predefinidos.py). Con "
+        "--todos las recalcula todas; pensado para cron, antes de la jornada:\n"
+        "    30 5 * * * python manage.py refrescar_reportes_predefinidos --todos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help='Recalcula todas, haya cambios o no')
+
+    def handle(self, *args, **options):
+        revisadas, recalculadas = predefinidos.refrescar(todos=options['todos'])
+        self.stdout.write(f"{recalculadas} de {revisadas} instantánea(s) recalculadas.")
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0009_alter_seguimientocompra_condicion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seguimientocompra',
+            name='condicion',
+            field=models.CharField(blank=True, max_length=255, verbose_name='CONDICIÓN'),
+        ),
+        migrations.AlterField(
+            model_name='seguimientocompra',
+            name='status_final_compra',
+            field=models.CharField(blank=True, choices=[('OC - POR ENTREGAR', 'OC - POR ENTREGAR'), ('OC - ENTREGADA ***(ENTREGA TOTAL)*** COMPLETADA.', 'OC - ENTREGADA ***(ENTREGA TOTAL)*** COMPLETADA.'), ('OC - PENDIENTE POR ENTREGAR ***(ENTREGA PARCIAL):*** Próxima a completarse.', 'OC - PENDIENTE POR ENTREGAR ***(ENTREGA PARCIAL):*** Próxima a completarse.'), ('OC - SERVICIO REALIZADO ***(ENTREGA TOTAL)***COMPLETADA.', 'OC - SERVICIO REALIZADO ***(ENTREGA TOTAL)***COMPLETADA.'), ('OC - SERVICIO PENDIENTE POR REALIZAR (ENTREGA PARCIAL ):*** Próxima a completarse.', 'OC - SERVICIO PENDIENTE POR REALIZAR (ENTREGA PARCIAL ):*** Próxima a completarse.'), ('OC - ***PARCIAL FINALIZADO***', 'OC - ***PARCIAL FINALIZADO***')], max_length=100, verbose_name='ESTADO FINAL DE LA COMPRA'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['condicion'], name='seguimiento_condicion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['status_final_compra'], name='seguimiento_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['-fecha_creacion'], name='solicitud_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['departamento', '-fecha_creacion'], name='solicitud_depto_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0010_indices_admin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Proveedor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(help_text='Forma en que se muestra', max_length=256, verbose_name='NOMBRE')),
+                ('clave', models.CharField(editable=False, help_text='Nombre normalizado, ver solicitudes.textos.normalizar_nombre', max_length=256, unique=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Proveedor',
+                'verbose_name_plural': 'Proveedores',
+                'ordering': ['clave'],
+            },
+        ),
+        migrations.AddField(
+            model_name='seguimientocompra',
+            name='proveedor_catalogo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='seguimientos', to='solicitudes.proveedor', verbose_name='PROVEEDOR (CATÁLOGO)'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from collections import Counter, defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+from solicitudes.textos import normalizar_nombre
+
+
+def agrupar_proveedores(apps, schema_editor):
+    """
+    Crea el catálogo a partir del texto libre: las distintas formas de
+    escribir un proveedor que tienen la misma clave normalizada quedan en
+    un solo Proveedor, con el nombre de la forma más usada.
+    """
+    SeguimientoCompra = apps.get_model('solicitudes', 'SeguimientoCompra')
+    Proveedor = apps.get_model('solicitudes', 'Proveedor')
+    db = schema_editor.connection.alias
+
+    grupos = defaultdict(Counter)
+    formas = (
+        SeguimientoCompra.objects.using(db)
+        .exclude(proveedor='')
+        .values_list('proveedor')
+        .annotate(usos=Count('id'))
+        .order_by()
+    )
+    for texto, usos in formas:
+        clave = normalizar_nombre(texto)
+        if clave:
+            grupos[clave][texto] += usos
+
+    for clave, textos in grupos.items():
+        nombre = textos.most_common(1)[0][0].strip()[:256]
+        proveedor = Proveedor.objects.using(db).create(clave=clave, nombre=nombre)
+        SeguimientoCompra.objects.using(db).filter(proveedor__in=list(textos)).update(proveedor_catalogo=proveedor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0011_proveedor'),
+    ]
+
+    operations = [
+        migrations.RunPython(agrupar_proveedores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0012_agrupar_proveedores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoSolicitud',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('solicitud_pk', models.BigIntegerField()),
+                ('departamento', models.CharField(max_length=50)),
+                ('datos', models.JSONField()),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Evento de Solicitud',
+                'verbose_name_plural': 'Eventos de Solicitudes',
+                'ordering': ['id'],
+            },
+        ),
+    ]
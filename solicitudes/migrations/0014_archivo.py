@@ -0,0 +1,97 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0013_eventosolicitud'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolicitudArchivada',
+            fields=[
+                ('departamento', models.CharField(choices=[('Química', 'Química'), ('Microbiología', 'Microbiología'), ('Dirección', 'Dirección'), ('Proyecto de equipamiento', 'Proyecto de equipamiento')], help_text='El departamento que hace la solicitud', max_length=50)),
+                ('urgente', models.CharField(choices=[('Aplica', 'Aplica'), ('No Aplica', 'No Aplica')], default='No Aplica', help_text='Indique si la solicitud requiere trámite urgente', max_length=10)),
+                ('ref_departamento', models.CharField(blank=True, editable=False, help_text='Identificación automática (Ej: M-01-25)', max_length=100)),
+                ('descripcion_pedido', models.TextField(help_text='Descripción general del pedido (SBS)')),
+                ('monto_comprometido_sbs', models.DecimalField(decimal_places=2, help_text='Monto total de la SBS enviada a presupuesto', max_digits=10)),
+                ('tipo_compra', models.CharField(choices=[('Bien', 'Bien'), ('Servicio', 'Servicio')], help_text='Si la SBS es un bien o un servicio', max_length=10)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('fecha_creacion', models.DateTimeField()),
+                ('fecha_actualizacion', models.DateTimeField()),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True)),
+                ('solicitante', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='solicitudes_archivadas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Solicitud Archivada',
+                'verbose_name_plural': 'Solicitudes Archivadas',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeguimientoCompraArchivado',
+            fields=[
+                ('numero_partida', models.CharField(blank=True, max_length=100, verbose_name='NÚMERO DE PARTIDA')),
+                ('condicion', models.CharField(blank=True, max_length=255, verbose_name='CONDICIÓN')),
+                ('fecha_ingreso_v3', models.DateField(blank=True, null=True, verbose_name='FECHA DE INGRESO AL V3')),
+                ('sbs_numero', models.CharField(blank=True, max_length=50, verbose_name='NÚMERO DE SBS')),
+                ('enlace_evaluacion', models.URLField(blank=True, max_length=500, verbose_name='ENLACE DE EVALUACIÓN')),
+                ('enlace_recibido_conforme', models.URLField(blank=True, max_length=500, verbose_name='ENLACE DE RECIBIDO CONFORME')),
+                ('numero_recibido_conforme', models.TextField(blank=True, verbose_name='NÚMERO DE RECIBIDO CONFORME')),
+                ('observacion_ajuste', models.TextField(blank=True, verbose_name='OBSERVACIÓN DEL AJUSTE')),
+                ('fecha_pedido_evaluado', models.DateField(blank=True, null=True, verbose_name='FECHA DE PEDIDO EVALUADO')),
+                ('oc_numero', models.CharField(blank=True, max_length=100, verbose_name='NÚMERO DE LA ORDEN DE COMPRA')),
+                ('fecha_publicacion_oc', models.DateField(blank=True, null=True, verbose_name='FECHA DE PUBLICACIÓN DE LA ORDEN DE COMPRA')),
+                ('monto_oc', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='MONTO DE LA ORDEN DE COMPRA')),
+                ('tipo_entrega', models.CharField(blank=True, choices=[('Total', 'Total'), ('Parcial', 'Parcial')], max_length=10, verbose_name='TIPO DE ENTREGA')),
+                ('plazo_entrega', models.PositiveIntegerField(blank=True, null=True, verbose_name='PLAZO DE ENTREGA')),
+                ('tipo_plazo', models.CharField(blank=True, choices=[('Calendario', 'Días Calendario'), ('Habiles', 'Días Hábiles')], max_length=15, verbose_name='TIPO DE PLAZO')),
+                ('vencimiento_oc', models.DateField(blank=True, null=True, verbose_name='VENCIMIENTO DE LA ORDEN DE COMPRA')),
+                ('proveedor', models.CharField(blank=True, max_length=256, verbose_name='PROVEEDOR')),
+                ('solicitud_ajuste', models.TextField(blank=True, verbose_name='SOLICITUD DE AJUSTE')),
+                ('numero_ajuste', models.CharField(blank=True, max_length=50, verbose_name='NÚMERO DE AJUSTE')),
+                ('nuevo_plazo_entrega', models.DateField(blank=True, null=True, verbose_name='NUEVO PLAZO DE ENTREGA')),
+                ('status_final_compra', models.CharField(blank=True, choices=[('OC - POR ENTREGAR', 'OC - POR ENTREGAR'), ('OC - ENTREGADA ***(ENTREGA TOTAL)*** COMPLETADA.', 'OC - ENTREGADA ***(ENTREGA TOTAL)*** COMPLETADA.'), ('OC - PENDIENTE POR ENTREGAR ***(ENTREGA PARCIAL):*** Próxima a completarse.', 'OC - PENDIENTE POR ENTREGAR ***(ENTREGA PARCIAL):*** Próxima a completarse.'), ('OC - SERVICIO REALIZADO ***(ENTREGA TOTAL)***COMPLETADA.', 'OC - SERVICIO REALIZADO ***(ENTREGA TOTAL)***COMPLETADA.'), ('OC - SERVICIO PENDIENTE POR REALIZAR (ENTREGA PARCIAL ):*** Próxima a completarse.', 'OC - SERVICIO PENDIENTE POR REALIZAR (ENTREGA PARCIAL ):*** Próxima a completarse.'), ('OC - ***PARCIAL FINALIZADO***', 'OC - ***PARCIAL FINALIZADO***')], max_length=100, verbose_name='ESTADO FINAL DE LA COMPRA')),
+                ('fecha_recibo', models.DateField(blank=True, null=True, verbose_name='FECHA DE RECIBIDO EN ALMACÉN')),
+                ('quien_recibe_almacen', models.TextField(blank=True, verbose_name='QUIÉN RECIBE EN ALMACÉN')),
+                ('observacion_1', models.TextField(blank=True, verbose_name='OBSERVACIÓN 1')),
+                ('observacion_2', models.TextField(blank=True, verbose_name='OBSERVACIÓN 2')),
+                ('mantenimiento', models.BooleanField(default=False, verbose_name='MANTENIMIENTO')),
+                ('calibracion', models.BooleanField(default=False, verbose_name='CALIBRACIÓN')),
+                ('caracterizacion', models.BooleanField(default=False, verbose_name='CARACTERIZACIÓN')),
+                ('fecha_inicial_mant_calib_caract', models.DateField(blank=True, null=True, verbose_name='FECHA INICIAL DEL SERVICIO')),
+                ('enlace_orden_compra', models.URLField(blank=True, max_length=500, verbose_name='ENLACE DE LA ORDEN DE COMPRA')),
+                ('enlace_sbs', models.URLField(blank=True, max_length=500, verbose_name='ENLACE DE LA SBS INGRESADA AL V3')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('fecha_actualizacion', models.DateTimeField()),
+                ('proveedor_catalogo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='seguimientos_archivados', to='solicitudes.proveedor', verbose_name='PROVEEDOR (CATÁLOGO)')),
+                ('solicitud', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='seguimiento', to='solicitudes.solicitudarchivada')),
+            ],
+            options={
+                'verbose_name': 'Seguimiento de Compra Archivado',
+                'verbose_name_plural': 'Seguimientos de Compras Archivados',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='solicitudarchivada',
+            index=models.Index(fields=['-fecha_creacion'], name='sol_archivada_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitudarchivada',
+            index=models.Index(fields=['departamento', '-fecha_creacion'], name='sol_archivada_depto_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompraarchivado',
+            index=models.Index(fields=['condicion'], name='seg_archivado_condicion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompraarchivado',
+            index=models.Index(fields=['status_final_compra'], name='seg_archivado_status_idx'),
+        ),
+    ]
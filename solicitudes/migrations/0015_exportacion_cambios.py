@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0014_archivo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PuntoControlCambios',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('marca_agua', models.DateTimeField(blank=True, help_text='Todo lo cambiado hasta esta fecha ya se exportó', null=True)),
+                ('corrida_desde', models.DateTimeField(blank=True, null=True)),
+                ('corrida_hasta', models.DateTimeField(blank=True, null=True)),
+                ('corrida_formato', models.CharField(blank=True, max_length=10)),
+                ('avance', models.JSONField(blank=True, default=dict)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Punto de Control de Exportación',
+                'verbose_name_plural': 'Puntos de Control de Exportación',
+            },
+        ),
+        migrations.CreateModel(
+            name='RegistroBorrado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tabla', models.CharField(max_length=30)),
+                ('objeto_id', models.BigIntegerField()),
+                ('motivo', models.CharField(choices=[('eliminada', 'Eliminada'), ('archivada', 'Archivada')], default='eliminada', max_length=10)),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Registro de Borrado',
+                'verbose_name_plural': 'Registros de Borrados',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['fecha_actualizacion'], name='seguimiento_actualizacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['fecha_actualizacion'], name='solicitud_actualizacion_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0015_exportacion_cambios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FirmaSolicitud',
+            fields=[
+                ('solicitud', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='firma', serialize=False, to='solicitudes.solicitud')),
+                ('minhash', models.BinaryField()),
+                ('banda_monto', models.IntegerField()),
+            ],
+            options={
+                'verbose_name': 'Firma de Solicitud',
+                'verbose_name_plural': 'Firmas de Solicitudes',
+            },
+        ),
+        migrations.CreateModel(
+            name='CubetaLSH',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.BigIntegerField(db_index=True)),
+                ('solicitud', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cubetas_lsh', to='solicitudes.solicitud')),
+            ],
+            options={
+                'verbose_name': 'Cubeta LSH',
+                'verbose_name_plural': 'Cubetas LSH',
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:38
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0016_duplicados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContenidoAdjunto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('tamano', models.PositiveBigIntegerField()),
+                ('tipo_contenido', models.CharField(max_length=100)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Contenido de Adjunto',
+                'verbose_name_plural': 'Contenidos de Adjuntos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Adjunto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etapa', models.CharField(choices=[('sbs', 'SBS ingresada al V3'), ('evaluacion', 'Evaluación'), ('orden_compra', 'Orden de compra'), ('recibido_conforme', 'Recibido conforme')], max_length=20)),
+                ('nombre', models.CharField(max_length=255)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('seguimiento', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='adjuntos', to='solicitudes.seguimientocompra')),
+                ('subido_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='adjuntos', to=settings.AUTH_USER_MODEL)),
+                ('contenido', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='adjuntos', to='solicitudes.contenidoadjunto')),
+            ],
+            options={
+                'verbose_name': 'Adjunto',
+                'verbose_name_plural': 'Adjuntos',
+                'ordering': ['etapa', 'fecha_creacion'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubidaAdjunto',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('etapa', models.CharField(choices=[('sbs', 'SBS ingresada al V3'), ('evaluacion', 'Evaluación'), ('orden_compra', 'Orden de compra'), ('recibido_conforme', 'Recibido conforme')], max_length=20)),
+                ('nombre', models.CharField(max_length=255)),
+                ('tamano', models.PositiveBigIntegerField()),
+                ('recibido', models.PositiveBigIntegerField(default=0)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('seguimiento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subidas', to='solicitudes.seguimientocompra')),
+                ('subido_por', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subidas_adjuntos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Subida de Adjunto',
+                'verbose_name_plural': 'Subidas de Adjuntos',
+            },
+        ),
+    ]
@@ -0,0 +1,112 @@
+import accounts.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Modelos con departamento en texto que pasan a la FK
+MODELOS = ('Solicitud', 'SolicitudArchivada', 'EventoSolicitud')
+
+
+def departamento_para(Departamento, db, nombre):
+    """Igual que en accounts 0003: un nombre desconocido se crea con prefijo GEN."""
+    departamento = Departamento.objects.using(db).filter(nombre=nombre).first()
+    if departamento is None:
+        prefijo, n = 'GEN', 1
+        while Departamento.objects.using(db).filter(prefijo=prefijo).exists():
+            n += 1
+            prefijo = f'GEN{n}'
+        departamento = Departamento.objects.using(db).create(nombre=nombre, prefijo=prefijo, activo=False)
+    return departamento
+
+
+def asignar_departamentos(apps, schema_editor):
+    Departamento = apps.get_model('accounts', 'Departamento')
+    db = schema_editor.connection.alias
+    for nombre_modelo in MODELOS:
+        modelo = apps.get_model('solicitudes', nombre_modelo)
+        nombres = modelo.objects.using(db).values_list('departamento', flat=True).distinct().order_by()
+        # Un UPDATE por departamento, no por fila
+        for nombre in list(nombres):
+            departamento = departamento_para(Departamento, db, nombre)
+            modelo.objects.using(db).filter(departamento=nombre).update(departamento_nuevo=departamento.pk)
+
+
+def restaurar_nombres(apps, schema_editor):
+    Departamento = apps.get_model('accounts', 'Departamento')
+    db = schema_editor.connection.alias
+    for nombre_modelo in MODELOS:
+        modelo = apps.get_model('solicitudes', nombre_modelo)
+        for departamento in Departamento.objects.using(db):
+            modelo.objects.using(db).filter(departamento_nuevo=departamento.pk).update(departamento=departamento.nombre)
+
+
+def _campo_nuevo(**kwargs):
+    return accounts.models.DepartamentoField(null=True, related_name='+', to='accounts.departamento', **kwargs)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_departamento'),
+        ('solicitudes', '0017_adjuntos'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='solicitud',
+            name='solicitud_depto_fecha_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='solicitudarchivada',
+            name='sol_archivada_depto_fecha_idx',
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='departamento_nuevo',
+            field=_campo_nuevo(on_delete=django.db.models.deletion.PROTECT),
+        ),
+        migrations.AddField(
+            model_name='solicitudarchivada',
+            name='departamento_nuevo',
+            field=_campo_nuevo(on_delete=django.db.models.deletion.PROTECT),
+        ),
+        migrations.AddField(
+            model_name='eventosolicitud',
+            name='departamento_nuevo',
+            field=_campo_nuevo(on_delete=django.db.models.deletion.DO_NOTHING, db_constraint=False),
+        ),
+        migrations.RunPython(asignar_departamentos, restaurar_nombres),
+        # Con default, para que al revertir se pueda volver a agregar la columna de texto
+        *(
+            migrations.AlterField(model_name=modelo.lower(), name='departamento', field=models.CharField(default='', max_length=50))
+            for modelo in MODELOS
+        ),
+        migrations.RemoveField(model_name='solicitud', name='departamento'),
+        migrations.RemoveField(model_name='solicitudarchivada', name='departamento'),
+        migrations.RemoveField(model_name='eventosolicitud', name='departamento'),
+        migrations.RenameField(model_name='solicitud', old_name='departamento_nuevo', new_name='departamento'),
+        migrations.RenameField(model_name='solicitudarchivada', old_name='departamento_nuevo', new_name='departamento'),
+        migrations.RenameField(model_name='eventosolicitud', old_name='departamento_nuevo', new_name='departamento'),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='departamento',
+            field=accounts.models.DepartamentoField(help_text='El departamento que hace la solicitud', on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.departamento'),
+        ),
+        migrations.AlterField(
+            model_name='solicitudarchivada',
+            name='departamento',
+            field=accounts.models.DepartamentoField(help_text='El departamento que hace la solicitud', on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.departamento'),
+        ),
+        migrations.AlterField(
+            model_name='eventosolicitud',
+            name='departamento',
+            field=accounts.models.DepartamentoField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='accounts.departamento'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['departamento', '-fecha_creacion'], name='solicitud_depto_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitudarchivada',
+            index=models.Index(fields=['departamento', '-fecha_creacion'], name='sol_archivada_depto_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0018_departamento_fk'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['monto_oc', 'id'], name='seguimiento_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['vencimiento_oc', 'id'], name='seguimiento_vencimiento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['proveedor', 'id'], name='seguimiento_proveedor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['sbs_numero', 'id'], name='seguimiento_sbs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompraarchivado',
+            index=models.Index(fields=['monto_oc', 'id'], name='seg_archivado_monto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompraarchivado',
+            index=models.Index(fields=['vencimiento_oc', 'id'], name='seg_archivado_vencimiento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompraarchivado',
+            index=models.Index(fields=['proveedor', 'id'], name='seg_archivado_proveedor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompraarchivado',
+            index=models.Index(fields=['sbs_numero', 'id'], name='seg_archivado_sbs_idx'),
+        ),
+    ]
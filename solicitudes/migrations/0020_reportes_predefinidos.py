@@ -0,0 +1,78 @@
+# Generated by Django 5.2.4 on 2026-10-19 03:09
+
+import accounts.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_departamento'),
+        ('solicitudes', '0019_indices_orden_reporte'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportePredefinido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('departamento', accounts.models.DepartamentoField(blank=True, help_text='Si se indica, lo ven todos los usuarios del departamento', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reportes_predefinidos', to='accounts.departamento')),
+                ('propietario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reportes_predefinidos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Reporte Predefinido',
+                'verbose_name_plural': 'Reportes Predefinidos',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InstantaneaReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_calculo', models.DateTimeField()),
+                ('total_filas', models.PositiveIntegerField(default=0)),
+                ('total_monto_oc', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('archivo', models.FileField(blank=True, upload_to='reportes/%Y/%m/')),
+                ('alcance', accounts.models.DepartamentoField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.departamento')),
+                ('reporte', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='instantaneas', to='solicitudes.reportepredefinido')),
+            ],
+            options={
+                'verbose_name': 'Instantánea de Reporte',
+                'verbose_name_plural': 'Instantáneas de Reportes',
+            },
+        ),
+        migrations.CreateModel(
+            name='FilaInstantanea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicion', models.PositiveIntegerField()),
+                ('seguimiento_id', models.BigIntegerField()),
+                ('solicitud_id', models.BigIntegerField()),
+                ('archivado', models.BooleanField(default=False)),
+                ('ref_departamento', models.CharField(blank=True, max_length=100)),
+                ('sbs_numero', models.CharField(blank=True, max_length=50)),
+                ('oc_numero', models.CharField(blank=True, max_length=100)),
+                ('descripcion_pedido', models.TextField(blank=True)),
+                ('tipo_entrega', models.CharField(blank=True, max_length=100)),
+                ('proveedor', models.CharField(blank=True, max_length=256)),
+                ('monto_oc', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('instantanea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='filas', to='solicitudes.instantaneareporte')),
+            ],
+            options={
+                'verbose_name': 'Fila de Instantánea',
+                'verbose_name_plural': 'Filas de Instantáneas',
+                'indexes': [models.Index(fields=['instantanea', 'seguimiento_id'], name='fila_instantanea_seg_idx')],
+                'constraints': [models.UniqueConstraint(fields=('instantanea', 'posicion'), name='fila_instantanea_posicion_uniq')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='instantaneareporte',
+            constraint=models.UniqueConstraint(fields=('reporte', 'alcance'), name='instantanea_reporte_alcance_uniq'),
+        ),
+    ]
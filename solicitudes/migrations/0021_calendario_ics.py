@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 03:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0020_reportes_predefinidos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenCalendario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, unique=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Token de Calendario',
+                'verbose_name_plural': 'Tokens de Calendario',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['nuevo_plazo_entrega', 'id'], name='seguimiento_nuevo_plazo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientocompra',
+            index=models.Index(fields=['fecha_inicial_mant_calib_caract', 'id'], name='seguimiento_servicio_idx'),
+        ),
+        migrations.AddField(
+            model_name='tokencalendario',
+            name='usuario',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='token_calendario', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
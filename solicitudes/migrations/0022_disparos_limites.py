@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 03:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0021_calendario_ics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DisparoLimite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('nombre', models.CharField(max_length=100)),
+                ('tipo', models.CharField(choices=[('ventana', 'Peticiones por ventana'), ('concurrencia', 'Peticiones en curso')], max_length=15)),
+                ('veces', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Disparo de Límite',
+                'verbose_name_plural': 'Disparos de Límites',
+                'constraints': [models.UniqueConstraint(fields=('dia', 'nombre', 'tipo'), name='disparo_limite_uniq')],
+            },
+        ),
+    ]
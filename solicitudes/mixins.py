@@ -0,0 +1,79 @@
+# solicitudes/mixins.py
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.utils.cache import patch_vary_headers
+
+from lraa_project.routers import leer_de_replica
+
+from .permisos import capacidades
+
+# Cabecera que envía static/js/fragmentos.js al pedir solo los resultados
+FRAGMENT_HEADER = 'X-Fragment'
+
+
+def es_fragmento(request):
+    return request.headers.get(FRAGMENT_HEADER) == '1'
+
+
+def plantilla_para(request, template_name, fragment_template_name):
+    """Plantilla completa o solo el fragmento de resultados, según la petición."""
+    return fragment_template_name if es_fragmento(request) else template_name
+
+
+def marcar_vary_fragmento(response):
+    # La misma URL devuelve la página o el fragmento: las cachés (y el
+    # historial del navegador) no deben mezclar una respuesta con la otra.
+    patch_vary_headers(response, (FRAGMENT_HEADER,))
+    return response
+
+
+class ReplicaReadMixin:
+    """
+    Ejecuta toda la vista (consultas de get_queryset, conteo del paginador,
+    agregados y render de la plantilla) dentro de ``leer_de_replica()``.
+    Usar solo en vistas de lectura; las escrituras siguen yendo a 'default'.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with leer_de_replica():
+            response = super().dispatch(request, *args, **kwargs)
+            # Las TemplateResponse se renderizan después de dispatch; se
+            # fuerza aquí para que sus consultas también usen la réplica.
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+
+
+class FragmentTemplateMixin:
+    """
+    Con la cabecera ``X-Fragment: 1`` renderiza ``fragment_template_name``
+    (tabla y paginador) en lugar de la página completa. El resto de la vista
+    (consultas, paginación, contexto) no cambia.
+    """
+    fragment_template_name = None
+
+    @property
+    def template_engine(self):
+        # Django o Jinja2 (settings.PLANTILLAS_MOTOR); las dos versiones dan el mismo HTML
+        return settings.PLANTILLAS_MOTOR
+
+    def get_template_names(self):
+        if self.fragment_template_name and es_fragmento(self.request):
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def render_to_response(self, context, **response_kwargs):
+        return marcar_vary_fragmento(super().render_to_response(context, **response_kwargs))
+
+
+class SolicitudEditableMixin:
+    """
+    Editar o borrar una solicitud: el permiso se comprueba sobre el objeto
+    que ya cargó la vista, sin volver a consultarlo (ver permisos.py).
+    """
+
+    def get_object(self, queryset=None):
+        solicitud = super().get_object(queryset)
+        if not capacidades(self.request.user).puede_editar(solicitud):
+            raise PermissionDenied
+        return solicitud
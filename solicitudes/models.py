@@ -1,23 +1,44 @@
 from django.db import models
 from django.conf import settings # Para referenciar al CustomUser de forma segura
 from datetime import date, datetime, timedelta # Importamos timedelta para cálculos de fechas
+import uuid
+
+from accounts.models import DepartamentoField
+from .permisos import capacidades
+from .textos import normalizar_nombre
 
 # Asumo que tu CustomUser está en una app llamada 'accounts'
 # from accounts.models import CustomUser 
 
+class SolicitudQuerySet(models.QuerySet):
+
+    def visible_to(self, user):
+        """Solicitudes que el usuario puede ver (ver permisos.py)."""
+        departamento = capacidades(user).departamento_visible
+        if departamento is None:
+            return self
+        return self.filter(departamento_id=departamento)
+
+
+class SeguimientoCompraQuerySet(models.QuerySet):
+
+    def visible_to(self, user):
+        """Seguimientos de las solicitudes que el usuario puede ver."""
+        return self.del_alcance(capacidades(user).departamento_visible)
+
+    def del_alcance(self, departamento):
+        """Seguimientos de un departamento (id), o todos si es None."""
+        if departamento is None:
+            return self
+        return self.filter(solicitud__departamento_id=departamento)
+
+
 # --- Modelo para los campos en Rojo ---
-class Solicitud(models.Model):
+class SolicitudBase(models.Model):
     """
-    Representa la solicitud inicial de un bien o servicio hecha por un departamento.
+    Campos de la solicitud comunes a Solicitud y SolicitudArchivada
+    (misma forma de tabla, ver archivo.py).
     """
-    DEPARTAMENTO_CHOICES = [
-        ('Química', 'Química'),
-        ('Microbiología', 'Microbiología'),
-        ('Dirección', 'Dirección'),
-        ('Proyecto de equipamiento', 'Proyecto de equipamiento'),
-        # Agrega más departamentos si es necesario
-    ]
-
     TIPO_COMPRA_CHOICES = [
         ('Bien', 'Bien'),
         ('Servicio', 'Servicio'),
@@ -28,16 +49,8 @@ class Solicitud(models.Model):
         ('No Aplica', 'No Aplica'),
     ]
 
-    # Relación con el usuario que crea la solicitud
-    solicitante = models.ForeignKey(
-        settings.AUTH_USER_MODEL, 
-        on_delete=models.PROTECT, 
-        related_name='solicitudes'
-    )
-    
-    departamento = models.CharField(
-        max_length=50, 
-        choices=DEPARTAMENTO_CHOICES,
+    departamento = DepartamentoField(
+        related_name='+',
         help_text="El departamento que hace la solicitud"
     )
 
@@ -70,10 +83,30 @@ class Solicitud(models.Model):
         choices=TIPO_COMPRA_CHOICES,
         help_text="Si la SBS es un bien o un servicio"
     )
+
+    def __str__(self):
+        return f"{self.ref_departamento} | {self.descripcion_pedido[:50]}..."
+
+    class Meta:
+        abstract = True
+
+
+class Solicitud(SolicitudBase):
+    """
+    Representa la solicitud inicial de un bien o servicio hecha por un departamento.
+    """
+    # Relación con el usuario que crea la solicitud
+    solicitante = models.ForeignKey(
+        settings.AUTH_USER_MODEL, 
+        on_delete=models.PROTECT, 
+        related_name='solicitudes'
+    )
     
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    objects = SolicitudQuerySet.as_manager()
+
     # --- LÓGICA DE GENERACIÓN DE CÓDIGO ---
     def save(self, *args, **kwargs):
         # Solo generamos si es nuevo o no tiene referencia
@@ -84,52 +117,102 @@ class Solicitud(models.Model):
     def generar_codigo_referencia(self):
         """Genera el código consecutivo tipo DEP-###-AAAA"""
         
-        # 1. Prefijos
-        prefijos = {
-            'Química': 'Q',
-            'Microbiología': 'M',
-            'Dirección': 'D',
-            'Proyecto de equipamiento': 'PE', 
-        }
-        prefijo = prefijos.get(self.departamento, 'GEN')
+        # 1. Prefijo del departamento (tabla Departamento, en memoria)
+        prefijo = self.departamento.prefijo if self.departamento_id else 'GEN'
         
         # 2. Año actual de 4 dígitos (Ej: 2025)
         anio_actual = datetime.now().strftime('%Y')
         
-        # 3. Buscar último consecutivo de este año y departamento
-        ultima_solicitud = Solicitud.objects.filter(
-            departamento=self.departamento,
-            ref_departamento__endswith=f"-{anio_actual}"
-        ).order_by('id').last()
+        # 3. Buscar último consecutivo de este año y departamento, también
+        # entre las archivadas para no repetir un número ya usado
+        consecutivo_anterior = 0
+        for modelo in (Solicitud, SolicitudArchivada):
+            ultima_solicitud = modelo.objects.filter(
+                departamento_id=self.departamento_id,
+                ref_departamento__endswith=f"-{anio_actual}"
+            ).order_by('id').last()
 
-        if ultima_solicitud and ultima_solicitud.ref_departamento:
-            try:
-                # ref: "M-05-2025" -> split -> ["M", "05", "2025"]
-                partes = ultima_solicitud.ref_departamento.split('-')
-                consecutivo_anterior = int(partes[1])
-                nuevo_consecutivo = consecutivo_anterior + 1
-            except (IndexError, ValueError):
-                nuevo_consecutivo = 1
-        else:
-            nuevo_consecutivo = 1
+            if ultima_solicitud and ultima_solicitud.ref_departamento:
+                try:
+                    # ref: "M-05-2025" -> split -> ["M", "05", "2025"]
+                    partes = ultima_solicitud.ref_departamento.split('-')
+                    consecutivo_anterior = max(consecutivo_anterior, int(partes[1]))
+                except (IndexError, ValueError):
+                    pass
+        nuevo_consecutivo = consecutivo_anterior + 1
 
         # 4. Asignar formato
         self.ref_departamento = f"{prefijo}-{nuevo_consecutivo:02d}-{anio_actual}"
 
-    def __str__(self):
-        return f"{self.ref_departamento} | {self.descripcion_pedido[:50]}..."
-
     class Meta:
         verbose_name = "Solicitud de Bien o Servicio"
         verbose_name_plural = "Solicitudes de Bienes y Servicios"
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Listados ordenados por fecha y filtros por año (admin, reporte)
+            models.Index(fields=['-fecha_creacion'], name='solicitud_fecha_idx'),
+            # Filtro por departamento + orden por fecha; también la búsqueda
+            # del último consecutivo en generar_codigo_referencia
+            models.Index(fields=['departamento', '-fecha_creacion'], name='solicitud_depto_fecha_idx'),
+            # Exportación incremental (cambios.py): filas cambiadas desde la última corrida
+            models.Index(fields=['fecha_actualizacion'], name='solicitud_actualizacion_idx'),
+        ]
 
 
-# --- Modelo para los campos en Negro ---
-class SeguimientoCompra(models.Model):
+class ProveedorManager(models.Manager):
+
+    def para_nombre(self, nombre):
+        """
+        Proveedor del catálogo que corresponde a un nombre escrito a mano
+        (se crea si no existe). None si el nombre está vacío.
+        """
+        clave = normalizar_nombre(nombre)
+        if not clave:
+            return None
+        proveedor, _ = self.get_or_create(clave=clave, defaults={'nombre': nombre.strip()[:256]})
+        return proveedor
+
+
+class Proveedor(models.Model):
     """
-    Representa el seguimiento, la orden de compra y la recepción de una Solicitud.
+    Catálogo de proveedores. Agrupa las distintas formas en que se escribe
+    un mismo proveedor en SeguimientoCompra.proveedor bajo una clave
+    normalizada (sin acentos ni mayúsculas ni puntuación).
     """
+    nombre = models.CharField(max_length=256, verbose_name="NOMBRE", help_text="Forma en que se muestra")
+    clave = models.CharField(
+        max_length=256,
+        unique=True,  # El índice único sirve también para buscar por prefijo
+        editable=False,
+        help_text="Nombre normalizado, ver solicitudes.textos.normalizar_nombre"
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    objects = ProveedorManager()
+
+    def save(self, *args, **kwargs):
+        # La clave identifica al grupo: cambiar el nombre visible no la cambia
+        if not self.clave:
+            self.clave = normalizar_nombre(self.nombre)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.nombre
+
+    class Meta:
+        verbose_name = "Proveedor"
+        verbose_name_plural = "Proveedores"
+        ordering = ['clave']
+
+
+class SeguimientoBase(models.Model):
+    """
+    Campos y cálculos del seguimiento comunes a SeguimientoCompra y
+    SeguimientoCompraArchivado.
+    """
+    # El reporte con archivo mezcla ambos modelos; las archivadas no tienen detalle
+    archivado = False
+
     CONDICION_CHOICES = [
         ('recorrido', 'En Recorrido'),
         ('ingresado_v3', 'Ingresado al V3'),
@@ -155,12 +238,6 @@ class SeguimientoCompra(models.Model):
         ('OC - ***PARCIAL FINALIZADO***', 'OC - ***PARCIAL FINALIZADO***'),
     ]
     
-    # Relación uno a uno con la solicitud original. Cada solicitud tiene un único seguimiento.
-    solicitud = models.OneToOneField(
-        Solicitud, 
-        on_delete=models.CASCADE, 
-        related_name='seguimiento'
-    )
     def get_condiciones_list(self):
         """Retorna una lista de diccionarios con el código y la etiqueta para el listado"""
         if not self.condicion:
@@ -220,8 +297,6 @@ class SeguimientoCompra(models.Model):
     enlace_orden_compra = models.URLField(max_length=500, blank=True, verbose_name="ENLACE DE LA ORDEN DE COMPRA")
     enlace_sbs = models.URLField(max_length=500, blank=True, verbose_name="ENLACE DE LA SBS INGRESADA AL V3")
     
-    fecha_actualizacion = models.DateTimeField(auto_now=True)
-    
     # --- MÉTODOS DE FECHA ---
     def _agregar_dias_habiles(self, fecha_inicial, dias):
         if not isinstance(fecha_inicial, date): return None
@@ -239,25 +314,25 @@ class SeguimientoCompra(models.Model):
         if dias < 0: dias = 0
         return fecha_inicial + timedelta(days=dias)
 
-    def save(self, *args, **kwargs):
+    def calcular_vencimiento(self):
+        """
+        Fecha de vencimiento de la OC según publicación, plazo y tipo de plazo.
+        Devuelve el valor actual si faltan datos para calcularla.
+        """
         if self.fecha_publicacion_oc and self.plazo_entrega is not None and self.tipo_plazo:
             try:
                 fecha_con_dias_base = self._agregar_dias_habiles(self.fecha_publicacion_oc, 2)
                 if self.tipo_plazo == 'Habiles':
-                    self.vencimiento_oc = self._agregar_dias_habiles(fecha_con_dias_base, self.plazo_entrega)
+                    return self._agregar_dias_habiles(fecha_con_dias_base, self.plazo_entrega)
                 elif self.tipo_plazo == 'Calendario':
-                    self.vencimiento_oc = self._agregar_dias_calendario(fecha_con_dias_base, self.plazo_entrega)
+                    return self._agregar_dias_calendario(fecha_con_dias_base, self.plazo_entrega)
             except Exception:
                 pass
-        super(SeguimientoCompra, self).save(*args, **kwargs)
+        return self.vencimiento_oc
 
     def __str__(self):
         return f"Seguimiento de {self.solicitud}"
 
-    class Meta:
-        verbose_name = "Seguimiento de Compra"
-        verbose_name_plural = "Seguimientos de Compras"
-    
     def get_condicion_color(self):
         """Retorna el color de Bootstrap según el estado"""
         colores = {
@@ -269,4 +344,466 @@ class SeguimientoCompra(models.Model):
             'finalizado': 'dark',            # Negro/Gris oscuro
         }
         # Retorna el color o 'secondary' si no encuentra el estado
-        return colores.get(self.condicion, 'secondary')
\ No newline at end of file
+        return colores.get(self.condicion, 'secondary')
+
+    class Meta:
+        abstract = True
+
+
+# --- Modelo para los campos en Negro ---
+class SeguimientoCompra(SeguimientoBase):
+    """
+    Representa el seguimiento, la orden de compra y la recepción de una Solicitud.
+    """
+    # Relación uno a uno con la solicitud original. Cada solicitud tiene un único seguimiento.
+    solicitud = models.OneToOneField(
+        Solicitud, 
+        on_delete=models.CASCADE, 
+        related_name='seguimiento'
+    )
+    # Se asigna solo en save() a partir del texto de 'proveedor'
+    proveedor_catalogo = models.ForeignKey(
+        Proveedor,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='seguimientos',
+        verbose_name="PROVEEDOR (CATÁLOGO)"
+    )
+
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = SeguimientoCompraQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.vencimiento_oc = self.calcular_vencimiento()
+        self.proveedor_catalogo = Proveedor.objects.para_nombre(self.proveedor)
+        super(SeguimientoCompra, self).save(*args, **kwargs)
+
+    class Meta:
+        verbose_name = "Seguimiento de Compra"
+        verbose_name_plural = "Seguimientos de Compras"
+        indexes = [
+            # Filtros exactos del reporte y del admin
+            models.Index(fields=['condicion'], name='seguimiento_condicion_idx'),
+            models.Index(fields=['status_final_compra'], name='seguimiento_status_idx'),
+            models.Index(fields=['fecha_actualizacion'], name='seguimiento_actualizacion_idx'),
+            # Columnas que ordenan el reporte, con el id como desempate (ver queries.ORDENES_REPORTE)
+            models.Index(fields=['monto_oc', 'id'], name='seguimiento_monto_idx'),
+            models.Index(fields=['vencimiento_oc', 'id'], name='seguimiento_vencimiento_idx'),
+            models.Index(fields=['proveedor', 'id'], name='seguimiento_proveedor_idx'),
+            models.Index(fields=['sbs_numero', 'id'], name='seguimiento_sbs_idx'),
+            # Rangos de fechas del calendario ICS (ver calendario.py); vencimiento_oc usa el de arriba
+            models.Index(fields=['nuevo_plazo_entrega', 'id'], name='seguimiento_nuevo_plazo_idx'),
+            models.Index(fields=['fecha_inicial_mant_calib_caract', 'id'], name='seguimiento_servicio_idx'),
+        ]
+
+
+# --- Archivo histórico (ver solicitudes/archivo.py) ---
+class SolicitudArchivada(SolicitudBase):
+    """
+    Solicitud cerrada (finalizada o anulada) de un año anterior, movida
+    fuera de la tabla activa. Conserva el id y las fechas originales.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    solicitante = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='solicitudes_archivadas'
+    )
+    # Sin auto_now: se copian tal cual de la solicitud original
+    fecha_creacion = models.DateTimeField()
+    fecha_actualizacion = models.DateTimeField()
+    fecha_archivado = models.DateTimeField(auto_now_add=True)
+
+    objects = SolicitudQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Solicitud Archivada"
+        verbose_name_plural = "Solicitudes Archivadas"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['-fecha_creacion'], name='sol_archivada_fecha_idx'),
+            models.Index(fields=['departamento', '-fecha_creacion'], name='sol_archivada_depto_fecha_idx'),
+        ]
+
+
+class SeguimientoCompraArchivado(SeguimientoBase):
+    """Seguimiento de una SolicitudArchivada, con el mismo id que tenía."""
+    archivado = True
+
+    id = models.BigIntegerField(primary_key=True)
+    solicitud = models.OneToOneField(
+        SolicitudArchivada,
+        on_delete=models.CASCADE,
+        related_name='seguimiento'
+    )
+    proveedor_catalogo = models.ForeignKey(
+        Proveedor,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='seguimientos_archivados',
+        verbose_name="PROVEEDOR (CATÁLOGO)"
+    )
+    fecha_actualizacion = models.DateTimeField()
+
+    objects = SeguimientoCompraQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Seguimiento de Compra Archivado"
+        verbose_name_plural = "Seguimientos de Compras Archivados"
+        indexes = [
+            models.Index(fields=['condicion'], name='seg_archivado_condicion_idx'),
+            models.Index(fields=['status_final_compra'], name='seg_archivado_status_idx'),
+            models.Index(fields=['monto_oc', 'id'], name='seg_archivado_monto_idx'),
+            models.Index(fields=['vencimiento_oc', 'id'], name='seg_archivado_vencimiento_idx'),
+            models.Index(fields=['proveedor', 'id'], name='seg_archivado_proveedor_idx'),
+            models.Index(fields=['sbs_numero', 'id'], name='seg_archivado_sbs_idx'),
+        ]
+
+
+class EventoSolicitud(models.Model):
+    """
+    Cambio en una solicitud o en su seguimiento, para las actualizaciones en
+    vivo del listado y del detalle (ver solicitudes/eventos.py). Los workers
+    que no atendieron el guardado los leen de aquí por id creciente.
+    """
+    # Sin FK: el evento de una solicitud eliminada también se tiene que enviar
+    solicitud_pk = models.BigIntegerField()
+    # Sin restricción: los eventos se purgan solos y no deben impedir nada
+    departamento = DepartamentoField(related_name='+', on_delete=models.DO_NOTHING, db_constraint=False)
+    datos = models.JSONField()
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Evento de Solicitud"
+        verbose_name_plural = "Eventos de Solicitudes"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.datos.get('tipo')} solicitud {self.solicitud_pk}"
+
+    def como_mensaje(self):
+        # departamento_id es para filtrar por alcance; no se envía al navegador
+        return {'id': self.pk, 'departamento_id': self.departamento_id, **self.datos}
+
+
+class RegistroBorrado(models.Model):
+    """
+    Lápida de una Solicitud o un SeguimientoCompra borrado, para que la
+    exportación incremental (solicitudes/cambios.py) informe también las
+    bajas. La guarda signals.py en la misma transacción del borrado.
+    """
+    ELIMINADA = 'eliminada'
+    ARCHIVADA = 'archivada'  # Movida al archivo histórico (archivo.py), no perdida
+    MOTIVO_CHOICES = [
+        (ELIMINADA, 'Eliminada'),
+        (ARCHIVADA, 'Archivada'),
+    ]
+
+    tabla = models.CharField(max_length=30)  # Nombre de la tabla en la exportación
+    objeto_id = models.BigIntegerField()
+    motivo = models.CharField(max_length=10, choices=MOTIVO_CHOICES, default=ELIMINADA)
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Registro de Borrado"
+        verbose_name_plural = "Registros de Borrados"
+
+    def __str__(self):
+        return f"{self.tabla} #{self.objeto_id} ({self.motivo})"
+
+
+class PuntoControlCambios(models.Model):
+    """
+    Estado de la exportación incremental para un destino (cambios.py):
+    hasta qué fecha_actualizacion se exportó y, si una corrida quedó a
+    medias, por dónde iba cada tabla para retomarla.
+    """
+    nombre = models.CharField(max_length=50, unique=True)
+    marca_agua = models.DateTimeField(null=True, blank=True, help_text="Todo lo cambiado hasta esta fecha ya se exportó")
+    # Corrida en curso (vacía si la última terminó)
+    corrida_desde = models.DateTimeField(null=True, blank=True)
+    corrida_hasta = models.DateTimeField(null=True, blank=True)
+    corrida_formato = models.CharField(max_length=10, blank=True)
+    avance = models.JSONField(default=dict, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Punto de Control de Exportación"
+        verbose_name_plural = "Puntos de Control de Exportación"
+
+    def __str__(self):
+        return self.nombre
+
+    @property
+    def en_curso(self):
+        return self.corrida_hasta is not None
+
+
+class FirmaSolicitud(models.Model):
+    """
+    Firma MinHash de la descripción y banda de monto de una solicitud, para
+    detectar casi duplicados (ver solicitudes/duplicados.py).
+    """
+    solicitud = models.OneToOneField(
+        Solicitud,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='firma'
+    )
+    minhash = models.BinaryField()
+    banda_monto = models.IntegerField()
+
+    class Meta:
+        verbose_name = "Firma de Solicitud"
+        verbose_name_plural = "Firmas de Solicitudes"
+
+
+class CubetaLSH(models.Model):
+    """Una clave LSH de la firma de una solicitud (una fila por banda)."""
+    solicitud = models.ForeignKey(
+        Solicitud,
+        on_delete=models.CASCADE,
+        related_name='cubetas_lsh'
+    )
+    clave = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        verbose_name = "Cubeta LSH"
+        verbose_name_plural = "Cubetas LSH"
+
+
+# --- Adjuntos de los seguimientos (ver solicitudes/adjuntos.py) ---
+class ContenidoAdjunto(models.Model):
+    """
+    Archivo guardado en disco una sola vez, identificado por su SHA-256: si
+    se sube dos veces el mismo PDF, los dos Adjunto comparten el contenido.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    tamano = models.PositiveBigIntegerField()
+    tipo_contenido = models.CharField(max_length=100)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Contenido de Adjunto"
+        verbose_name_plural = "Contenidos de Adjuntos"
+
+    def __str__(self):
+        return self.sha256
+
+    @property
+    def ruta_relativa(self):
+        """Ruta dentro de ADJUNTOS_ROOT (también la que se pasa en X-Accel-Redirect)."""
+        return f"contenido/{self.sha256[:2]}/{self.sha256[2:4]}/{self.sha256}"
+
+
+class Adjunto(models.Model):
+    """Documento de respaldo de una etapa del seguimiento (SBS, evaluación, OC, recibido)."""
+    ETAPA_CHOICES = [
+        ('sbs', 'SBS ingresada al V3'),
+        ('evaluacion', 'Evaluación'),
+        ('orden_compra', 'Orden de compra'),
+        ('recibido_conforme', 'Recibido conforme'),
+    ]
+
+    # Sin restricción en la BD: al archivar, el seguimiento conserva su id en
+    # SeguimientoCompraArchivado y los adjuntos siguen valiendo. Los de
+    # seguimientos eliminados los borra la tarea limpiar_adjuntos.
+    seguimiento = models.ForeignKey(
+        SeguimientoCompra,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='adjuntos'
+    )
+    etapa = models.CharField(max_length=20, choices=ETAPA_CHOICES)
+    contenido = models.ForeignKey(ContenidoAdjunto, on_delete=models.PROTECT, related_name='adjuntos')
+    nombre = models.CharField(max_length=255)
+    subido_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='adjuntos'
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Adjunto"
+        verbose_name_plural = "Adjuntos"
+        ordering = ['etapa', 'fecha_creacion']
+
+    def __str__(self):
+        return self.nombre
+
+
+class SubidaAdjunto(models.Model):
+    """
+    Subida por partes en curso. El archivo parcial está en
+    ADJUNTOS_ROOT/subidas/<id>.part y ``recibido`` es cuántos bytes tiene.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    seguimiento = models.ForeignKey(SeguimientoCompra, on_delete=models.CASCADE, related_name='subidas')
+    etapa = models.CharField(max_length=20, choices=Adjunto.ETAPA_CHOICES)
+    nombre = models.CharField(max_length=255)
+    tamano = models.PositiveBigIntegerField()
+    recibido = models.PositiveBigIntegerField(default=0)
+    subido_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='subidas_adjuntos')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Subida de Adjunto"
+        verbose_name_plural = "Subidas de Adjuntos"
+
+    def __str__(self):
+        return f"{self.nombre} ({self.recibido}/{self.tamano})"
+
+
+# --- Reportes predefinidos (ver solicitudes/predefinidos.py) ---
+class ReportePredefinidoQuerySet(models.QuerySet):
+
+    def disponibles_para(self, user):
+        """Los reportes propios y los compartidos con el departamento del usuario."""
+        return self.filter(models.Q(propietario=user) | models.Q(departamento_id=user.department_id))
+
+
+class ReportePredefinido(models.Model):
+    """
+    Combinación de filtros del reporte de seguimientos guardada con un
+    nombre. Lo ve su propietario y, si tiene departamento, todos los
+    usuarios de ese departamento.
+    """
+    nombre = models.CharField(max_length=100)
+    # Los parámetros GET de SeguimientoFilterForm (filtros y orden)
+    parametros = models.JSONField(default=dict, blank=True)
+    propietario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='reportes_predefinidos'
+    )
+    departamento = DepartamentoField(
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='reportes_predefinidos',
+        help_text="Si se indica, lo ven todos los usuarios del departamento"
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    objects = ReportePredefinidoQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Reporte Predefinido"
+        verbose_name_plural = "Reportes Predefinidos"
+        ordering = ['nombre']
+
+    def __str__(self):
+        return self.nombre
+
+
+class InstantaneaReporte(models.Model):
+    """
+    Resultado precalculado de un ReportePredefinido para un alcance de
+    permisos: el departamento al que se limita quien lo abre, o ninguno
+    para los que ven todo (permisos.Capacidades.departamento_visible).
+    Las filas están en FilaInstantanea y la exportación en ``archivo``.
+    """
+    reporte = models.ForeignKey(ReportePredefinido, on_delete=models.CASCADE, related_name='instantaneas')
+    alcance = DepartamentoField(null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    # Momento en que empezó el cálculo: lo cambiado después se revisa en el siguiente refresco
+    fecha_calculo = models.DateTimeField()
+    total_filas = models.PositiveIntegerField(default=0)
+    total_monto_oc = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    archivo = models.FileField(upload_to='reportes/%Y/%m/', blank=True)
+
+    class Meta:
+        verbose_name = "Instantánea de Reporte"
+        verbose_name_plural = "Instantáneas de Reportes"
+        constraints = [
+            models.UniqueConstraint(fields=['reporte', 'alcance'], name='instantanea_reporte_alcance_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.reporte} ({self.fecha_calculo:%d/%m/%Y %H:%M})"
+
+
+class FilaInstantanea(models.Model):
+    """Fila de una InstantaneaReporte con los valores que muestra el reporte."""
+    instantanea = models.ForeignKey(InstantaneaReporte, on_delete=models.CASCADE, related_name='filas')
+    posicion = models.PositiveIntegerField()
+    # Sin FK: la fila puede venir del archivo histórico
+    seguimiento_id = models.BigIntegerField()
+    solicitud_id = models.BigIntegerField()
+    archivado = models.BooleanField(default=False)
+    ref_departamento = models.CharField(max_length=100, blank=True)
+    sbs_numero = models.CharField(max_length=50, blank=True)
+    oc_numero = models.CharField(max_length=100, blank=True)
+    descripcion_pedido = models.TextField(blank=True)
+    tipo_entrega = models.CharField(max_length=100, blank=True)
+    proveedor = models.CharField(max_length=256, blank=True)
+    monto_oc = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Fila de Instantánea"
+        verbose_name_plural = "Filas de Instantáneas"
+        constraints = [
+            # Una página es un rango de posiciones de este índice
+            models.UniqueConstraint(fields=['instantanea', 'posicion'], name='fila_instantanea_posicion_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['instantanea', 'seguimiento_id'], name='fila_instantanea_seg_idx'),
+        ]
+
+
+# --- Calendario ICS (ver solicitudes/calendario.py) ---
+class TokenCalendario(models.Model):
+    """
+    Enlace secreto del calendario ICS de un usuario: con el token el
+    calendario se descarga sin sesión. Generar uno nuevo revoca el anterior.
+    """
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='token_calendario'
+    )
+    token = models.CharField(max_length=64, unique=True)
+    fecha_creacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Token de Calendario"
+        verbose_name_plural = "Tokens de Calendario"
+
+    def __str__(self):
+        return f"Calendario de {self.usuario}"
+
+
+# --- Límites de uso (ver lraa_project/limites.py) ---
+class DisparoLimite(models.Model):
+    """
+    Veces que un límite de LIMITES_PETICIONES rechazó peticiones, por día,
+    vista y tipo. Se cuentan en la caché y la tarea volcar_disparos_limites
+    las pasa aquí: es la métrica para ajustar los límites y tiene que durar
+    todos los días que se consultan.
+    """
+    VENTANA = 'ventana'
+    CONCURRENCIA = 'concurrencia'
+    TIPO_CHOICES = [
+        (VENTANA, 'Peticiones por ventana'),
+        (CONCURRENCIA, 'Peticiones en curso'),
+    ]
+
+    dia = models.DateField()
+    nombre = models.CharField(max_length=100)  # Nombre de la URL
+    tipo = models.CharField(max_length=15, choices=TIPO_CHOICES)
+    veces = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Disparo de Límite"
+        verbose_name_plural = "Disparos de Límites"
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'nombre', 'tipo'], name='disparo_limite_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.dia:%Y-%m-%d} {self.nombre} {self.tipo}: {self.veces}"
@@ -0,0 +1,64 @@
+# solicitudes/permisos.py
+"""
+Reglas de acceso a solicitudes y seguimientos, en un solo lugar.
+
+Las usan los querysets (``Solicitud.objects.visible_to(user)``), las
+vistas (editar y borrar comprueban ``puede_editar`` sobre la solicitud ya
+cargada, ver mixins.SolicitudEditableMixin), SeguimientoCompraForm y las
+plantillas (variable ``capacidades`` del context processor). Solo dependen de
+``department`` y ``job_position``, que vienen con el usuario de la sesión,
+y de los departamentos en memoria (accounts.models.DepartamentoManager),
+así que no hacen consultas. El alcance por departamento es su id.
+"""
+from functools import cached_property
+
+# Ven todas las solicitudes, editan o borran cualquiera y editan el seguimiento
+CARGOS_ADMINISTRATIVOS = ('Asistente Administrativo', 'Director Encargado')
+
+
+class Capacidades:
+    """Lo que puede hacer un usuario. Se obtiene con ``capacidades(user)``."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def administrativo(self):
+        return self.user.is_authenticated and self.user.job_position in CARGOS_ADMINISTRATIVOS
+
+    @cached_property
+    def ve_todo(self):
+        # Departamento.acceso_total: ven todas las solicitudes (solo lectura fuera de las propias)
+        return self.administrativo or (
+            self.user.is_authenticated and self.user.department_id is not None and self.user.department.acceso_total
+        )
+
+    @cached_property
+    def departamento_visible(self):
+        """Id del departamento al que se limita lo que ve el usuario, o None si ve todo."""
+        return None if self.ve_todo else self.user.department_id
+
+    @property
+    def puede_editar_seguimiento(self):
+        return self.administrativo
+
+    def puede_ver(self, solicitud):
+        return self.ve_todo or solicitud.departamento_id == self.user.department_id
+
+    def puede_editar(self, solicitud):
+        """Editar o borrar la solicitud: el solicitante o el personal administrativo."""
+        return self.administrativo or solicitud.solicitante_id == self.user.pk
+
+
+def capacidades(user):
+    """
+    Capacidades del usuario, calculadas una vez por instancia. request.user
+    es una instancia nueva en cada petición, así que vale lo que dura la
+    petición; si cambian department o job_position se guarda el usuario y
+    la siguiente petición lo vuelve a cargar (accounts/backends.py).
+    """
+    try:
+        return user._capacidades
+    except AttributeError:
+        user._capacidades = Capacidades(user)
+        return user._capacidades
@@ -0,0 +1,174 @@
+# solicitudes/predefinidos.py
+"""
+Reportes predefinidos: combinaciones de filtros del reporte de seguimientos
+guardadas con un nombre, con el resultado precalculado (instantánea) para
+que abrirlas no vuelva a filtrar la tabla de seguimientos.
+
+* Hay una instantánea por reporte y alcance de permisos
+  (Capacidades.departamento_visible): quienes ven lo mismo comparten filas.
+* ``construir`` recalcula una instantánea (FilaInstantanea, totales y el CSV
+  de la exportación) leyendo el reporte una sola vez.
+* ``refrescar`` recorre las instantáneas y recalcula solo las afectadas por
+  lo cambiado desde su cálculo: seguimientos o solicitudes modificados que
+  están en la instantánea o que ahora cumplen sus filtros, y seguimientos
+  borrados o archivados que estaban en ella. Lo ejecutan el comando
+  ``refrescar_reportes_predefinidos`` (de noche, con --todos) y la tarea del
+  mismo nombre (con repetir_horas, durante el día).
+
+Se calcula contra 'default' y no contra la réplica: ``fecha_calculo`` es el
+momento de la lectura y un cambio que la réplica todavía no tuviera no se
+volvería a detectar después.
+"""
+import csv
+import io
+import tempfile
+from decimal import Decimal
+
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .cambios import nombre_tabla
+from .exports import CHUNK_SIZE, COLUMNAS_REPORTE
+from .forms import SeguimientoFilterForm
+from .models import FilaInstantanea, InstantaneaReporte, RegistroBorrado, SeguimientoCompra
+from .permisos import capacidades
+from .queries import seguimientos_del_alcance
+
+# Lo que llega en el POST o en la URL y no es un filtro del reporte
+PARAMETROS_EXCLUIDOS = ('csrfmiddlewaretoken', 'nombre', 'compartir', 'page', 'print', 'despues', 'antes')
+# Con más cambios que estos, revisar uno por uno cuesta más que recalcular
+MAX_CAMBIOS_REVISADOS = 5000
+
+
+def parametros_de(datos):
+    """Filtros a guardar de un QueryDict (los del reporte que se estaba viendo)."""
+    return {clave: valor for clave, valor in datos.items() if clave not in PARAMETROS_EXCLUIDOS and valor}
+
+
+def consulta(reporte, alcance):
+    return seguimientos_del_alcance(alcance, SeguimientoFilterForm(reporte.parametros))
+
+
+def _fila(seguimiento, posicion):
+    solicitud = seguimiento.solicitud
+    return FilaInstantanea(
+        posicion=posicion,
+        seguimiento_id=seguimiento.pk,
+        solicitud_id=solicitud.pk,
+        archivado=getattr(seguimiento, 'archivado', False),
+        ref_departamento=solicitud.ref_departamento,
+        sbs_numero=seguimiento.sbs_numero,
+        oc_numero=seguimiento.oc_numero,
+        descripcion_pedido=solicitud.descripcion_pedido,
+        tipo_entrega=seguimiento.get_tipo_entrega_display(),
+        proveedor=seguimiento.proveedor,
+        monto_oc=seguimiento.monto_oc,
+    )
+
+
+def construir(reporte, alcance):
+    """Recalcula (o crea) la instantánea de ``reporte`` para ``alcance`` y la devuelve."""
+    inicio = timezone.now()
+    filas = []
+    total_monto = Decimal(0)
+    with tempfile.TemporaryFile() as tmp:
+        texto = io.TextIOWrapper(tmp, encoding='utf-8', newline='')
+        writer = csv.writer(texto)
+        # BOM para que Excel reconozca UTF-8, igual que exports.filas_csv
+        texto.write('\ufeff')
+        writer.writerow([titulo for titulo, _ in COLUMNAS_REPORTE])
+        for posicion, seguimiento in enumerate(consulta(reporte, alcance).iterator(chunk_size=CHUNK_SIZE)):
+            filas.append(_fila(seguimiento, posicion))
+            writer.writerow([valor(seguimiento) for _, valor in COLUMNAS_REPORTE])
+            total_monto += seguimiento.monto_oc or 0
+        texto.flush()
+        tmp.seek(0)
+
+        with transaction.atomic():
+            instantanea, _ = InstantaneaReporte.objects.select_for_update().get_or_create(
+                reporte=reporte, alcance_id=alcance, defaults={'fecha_calculo': inicio},
+            )
+            archivo_anterior = instantanea.archivo.name
+            instantanea.filas.all().delete()
+            for fila in filas:
+                fila.instantanea = instantanea
+            FilaInstantanea.objects.bulk_create(filas, batch_size=CHUNK_SIZE)
+            instantanea.fecha_calculo = inicio
+            instantanea.total_filas = len(filas)
+            instantanea.total_monto_oc = total_monto
+            instantanea.archivo.save(f"reporte_{reporte.pk}_{inicio:%Y%m%d_%H%M}.csv", File(tmp), save=False)
+            instantanea.save()
+            if archivo_anterior:
+                storage = instantanea.archivo.storage
+                transaction.on_commit(lambda: storage.delete(archivo_anterior))
+        texto.detach()
+    return instantanea
+
+
+def instantanea_para(reporte, user):
+    """La instantánea que corresponde a los permisos del usuario; la calcula si aún no existe."""
+    alcance = capacidades(user).departamento_visible
+    return reporte.instantaneas.filter(alcance_id=alcance).first() or construir(reporte, alcance)
+
+
+def eliminar(reporte):
+    """Borra el reporte con sus instantáneas y los CSV generados."""
+    archivos = [i.archivo for i in reporte.instantaneas.all() if i.archivo]
+    reporte.delete()
+    for archivo in archivos:
+        archivo.delete(save=False)
+
+
+def _cambios_desde(desde):
+    """
+    {id de seguimiento: fecha del último cambio} de lo cambiado después de
+    ``desde``: el seguimiento, su solicitud, o su borrado o archivado. Usa
+    los índices de fecha_actualizacion y de RegistroBorrado.fecha.
+    """
+    cambios = {}
+    consultas = [
+        SeguimientoCompra.objects.filter(fecha_actualizacion__gt=desde).values_list('pk', 'fecha_actualizacion'),
+        SeguimientoCompra.objects.filter(solicitud__fecha_actualizacion__gt=desde)
+        .values_list('pk', 'solicitud__fecha_actualizacion'),
+        RegistroBorrado.objects.filter(fecha__gt=desde, tabla=nombre_tabla(SeguimientoCompra))
+        .values_list('objeto_id', 'fecha'),
+    ]
+    for consulta_cambios in consultas:
+        for pk, fecha in consulta_cambios.iterator(chunk_size=CHUNK_SIZE):
+            if fecha > cambios.get(pk, desde):
+                cambios[pk] = fecha
+    return cambios
+
+
+def _afectada(instantanea, ids):
+    """Si alguno de los seguimientos ``ids`` está en la instantánea o ahora cumple sus filtros."""
+    if not ids:
+        return False
+    if len(ids) > MAX_CAMBIOS_REVISADOS:
+        return True
+    return (
+        instantanea.filas.filter(seguimiento_id__in=ids).exists()
+        or consulta(instantanea.reporte, instantanea.alcance_id).filter(pk__in=ids).exists()
+    )
+
+
+def refrescar(todos=False, progreso=None):
+    """
+    Recalcula las instantáneas afectadas por cambios (o todas con ``todos``).
+    Devuelve (revisadas, recalculadas).
+    """
+    instantaneas = list(InstantaneaReporte.objects.select_related('reporte').order_by('pk'))
+    cambios = {}
+    if instantaneas and not todos:
+        cambios = _cambios_desde(min(i.fecha_calculo for i in instantaneas))
+
+    recalculadas = 0
+    for numero, instantanea in enumerate(instantaneas, start=1):
+        ids = {pk for pk, fecha in cambios.items() if fecha > instantanea.fecha_calculo}
+        if todos or _afectada(instantanea, ids):
+            construir(instantanea.reporte, instantanea.alcance_id)
+            recalculadas += 1
+        if progreso:
+            progreso(numero, len(instantaneas))
+    return len(instantaneas), recalculadas
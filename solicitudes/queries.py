@@ -0,0 +1,358 @@
+# solicitudes/queries.py
+"""
+Construcción de los querysets del listado y del reporte.
+
+Las vistas síncronas (views.py) y las asíncronas (async_views.py) usan estas
+mismas funciones para que permisos y filtros no se dupliquen. Solo arman el
+queryset (no ejecutan consultas), por eso se pueden llamar desde código async.
+"""
+from django.db.models import Q
+
+from .models import SeguimientoCompra, SeguimientoCompraArchivado, Solicitud
+from .permisos import capacidades
+from .textos import normalizar_nombre
+
+
+def _filtrar_por_proveedor(queryset, texto, proveedor_id=None):
+    """
+    Filtra por proveedor del catálogo. Si viene el id (elegido en el
+    autocompletado) es una igualdad sobre la FK; si no, un prefijo de la
+    clave normalizada, que resuelve el índice único de Proveedor.clave.
+    """
+    if proveedor_id:
+        return queryset.filter(proveedor_catalogo_id=proveedor_id)
+    # istartswith: LIKE 'clave%' con la collation de la columna (ver ProveedorAutocompleteView)
+    return queryset.filter(proveedor_catalogo__clave__istartswith=normalizar_nombre(texto))
+
+
+def solicitudes_listado(user, busqueda=None):
+    # Optimizamos con select_related('seguimiento')
+    queryset = Solicitud.objects.visible_to(user).select_related('seguimiento').order_by('-id')
+
+    # --- Lógica de Búsqueda ---
+    if busqueda:
+        queryset = queryset.filter(
+            Q(descripcion_pedido__icontains=busqueda) |
+            Q(ref_departamento__icontains=busqueda) |
+            # OPCIONAL: Permitir buscar también por número de SBS
+            Q(seguimiento__sbs_numero__icontains=busqueda)
+        )
+
+    return queryset
+
+
+class ConsultaEncadenada:
+    """
+    Dos querysets del mismo reporte leídos uno después del otro, como si
+    fueran uno: primero todas las filas de ``primera`` y después las de
+    ``segunda``. Cada parte conserva su propio orden.
+
+    Implementa lo que usan el paginador, las vistas y las exportaciones
+    (count, exists, slicing, iteración, iterator/aiterator, aggregate,
+    using, filter, order_by). Las partes pueden ser a su vez encadenadas.
+    aggregate solo admite agregados que se suman (Sum, Count).
+    """
+    ordered = True
+
+    def __init__(self, primera, segunda):
+        self.primera = primera
+        self.segunda = segunda
+        self.model = primera.model
+        self._conteo_primera = None
+
+    def _aplicar(self, metodo, *args, **kwargs):
+        return type(self)(
+            getattr(self.primera, metodo)(*args, **kwargs),
+            getattr(self.segunda, metodo)(*args, **kwargs),
+        )
+
+    def using(self, alias):
+        return self._aplicar('using', alias)
+
+    def filter(self, *args, **kwargs):
+        return self._aplicar('filter', *args, **kwargs)
+
+    def order_by(self, *campos):
+        return self._aplicar('order_by', *campos)
+
+    def _total_primera(self):
+        # El paginador cuenta y después corta: se cuenta una sola vez
+        if self._conteo_primera is None:
+            self._conteo_primera = self.primera.count()
+        return self._conteo_primera
+
+    def count(self):
+        return self._total_primera() + self.segunda.count()
+
+    def __len__(self):
+        return self.count()
+
+    def exists(self):
+        return self.primera.exists() or self.segunda.exists()
+
+    def __bool__(self):
+        return self.exists()
+
+    def __getitem__(self, indice):
+        if not isinstance(indice, slice) or indice.step is not None:
+            raise TypeError(f"{type(self).__name__} solo admite rangos [a:b].")
+        inicio = indice.start or 0
+        fin = indice.stop
+        primera = self._total_primera()
+        filas = []
+        if inicio < primera:
+            filas += list(self.primera[inicio:fin if fin is None else min(fin, primera)])
+        if fin is None or fin > primera:
+            desde = max(inicio - primera, 0)
+            filas += list(self.segunda[desde:None if fin is None else fin - primera])
+        return filas
+
+    def __iter__(self):
+        yield from self.primera
+        yield from self.segunda
+
+    def iterator(self, chunk_size=None):
+        yield from self.primera.iterator(chunk_size=chunk_size)
+        yield from self.segunda.iterator(chunk_size=chunk_size)
+
+    async def aiterator(self, chunk_size=2000):
+        async for fila in self.primera.aiterator(chunk_size=chunk_size):
+            yield fila
+        async for fila in self.segunda.aiterator(chunk_size=chunk_size):
+            yield fila
+
+    def aggregate(self, **agregados):
+        primera = self.primera.aggregate(**agregados)
+        segunda = self.segunda.aggregate(**agregados)
+        return {
+            clave: None if primera[clave] is None and segunda[clave] is None
+            else (primera[clave] or 0) + (segunda[clave] or 0)
+            for clave in agregados
+        }
+
+
+class ConsultaConArchivo(ConsultaEncadenada):
+    """
+    Reporte con archivo: une el queryset de SeguimientoCompra y el de
+    SeguimientoCompraArchivado. Las filas activas van primero y las
+    archivadas después; con el orden por defecto del reporte (fecha de
+    creación descendente) es el mismo orden que tendría una sola tabla,
+    porque solo se archivan años anteriores. Con otro orden, cada parte se
+    ordena por separado.
+    """
+
+
+# Orden del reporte (?orden=): clave -> (columna, desempate). El desempate
+# hace el orden total, que necesita la paginación por cursor, y cada par
+# tiene su índice: (columna, id) en SeguimientoCompra y en el archivo, y
+# para la fecha el índice de Solicitud.fecha_creacion, que en InnoDB
+# incluye el id de la solicitud (= solicitud_id). Así el motor recorre el
+# índice en orden, sin ordenar en memoria el resultado del join.
+ORDENES_REPORTE = {
+    'fecha': ('solicitud__fecha_creacion', 'solicitud_id'),
+    'monto_oc': ('monto_oc', 'id'),
+    'vencimiento_oc': ('vencimiento_oc', 'id'),
+    'proveedor': ('proveedor', 'id'),
+    'sbs_numero': ('sbs_numero', 'id'),
+}
+ORDEN_REPORTE_DEFECTO = '-fecha'
+# Columnas que admiten NULL (MariaDB y SQLite los ordenan como el menor valor)
+COLUMNAS_CON_NULOS = {'monto_oc', 'vencimiento_oc'}
+
+
+def orden_reporte(valor):
+    """(columna, desempate, descendente) de un valor de ?orden=; el de defecto si no es válido."""
+    descendente = bool(valor) and valor.startswith('-')
+    clave = valor[1:] if descendente else valor
+    if clave not in ORDENES_REPORTE:
+        return orden_reporte(ORDEN_REPORTE_DEFECTO)
+    columna, desempate = ORDENES_REPORTE[clave]
+    return columna, desempate, descendente
+
+
+def _ordenar_reporte(queryset, valor):
+    columna, desempate, descendente = orden_reporte(valor)
+    if descendente:
+        # Descendente los NULL quedan al final, que es lo que se espera
+        return queryset.order_by(f'-{columna}', f'-{desempate}')
+    if columna in COLUMNAS_CON_NULOS:
+        # Ascendente irían primero (p. ej. las OC sin vencimiento antes que
+        # la más próxima a vencer). NULLS LAST en el ORDER BY anularía el
+        # índice; en su lugar se leen dos rangos del mismo índice.
+        return ConsultaEncadenada(
+            queryset.filter(**{f'{columna}__isnull': False}).order_by(columna, desempate),
+            queryset.filter(**{f'{columna}__isnull': True}).order_by(desempate),
+        )
+    return queryset.order_by(columna, desempate)
+
+
+def pagina_por_cursor(queryset, valor_orden, despues=None, antes=None, tamano=10):
+    """
+    Paginación por cursor (keyset): las ``tamano`` filas que siguen a la
+    fila ``despues`` o que preceden a la fila ``antes`` (ids de
+    SeguimientoCompra, tal como llegan en la URL) en el orden ``valor_orden``. En lugar de
+    OFFSET n, que lee y descarta n filas, continúa el recorrido del índice
+    desde los valores de la fila del cursor.
+
+    Devuelve None si no se puede usar (consulta encadenada o la fila del
+    cursor ya no está en el resultado) y la vista pagina por número.
+    """
+    try:
+        cursor = int(despues or antes or 0)
+    except ValueError:
+        return None
+    if not cursor or not hasattr(queryset, 'query'):
+        return None
+    columna, desempate, descendente = orden_reporte(valor_orden)
+    fila = queryset.filter(pk=cursor).values_list(columna, desempate).first()
+    if fila is None:
+        return None
+    valor, valor_desempate = fila
+
+    # Hacia adelante se sigue el orden; hacia atrás se recorre al revés y se invierte
+    hacia_adelante = bool(despues)
+    mayor = hacia_adelante != descendente
+    condicion = _condicion_cursor(columna, desempate, valor, valor_desempate, mayor)
+
+    prefijo = '' if mayor else '-'
+    filas = list(
+        queryset.filter(condicion).order_by(f'{prefijo}{columna}', f'{prefijo}{desempate}')[:tamano]
+    )
+    if not hacia_adelante:
+        filas.reverse()
+    return filas
+
+
+def _condicion_cursor(columna, desempate, valor, valor_desempate, mayor):
+    """Las filas mayores (o menores) que (``valor``, ``valor_desempate``) en el orden (columna, desempate)."""
+    comparar = 'gt' if mayor else 'lt'
+    mismo_valor = Q(**{columna: valor, f'{desempate}__{comparar}': valor_desempate})
+    if valor is None:
+        # Los NULL son el menor valor: se sigue entre los NULL por el desempate
+        # y, si se avanza hacia los mayores, vienen todos los no NULL
+        mismo_valor = Q(**{f'{columna}__isnull': True, f'{desempate}__{comparar}': valor_desempate})
+        return mismo_valor | Q(**{f'{columna}__isnull': False}) if mayor else mismo_valor
+    condicion = Q(**{f'{columna}__{comparar}': valor}) | mismo_valor
+    if not mayor:
+        condicion |= Q(**{f'{columna}__isnull': True})
+    return condicion
+
+
+def _valor(fila, campo):
+    # 'solicitud__fecha_creacion' -> fila.solicitud.fecha_creacion (viene del select_related)
+    for parte in campo.split('__'):
+        fila = getattr(fila, parte)
+    return fila
+
+
+def _partes(consulta):
+    """Los querysets de una consulta, en el orden en que se leen."""
+    if isinstance(consulta, ConsultaEncadenada):
+        return [*_partes(consulta.primera), *_partes(consulta.segunda)]
+    return [consulta if consulta.query.order_by else consulta.order_by('pk')]
+
+
+def _bloque_siguiente(parte, ultima, tamano):
+    """
+    Las ``tamano`` filas de ``parte`` que siguen a la fila ``ultima`` (None =
+    las primeras), con el orden que ya trae: (columna, desempate) de
+    ORDENES_REPORTE o solo el desempate en la parte de los NULL de
+    _ordenar_reporte.
+    """
+    if ultima is not None:
+        *columna, desempate = parte.query.order_by
+        mayor = not desempate.startswith('-')
+        desempate = desempate.lstrip('-')
+        if columna:
+            columna = columna[0].lstrip('-')
+            condicion = _condicion_cursor(columna, desempate, _valor(ultima, columna), _valor(ultima, desempate), mayor)
+        else:
+            condicion = Q(**{f"{desempate}__{'gt' if mayor else 'lt'}": _valor(ultima, desempate)})
+        parte = parte.filter(condicion)
+    # all(): un queryset nuevo aunque el de la parte ya se haya evaluado
+    return parte.all()[:tamano]
+
+
+def recorrer_por_cursor(consulta, tamano):
+    """
+    Todas las filas de ``consulta`` (queryset ordenado del reporte o
+    ConsultaEncadenada) en su orden, leídas en bloques de ``tamano`` por
+    cursor como en pagina_por_cursor. A diferencia de ``.iterator()``, la
+    memoria no depende del total de filas también en MySQL/MariaDB, donde
+    mysqlclient trae al cliente el resultado entero de cada consulta.
+    """
+    for parte in _partes(consulta):
+        ultima = None
+        while True:
+            bloque = list(_bloque_siguiente(parte, ultima, tamano))
+            yield from bloque
+            if len(bloque) < tamano:
+                break
+            ultima = bloque[-1]
+
+
+async def arecorrer_por_cursor(consulta, tamano):
+    """recorrer_por_cursor para las vistas async."""
+    for parte in _partes(consulta):
+        ultima = None
+        while True:
+            bloque = [fila async for fila in _bloque_siguiente(parte, ultima, tamano)]
+            for fila in bloque:
+                yield fila
+            if len(bloque) < tamano:
+                break
+            ultima = bloque[-1]
+
+
+def _filtrar_reporte(queryset, cleaned_data):
+    if cleaned_data.get('sbs_numero'):
+        queryset = queryset.filter(sbs_numero__icontains=cleaned_data['sbs_numero'])
+
+    if cleaned_data.get('oc_numero'):
+        queryset = queryset.filter(oc_numero__icontains=cleaned_data['oc_numero'])
+
+    if cleaned_data.get('condicion'):
+        queryset = queryset.filter(condicion=cleaned_data['condicion'])
+    if cleaned_data.get('status_final_compra'):
+        queryset = queryset.filter(status_final_compra=cleaned_data['status_final_compra'])
+    if cleaned_data.get('tipo_compra'):
+        queryset = queryset.filter(solicitud__tipo_compra=cleaned_data['tipo_compra'])
+    if cleaned_data.get('proveedor'):
+        queryset = _filtrar_por_proveedor(queryset, cleaned_data['proveedor'], cleaned_data.get('proveedor_id'))
+
+    # Lógica de filtro por año
+    if cleaned_data.get('anio'):
+        queryset = queryset.filter(solicitud__fecha_creacion__year=cleaned_data['anio'])
+
+    # Filtro por referencia
+    if cleaned_data.get('ref_departamento'):
+        queryset = queryset.filter(solicitud__ref_departamento__icontains=cleaned_data['ref_departamento'])
+
+    return _ordenar_reporte(queryset, cleaned_data.get('orden'))
+
+
+def seguimientos_reporte(user, filter_form):
+    """
+    Aplica los permisos (SeguimientoCompra.objects.visible_to) y, si el
+    formulario es válido, los filtros de búsqueda y el orden de
+    SeguimientoFilterForm. Con "Incluir archivo" devuelve una ConsultaConArchivo.
+    """
+    return seguimientos_del_alcance(capacidades(user).departamento_visible, filter_form)
+
+
+def seguimientos_del_alcance(departamento, filter_form):
+    """
+    Lo mismo que seguimientos_reporte para un alcance de permisos (id de
+    departamento, o None = todos) en lugar de un usuario. Lo usan las
+    instantáneas de los reportes predefinidos (predefinidos.py).
+    """
+    cleaned_data = filter_form.cleaned_data if filter_form.is_valid() else {}
+    queryset = _filtrar_reporte(
+        SeguimientoCompra.objects.del_alcance(departamento).select_related('solicitud'), cleaned_data,
+    )
+    if cleaned_data.get('incluir_archivo'):
+        archivados = _filtrar_reporte(
+            SeguimientoCompraArchivado.objects.del_alcance(departamento).select_related('solicitud'), cleaned_data,
+        )
+        return ConsultaConArchivo(queryset, archivados)
+    return queryset
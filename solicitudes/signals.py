@@ -0,0 +1,86 @@
+# solicitudes/signals.py
+"""
+Registro de cambios para las actualizaciones en vivo (ver eventos.py),
+lápidas de los borrados para la exportación incremental (ver cambios.py),
+índice de casi duplicados (ver duplicados.py) y calendarios ICS a
+regenerar (ver calendario.py).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import calendario, duplicados
+from .cambios import nombre_tabla
+from .eventos import registrar_al_confirmar, resumen_solicitud
+from .models import RegistroBorrado, SeguimientoCompra, Solicitud
+
+
+@receiver(post_save, sender=Solicitud, dispatch_uid='evento_solicitud_guardada')
+def solicitud_guardada(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    tipo = 'creada' if created else 'actualizada'
+    registrar_al_confirmar(tipo, instance.pk, instance.departamento_id, resumen_solicitud(instance), using=using)
+
+
+@receiver(post_save, sender=SeguimientoCompra, dispatch_uid='evento_seguimiento_guardado')
+def seguimiento_guardado(sender, instance, created, raw=False, using=None, **kwargs):
+    # El seguimiento vacío que crea el detalle al abrirse no cambia nada visible
+    if raw or created:
+        return
+    solicitud = instance.solicitud
+    registrar_al_confirmar(
+        'actualizada', solicitud.pk, solicitud.departamento_id, resumen_solicitud(solicitud, instance), using=using,
+    )
+
+
+@receiver(post_delete, sender=Solicitud, dispatch_uid='evento_solicitud_eliminada')
+def solicitud_eliminada(sender, instance, using=None, **kwargs):
+    registrar_al_confirmar(
+        'eliminada', instance.pk, instance.departamento_id, {'ref': instance.ref_departamento}, using=using,
+    )
+
+
+@receiver(post_delete, sender=Solicitud, dispatch_uid='borrado_solicitud')
+@receiver(post_delete, sender=SeguimientoCompra, dispatch_uid='borrado_seguimiento')
+def registrar_borrado(sender, instance, using=None, **kwargs):
+    # En la misma transacción que el borrado: si se revierte, la lápida también
+    RegistroBorrado.objects.using(using).create(tabla=nombre_tabla(sender), objeto_id=instance.pk)
+
+
+@receiver(post_save, sender=Solicitud, dispatch_uid='indexar_duplicados')
+def indexar_duplicados(sender, instance, raw=False, **kwargs):
+    if not raw:
+        duplicados.indexar(instance)
+
+
+def _calendario_al_confirmar(funcion, *args, using=None):
+    # De mejor esfuerzo, como los eventos: si falla la caché, el guardado ya
+    # confirmado no termina en un 500 (ver eventos.registrar_al_confirmar)
+    def actualizar():
+        funcion(*args)
+
+    transaction.on_commit(actualizar, using=using, robust=True)
+
+
+@receiver(post_save, sender=Solicitud, dispatch_uid='calendario_solicitud_guardada')
+def calendario_solicitud_guardada(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        _calendario_al_confirmar(calendario.cambio_solicitud, instance, using=using)
+
+
+@receiver(post_save, sender=SeguimientoCompra, dispatch_uid='calendario_seguimiento_guardado')
+def calendario_seguimiento_guardado(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    fechas = [getattr(instance, campo) for campo, _ in calendario.EVENTOS]
+    _calendario_al_confirmar(
+        calendario.cambio_seguimiento, instance.solicitud_id, instance.solicitud.departamento_id, fechas,
+        using=using,
+    )
+
+
+@receiver(post_delete, sender=SeguimientoCompra, dispatch_uid='calendario_seguimiento_eliminado')
+def calendario_seguimiento_eliminado(sender, instance, using=None, **kwargs):
+    # Sin fechas: solo afecta a los calendarios que ya lo muestran
+    _calendario_al_confirmar(calendario.cambio_seguimiento, instance.solicitud_id, None, using=using)
@@ -0,0 +1,151 @@
+/*
+ * Subida por partes de los adjuntos del seguimiento (ver solicitudes/adjuntos.py).
+ *
+ * <input type="file" data-adjuntos-url="..." data-etapa="sbs">
+ * Al elegir un archivo se crea la subida (POST) y se envía en trozos con
+ * PUT + Content-Range. El id de la subida se guarda en localStorage con el
+ * nombre, tamaño y fecha del archivo: si la conexión se corta, volver a
+ * elegir el mismo archivo pregunta al servidor cuánto recibió y continúa
+ * desde ahí.
+ */
+(function () {
+    'use strict';
+
+    const REINTENTOS = 3;
+
+    function csrf() {
+        const campo = document.querySelector('[name=csrfmiddlewaretoken]');
+        return campo ? campo.value : '';
+    }
+
+    function claveLocal(input, archivo) {
+        return ['adjunto', input.dataset.adjuntosUrl, input.dataset.etapa,
+                archivo.name, archivo.size, archivo.lastModified].join('|');
+    }
+
+    async function json(respuesta) {
+        try {
+            return await respuesta.json();
+        } catch (e) {
+            return {};
+        }
+    }
+
+    async function estadoGuardado(clave) {
+        const url = localStorage.getItem(clave);
+        if (!url) {
+            return null;
+        }
+        const respuesta = await fetch(url, {credentials: 'same-origin'});
+        if (!respuesta.ok) {
+            localStorage.removeItem(clave);
+            return null;
+        }
+        return json(respuesta);
+    }
+
+    async function crearSubida(input, archivo) {
+        const datos = new FormData();
+        datos.append('etapa', input.dataset.etapa);
+        datos.append('nombre', archivo.name);
+        datos.append('tamano', archivo.size);
+        const respuesta = await fetch(input.dataset.adjuntosUrl, {
+            method: 'POST',
+            body: datos,
+            credentials: 'same-origin',
+            headers: {'X-CSRFToken': csrf()},
+        });
+        const cuerpo = await json(respuesta);
+        if (!respuesta.ok) {
+            throw new Error(cuerpo.error || 'No se pudo iniciar la subida.');
+        }
+        return cuerpo;
+    }
+
+    async function enviarTrozo(estado, archivo, inicio) {
+        const fin = Math.min(inicio + estado.trozo_max, archivo.size) - 1;
+        const respuesta = await fetch(estado.url, {
+            method: 'PUT',
+            body: archivo.slice(inicio, fin + 1),
+            credentials: 'same-origin',
+            headers: {
+                'X-CSRFToken': csrf(),
+                'Content-Type': 'application/octet-stream',
+                'Content-Range': 'bytes ' + inicio + '-' + fin + '/' + archivo.size,
+            },
+        });
+        const cuerpo = await json(respuesta);
+        if (respuesta.status === 409 && typeof cuerpo.recibido === 'number') {
+            // El servidor tiene otra posición (p. ej. un trozo llegó pero no la respuesta)
+            return cuerpo;
+        }
+        if (!respuesta.ok) {
+            const error = new Error(cuerpo.error || 'Error al enviar el archivo.');
+            error.definitivo = respuesta.status >= 400 && respuesta.status < 500;
+            throw error;
+        }
+        return cuerpo;
+    }
+
+    function agregarEnlace(contenedor, adjunto) {
+        const lista = contenedor.querySelector('.adjuntos-lista');
+        const item = document.createElement('li');
+        const enlace = document.createElement('a');
+        enlace.href = adjunto.url;
+        enlace.target = '_blank';
+        enlace.rel = 'noopener';
+        enlace.textContent = adjunto.nombre;
+        item.appendChild(enlace);
+        lista.appendChild(item);
+    }
+
+    async function subir(input, archivo) {
+        const contenedor = input.closest('.adjuntos-etapa');
+        const progreso = contenedor.querySelector('.adjuntos-progreso');
+        const clave = claveLocal(input, archivo);
+        input.disabled = true;
+        try {
+            let estado = await estadoGuardado(clave);
+            if (!estado) {
+                estado = await crearSubida(input, archivo);
+                localStorage.setItem(clave, estado.url);
+            }
+            let fallos = 0;
+            while (!estado.adjunto) {
+                progreso.textContent = 'Subiendo… ' + Math.floor(100 * estado.recibido / archivo.size) + ' %';
+                try {
+                    const respuesta = await enviarTrozo(estado, archivo, estado.recibido);
+                    estado = Object.assign(estado, respuesta);
+                    fallos = 0;
+                } catch (error) {
+                    fallos += 1;
+                    if (error.definitivo || fallos > REINTENTOS) {
+                        throw error;
+                    }
+                    const actual = await estadoGuardado(clave);
+                    if (actual) {
+                        estado = Object.assign(estado, actual);
+                    }
+                }
+            }
+            localStorage.removeItem(clave);
+            agregarEnlace(contenedor, estado.adjunto);
+            progreso.textContent = 'Archivo subido.';
+            input.value = '';
+        } catch (error) {
+            progreso.textContent = error.message + ' Elija el mismo archivo para continuar.';
+        } finally {
+            input.disabled = false;
+        }
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('input[data-adjuntos-url]').forEach(function (input) {
+            input.addEventListener('change', function () {
+                if (input.files.length) {
+                    subir(input, input.files[0]);
+                }
+            });
+        });
+    });
+})();
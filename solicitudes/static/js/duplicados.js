@@ -0,0 +1,60 @@
+/*
+ * Aviso de posibles duplicados en el formulario de solicitud.
+ *
+ * <div id="posibles-duplicados" data-duplicados-url="..." data-excluir="pk">
+ * Al escribir la descripción o el monto se espera ESPERA_MS sin teclas y se
+ * pide el aviso (fragmento HTML) a la URL; cada consulta cancela la
+ * anterior. Es solo informativo: no impide guardar.
+ */
+(function () {
+    'use strict';
+
+    const ESPERA_MS = 600;
+
+    document.addEventListener('DOMContentLoaded', function () {
+        const aviso = document.getElementById('posibles-duplicados');
+        const descripcion = document.getElementById('id_descripcion_pedido');
+        const monto = document.getElementById('id_monto_comprometido_sbs');
+        if (!aviso || !descripcion) {
+            return;
+        }
+        let temporizador = null;
+        let controlador = null;
+
+        function consultar() {
+            const url = new URL(aviso.dataset.duplicadosUrl, window.location.href);
+            url.searchParams.set('descripcion', descripcion.value);
+            url.searchParams.set('monto', monto ? monto.value : '');
+            if (aviso.dataset.excluir) {
+                url.searchParams.set('excluir', aviso.dataset.excluir);
+            }
+            if (controlador) {
+                controlador.abort();
+            }
+            controlador = new AbortController();
+            fetch(url, { credentials: 'same-origin', signal: controlador.signal })
+                .then(function (respuesta) {
+                    return respuesta.ok ? respuesta.text() : '';
+                })
+                .then(function (html) {
+                    aviso.innerHTML = html;
+                })
+                .catch(function () {
+                    // Cancelada o sin conexión: se deja el aviso anterior
+                });
+        }
+
+        function programar() {
+            clearTimeout(temporizador);
+            temporizador = setTimeout(consultar, ESPERA_MS);
+        }
+
+        descripcion.addEventListener('input', programar);
+        if (monto) {
+            monto.addEventListener('input', programar);
+        }
+        if (descripcion.value) {
+            consultar();
+        }
+    });
+})();
@@ -0,0 +1,130 @@
+/*
+ * Actualizaciones en vivo del listado y del detalle de solicitudes.
+ *
+ * Abre una conexión de server-sent events (data-eventos-url del <script>) y,
+ * por cada cambio:
+ *  - listado: actualiza solo la fila <tr data-solicitud-id> afectada
+ *    (N° SBS, descripción, monto y condiciones) y avisa de las nuevas;
+ *  - detalle: muestra un aviso si cambió la solicitud abierta (no toca el
+ *    formulario para no pisar lo que se esté editando).
+ *
+ * La conexión se cierra mientras la pestaña está oculta y se reabre al
+ * volver, pidiendo los eventos perdidos desde el último recibido.
+ */
+(function () {
+    'use strict';
+
+    const url = document.currentScript.dataset.eventosUrl;
+    const aviso = document.getElementById('aviso-cambios');
+    const solicitudDetalle = aviso ? aviso.dataset.solicitudId : null;
+    const formatoMonto = new Intl.NumberFormat('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+    let fuente = null;
+    let ultimoId = 0;
+    let nuevas = 0;
+
+    function recortar(texto, largo) {
+        return texto.length > largo ? texto.slice(0, largo - 1) + '…' : texto;
+    }
+
+    function badge(clase, texto) {
+        const span = document.createElement('span');
+        span.className = 'badge ' + clase;
+        span.textContent = texto;
+        return span;
+    }
+
+    function resaltar(elemento) {
+        elemento.classList.add('table-warning');
+        setTimeout(function () { elemento.classList.remove('table-warning'); }, 3000);
+    }
+
+    function mostrarAviso(texto) {
+        if (!aviso) {
+            return;
+        }
+        const enlace = document.createElement('a');
+        enlace.href = window.location.href;
+        enlace.className = 'alert-link ms-2';
+        enlace.textContent = 'Recargar';
+        aviso.replaceChildren(document.createTextNode(texto), enlace);
+        aviso.classList.remove('d-none');
+    }
+
+    function actualizarFila(fila, cambio) {
+        if (cambio.tipo === 'eliminada') {
+            fila.classList.add('text-decoration-line-through', 'text-muted');
+            return;
+        }
+        const celda = function (campo) { return fila.querySelector('[data-campo="' + campo + '"]'); };
+        celda('sbs_numero').textContent = cambio.sbs_numero || '---';
+        celda('descripcion').textContent = recortar(cambio.descripcion, 50);
+        celda('departamento').textContent = cambio.departamento;
+        celda('monto_sbs').textContent = 'B/. ' + formatoMonto.format(Number(cambio.monto_sbs));
+        const condiciones = cambio.condiciones.length
+            ? cambio.condiciones.map(function (c) { return badge('cond-' + c.codigo, c.label); })
+            : [badge('cond-vacio', 'Sin Iniciar')];
+        celda('condiciones').replaceChildren(...condiciones);
+        resaltar(fila);
+    }
+
+    function alRecibir(evento) {
+        const cambio = JSON.parse(evento.data);
+        ultimoId = Math.max(ultimoId, Number(evento.lastEventId) || 0);
+
+        if (solicitudDetalle) {
+            if (String(cambio.solicitud) !== solicitudDetalle) {
+                return;
+            }
+            if (cambio.tipo === 'eliminada') {
+                mostrarAviso('Esta solicitud fue eliminada.');
+            } else {
+                const condiciones = cambio.condiciones.map(function (c) { return c.label; }).join(', ') || 'Sin Iniciar';
+                mostrarAviso('Esta solicitud se actualizó. Condición: ' + condiciones + (cambio.oc_numero ? '. OC: ' + cambio.oc_numero : '') + '.');
+            }
+            return;
+        }
+
+        const fila = document.querySelector('tr[data-solicitud-id="' + cambio.solicitud + '"]');
+        if (fila) {
+            actualizarFila(fila, cambio);
+        } else if (cambio.tipo === 'creada') {
+            nuevas += 1;
+            mostrarAviso(nuevas === 1 ? 'Hay 1 solicitud nueva.' : 'Hay ' + nuevas + ' solicitudes nuevas.');
+        }
+    }
+
+    function conectar() {
+        if (fuente) {
+            return;
+        }
+        fuente = new EventSource(ultimoId ? url + '?desde=' + ultimoId : url);
+        fuente.addEventListener('cambio', alRecibir);
+        fuente.addEventListener('error', function () {
+            // El servidor respondió 204 (sin conexiones libres): EventSource no
+            // reintenta; se vuelve a probar la próxima vez que la pestaña se muestre
+            if (fuente && fuente.readyState === EventSource.CLOSED) {
+                fuente = null;
+            }
+        });
+    }
+
+    function desconectar() {
+        if (fuente) {
+            fuente.close();
+            fuente = null;
+        }
+    }
+
+    document.addEventListener('visibilitychange', function () {
+        if (document.hidden) {
+            desconectar();
+        } else {
+            conectar();
+        }
+    });
+    window.addEventListener('pagehide', desconectar);
+
+    if (!document.hidden) {
+        conectar();
+    }
+})();
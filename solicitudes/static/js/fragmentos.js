@@ -0,0 +1,195 @@
+/*
+ * Búsqueda, filtros y paginación sin recargar la página.
+ *
+ * Un contenedor <div data-fragmento-form="id-del-form"> con los resultados
+ * (tabla y paginador). Al enviar el formulario, escribir en él o pulsar un
+ * enlace <a data-fragmento-enlace> se pide la misma URL con la cabecera
+ * X-Fragment: 1; la vista devuelve solo los resultados y se reemplazan en
+ * el lugar.
+ *
+ * - La escritura espera ESPERA_MS sin teclas antes de consultar.
+ * - Cada consulta cancela la anterior (AbortController).
+ * - La URL se actualiza (pushState) para que atrás/adelante y los enlaces
+ *   copiados sigan funcionando; al volver atrás se vuelve a pedir el fragmento.
+ * - Los <a>/<form data-conservar-filtros> (exportaciones) se actualizan con
+ *   los filtros vigentes (sin la página ni el cursor del paginador).
+ * - Si algo falla (sesión vencida, error del servidor) se navega a la URL
+ *   de forma normal.
+ */
+(function () {
+    'use strict';
+
+    const ESPERA_MS = 300;
+
+    function parametrosDe(form) {
+        const parametros = new URLSearchParams();
+        new FormData(form).forEach(function (valor, clave) {
+            if (valor !== '') {
+                parametros.append(clave, valor);
+            }
+        });
+        return parametros;
+    }
+
+    function conservarFiltros(url) {
+        const parametros = new URL(url).searchParams;
+        parametros.delete('page');
+        parametros.delete('despues');
+        parametros.delete('antes');
+
+        document.querySelectorAll('a[data-conservar-filtros]').forEach(function (enlace) {
+            const destino = new URL(enlace.href);
+            destino.search = parametros.toString();
+            enlace.href = destino.toString();
+        });
+        document.querySelectorAll('form[data-conservar-filtros]').forEach(function (form) {
+            form.querySelectorAll('input[data-filtro]').forEach(function (campo) { campo.remove(); });
+            parametros.forEach(function (valor, clave) {
+                const campo = document.createElement('input');
+                campo.type = 'hidden';
+                campo.name = clave;
+                campo.value = valor;
+                campo.dataset.filtro = '';
+                form.appendChild(campo);
+            });
+        });
+    }
+
+    function iniciar(contenedor) {
+        const form = document.getElementById(contenedor.dataset.fragmentoForm);
+        let controlador = null;
+        let temporizador = null;
+        let navegado = false;
+        let escribiendo = false;
+
+        function cargar(url, historial, sincronizar) {
+            if (historial !== 'replace') {
+                escribiendo = false;
+            }
+            if (controlador) {
+                controlador.abort();
+            }
+            const actual = new AbortController();
+            controlador = actual;
+            contenedor.setAttribute('aria-busy', 'true');
+            contenedor.style.opacity = '0.5';
+
+            fetch(url, {
+                headers: { 'X-Fragment': '1' },
+                credentials: 'same-origin',
+                signal: actual.signal,
+            })
+                .then(function (respuesta) {
+                    if (respuesta.status === 429) {
+                        // Límite de uso (lraa_project/limites.py): se deja el contenido actual
+                        const error = new Error(respuesta.headers.get('Retry-After') || '');
+                        error.name = 'LimiteError';
+                        throw error;
+                    }
+                    if (!respuesta.ok || respuesta.redirected) {
+                        throw new Error('HTTP ' + respuesta.status);
+                    }
+                    return respuesta.text();
+                })
+                .then(function (html) {
+                    contenedor.innerHTML = html;
+                    if (historial === 'push') {
+                        history.pushState({ fragmento: true }, '', url);
+                    } else if (historial === 'replace') {
+                        history.replaceState({ fragmento: true }, '', url);
+                    }
+                    navegado = true;
+                    if (sincronizar && form) {
+                        // Enlace que cambia un filtro (orden por columna): el formulario lo refleja
+                        sincronizarFormulario();
+                    }
+                    conservarFiltros(url);
+                })
+                .catch(function (error) {
+                    if (error.name === 'LimiteError') {
+                        contenedor.title = 'Demasiadas consultas seguidas; intente de nuevo en unos segundos.';
+                    } else if (error.name !== 'AbortError') {
+                        window.location.href = url;
+                    }
+                })
+                .finally(function () {
+                    if (controlador === actual) {
+                        contenedor.removeAttribute('aria-busy');
+                        contenedor.style.opacity = '';
+                        controlador = null;
+                    }
+                });
+        }
+
+        function urlDelFormulario() {
+            const url = new URL(form.getAttribute('action') || window.location.pathname, window.location.href);
+            url.search = parametrosDe(form).toString();
+            return url.toString();
+        }
+
+        function sincronizarFormulario() {
+            // Al ir atrás/adelante, el formulario muestra los filtros de esa URL
+            const parametros = new URLSearchParams(window.location.search);
+            Array.from(form.elements).forEach(function (campo) {
+                if (!campo.name || campo.type === 'submit' || campo.type === 'button') {
+                    return;
+                }
+                if (campo.type === 'checkbox') {
+                    campo.checked = parametros.has(campo.name);
+                } else {
+                    campo.value = parametros.get(campo.name) || '';
+                }
+            });
+        }
+
+        if (form) {
+            form.addEventListener('submit', function (evento) {
+                evento.preventDefault();
+                clearTimeout(temporizador);
+                cargar(urlDelFormulario(), 'push');
+            });
+            form.addEventListener('input', function (evento) {
+                if (!evento.target.matches('input[type="text"], input[type="search"], input[type="number"]')) {
+                    return;
+                }
+                clearTimeout(temporizador);
+                temporizador = setTimeout(function () {
+                    // La primera consulta al escribir apila una entrada en el historial;
+                    // las siguientes la reemplazan en vez de apilar una por tecla
+                    cargar(urlDelFormulario(), escribiendo ? 'replace' : 'push');
+                    escribiendo = true;
+                }, ESPERA_MS);
+            });
+            form.addEventListener('change', function (evento) {
+                if (evento.target.matches('select, input[type="checkbox"]')) {
+                    clearTimeout(temporizador);
+                    cargar(urlDelFormulario(), 'push');
+                }
+            });
+        }
+
+        contenedor.addEventListener('click', function (evento) {
+            const enlace = evento.target.closest('a[data-fragmento-enlace]');
+            if (!enlace || evento.button !== 0 || evento.ctrlKey || evento.metaKey || evento.shiftKey) {
+                return;
+            }
+            evento.preventDefault();
+            cargar(enlace.href, 'push', true);
+            contenedor.scrollIntoView({ block: 'nearest' });
+        });
+
+        window.addEventListener('popstate', function () {
+            if (!navegado) {
+                return;
+            }
+            if (form) {
+                sincronizarFormulario();
+            }
+            cargar(window.location.href, null);
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-fragmento-form]').forEach(iniciar);
+    });
+})();
@@ -0,0 +1,163 @@
+/*
+ * Impresión del reporte de seguimientos (seguimiento_report.html).
+ *
+ * El botón #print-table-btn abre la misma URL con ?print=1 en otra pestaña;
+ * allí se arma una página limpia con la tabla filtrada y se imprime. El logo
+ * y el nombre del usuario llegan en data-logo-url y data-usuario del botón.
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    const printBtn = document.getElementById('print-table-btn');
+    const tableSection = document.getElementById('report-table-section');
+
+    const urlParams = new URLSearchParams(window.location.search);
+    if (urlParams.has('print')) {
+        generarImpresionDirecta();
+    }
+
+    if (printBtn) {
+        printBtn.addEventListener('click', function() {
+            const currentUrl = new URL(window.location.href);
+            currentUrl.searchParams.set('print', '1');
+            window.open(currentUrl.toString(), '_blank');
+        });
+    }
+
+    function escaparHtml(texto) {
+        const div = document.createElement('div');
+        div.textContent = texto || '';
+        return div.innerHTML;
+    }
+
+    function generarImpresionDirecta() {
+        const hoy = new Date();
+        const fechaStr = hoy.toLocaleDateString('es-PA', { day: '2-digit', month: '2-digit', year: 'numeric' });
+        const anioActual = hoy.getFullYear();
+        const logoSrc = printBtn.dataset.logoUrl;
+        const usuario = escaparHtml(printBtn.dataset.usuario);
+
+        const printWindowHtml = `
+            <!DOCTYPE html>
+            <html lang="es">
+            <head>
+                <meta charset="UTF-8">
+                <style>
+                    @page { 
+                        size: landscape; 
+                        margin: 10mm 5mm; 
+                    }
+                    
+                    body { 
+                        font-family: 'Arial', sans-serif; 
+                        font-size: 9px; 
+                        color: #000; 
+                        margin: 0; 
+                    }
+
+                    .print-header { display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 15px; }
+                    .header-logo { width: 250px; }
+                    .header-logo img { max-width: 100%; max-height: 50px; }
+                    .header-center { text-align: center; font-weight: bold; font-size: 10px; flex-grow: 1; margin-top: 5px; }
+                    
+                    table { 
+                        width: 100%; 
+                        border-collapse: collapse; 
+                        table-layout: fixed; 
+                    }
+                    
+                    th, td { 
+                        border: 1px solid #000; 
+                        padding: 3px; 
+                        vertical-align: middle;
+                        word-wrap: break-word;
+                    }
+
+                    /* Ajuste de columnas para impresión landscape */
+                    .col-ref { width: 6%; }
+                    .col-sbs { width: 8%; }
+                    .col-oc { width: 8%; }
+                    .col-desc { width: 42%; }
+                    .col-entrega { width: 9%; }
+                    .col-prov { width: 19%; }
+                    .col-monto { width: 8%; }
+                    
+                    /* Ocultar por completo la columna de acciones en la impresión limpia */
+                    .no-print, .col-acciones { display: none !important; }
+
+                    thead th { background-color: #f2f2f2 !important; font-weight: bold; text-align: center; }
+                    
+                    .v-text {
+                        writing-mode: vertical-rl;
+                        transform: rotate(180deg);
+                        height: 85px;
+                        white-space: nowrap;
+                        padding: 2px;
+                        display: flex;
+                        align-items: center;
+                        justify-content: center;
+                        margin: 0 auto;
+                    }
+
+                    .text-end { text-align: right; }
+                    .text-center { text-align: center; }
+
+                    .print-footer-end {
+                        margin-top: 15px;
+                        display: flex;
+                        justify-content: space-between;
+                        font-size: 8px;
+                        border-top: 1px solid #000;
+                        padding-top: 5px;
+                    }
+                </style>
+            </head>
+            <body>
+                <div class="print-header">
+                    <div class="header-logo"><img src="${logoSrc}"></div>
+                    <div class="header-center">
+                        REPORTE DE SEGUIMIENTO DE LAS SOLICITUDES DE BIENES Y SERVICIOS<br>
+                        LABORATORIO DE REFERENCIA DE ALIMENTOS Y AGUAS (LRAA)
+                    </div>
+                    <div style="width: 250px; text-align: right;">Fecha: ${fechaStr}</div>
+                </div>
+
+                <table>
+                    <thead>
+                        <tr>
+                            <th class="col-ref"><div class="v-text"># REFERENCIA</div></th>
+                            <th class="col-sbs"><div class="v-text">NÚMERO DE SBS</div></th>
+                            <th class="col-oc"><div class="v-text">NÚMERO DE OC</div></th>
+                            <th class="col-desc">DESCRIPCIÓN</th>
+                            <th class="col-entrega"><div class="v-text">TIPO DE ENTREGA</div></th>
+                            <th class="col-prov">PROVEEDOR</th>
+                            <th class="col-monto"><div class="v-text">B/. MONTO TOTAL</div></th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        ${Array.from(tableSection.querySelectorAll('tbody tr')).map(tr => tr.outerHTML).join('')}
+                    </tbody>
+                    <tfoot>
+                        ${tableSection.querySelector('tfoot') ? tableSection.querySelector('tfoot').innerHTML : ''}
+                    </tfoot>
+                </table>
+
+                <div class="print-footer-end">
+                    <div>Generado por: ${usuario}</div>
+                    <div>PÁGINA FIN DE REPORTE - ${anioActual}</div>
+                </div>
+
+                <script>
+                    window.onload = function() {
+                        setTimeout(function() {
+                            window.print();
+                            window.close();
+                        }, 500);
+                    }
+                <\/script>
+            </body>
+            </html>
+        `;
+        document.open();
+        document.write(printWindowHtml);
+        document.close();
+    }
+});
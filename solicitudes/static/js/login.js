@@ -0,0 +1,19 @@
+/*
+ * Botón para mostrar u ocultar la contraseña en registration/login.html.
+ * El id del campo llega en data-campo del botón.
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    const toggleBtn = document.getElementById('toggleBtn');
+    const passInput = toggleBtn ? document.getElementById(toggleBtn.dataset.campo) : null;
+
+    if (toggleBtn && passInput) {
+        toggleBtn.addEventListener('click', function () {
+            const isPass = passInput.getAttribute('type') === 'password';
+            passInput.setAttribute('type', isPass ? 'text' : 'password');
+
+            // Alternar entre el ojo abierto y el tachado
+            toggleBtn.querySelector('.icono-mostrar').classList.toggle('d-none', isPass);
+            toggleBtn.querySelector('.icono-ocultar').classList.toggle('d-none', !isPass);
+        });
+    }
+});
@@ -0,0 +1,97 @@
+/*
+ * Autocompletado de proveedores para los <input data-autocompletar-url="...">.
+ *
+ * - Espera a que el usuario deje de escribir (ESPERA_MS) antes de consultar.
+ * - Cancela la petición anterior si llega otra tecla (AbortController).
+ * - Guarda las respuestas por texto para no repetir consultas.
+ * - Si el input tiene data-autocompletar-id, pone en ese campo oculto el id
+ *   del proveedor cuando el texto coincide con una sugerencia (el filtro del
+ *   reporte pasa a ser una igualdad por id).
+ */
+(function () {
+    'use strict';
+
+    const ESPERA_MS = 250;
+    const MIN_CARACTERES = 2;
+
+    function conectar(input) {
+        if (input.readOnly || input.disabled) {
+            return;
+        }
+        const lista = document.createElement('datalist');
+        lista.id = input.id + '-sugerencias';
+        input.after(lista);
+        input.setAttribute('list', lista.id);
+        input.setAttribute('autocomplete', 'off');
+
+        const campoId = input.dataset.autocompletarId ? document.getElementById(input.dataset.autocompletarId) : null;
+        const respuestas = new Map();
+        let sugerencias = [];
+        let temporizador = null;
+        let controlador = null;
+
+        function pintar(resultados) {
+            sugerencias = resultados;
+            lista.replaceChildren(...resultados.map(function (proveedor) {
+                const opcion = document.createElement('option');
+                opcion.value = proveedor.nombre;
+                return opcion;
+            }));
+        }
+
+        function sincronizarId() {
+            if (!campoId) {
+                return;
+            }
+            const elegido = sugerencias.find(function (proveedor) {
+                return proveedor.nombre === input.value;
+            });
+            campoId.value = elegido ? elegido.id : '';
+        }
+
+        function consultar(texto) {
+            const clave = texto.toLowerCase();
+            if (respuestas.has(clave)) {
+                pintar(respuestas.get(clave));
+                return;
+            }
+            if (controlador) {
+                controlador.abort();
+            }
+            controlador = new AbortController();
+            fetch(input.dataset.autocompletarUrl + '?q=' + encodeURIComponent(texto), {
+                signal: controlador.signal,
+                headers: { 'Accept': 'application/json' },
+                credentials: 'same-origin',
+            })
+                .then(function (respuesta) {
+                    return respuesta.ok ? respuesta.json() : { resultados: [] };
+                })
+                .then(function (datos) {
+                    respuestas.set(clave, datos.resultados);
+                    pintar(datos.resultados);
+                    sincronizarId();
+                })
+                .catch(function (error) {
+                    if (error.name !== 'AbortError') {
+                        console.warn('Autocompletado de proveedores:', error);
+                    }
+                });
+        }
+
+        input.addEventListener('input', function () {
+            sincronizarId();
+            clearTimeout(temporizador);
+            const texto = input.value.trim();
+            if (texto.length < MIN_CARACTERES) {
+                pintar([]);
+                return;
+            }
+            temporizador = setTimeout(function () { consultar(texto); }, ESPERA_MS);
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('input[data-autocompletar-url]').forEach(conectar);
+    });
+})();
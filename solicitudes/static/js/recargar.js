@@ -0,0 +1,10 @@
+/*
+ * Recarga la página cada data-segundos (p. ej. jobs/job_list.html mientras
+ * haya tareas sin terminar, para mostrar el avance).
+ */
+(function () {
+    'use strict';
+
+    const segundos = parseInt(document.currentScript.dataset.segundos, 10) || 5;
+    setTimeout(function () { window.location.reload(); }, segundos * 1000);
+})();
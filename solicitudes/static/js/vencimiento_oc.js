@@ -0,0 +1,69 @@
+/*
+ * Calcula el vencimiento de la orden de compra en el formulario de
+ * seguimiento: fecha de publicación + 2 días hábiles + el plazo de entrega
+ * (hábiles o calendario).
+ */
+document.addEventListener('DOMContentLoaded', function() {
+
+    const fechaPublicacionInput = document.getElementById('id_fecha_publicacion_oc');
+    const plazoEntregaInput = document.getElementById('id_plazo_entrega');
+    const vencimientoInput = document.getElementById('id_vencimiento_oc');
+    const tipoPlazoInput = document.getElementById('id_tipo_plazo_entrega'); 
+
+    function agregarDiasHabiles(fechaInicial, dias) {
+        if (dias <= 0) return new Date(fechaInicial.valueOf());
+        let fecha = new Date(fechaInicial.valueOf());
+        let diasAgregados = 0;
+        while (diasAgregados < dias) {
+            fecha.setDate(fecha.getDate() + 1);
+            if (fecha.getDay() !== 0 && fecha.getDay() !== 6) {
+                diasAgregados++;
+            }
+        }
+        return fecha;
+    }
+
+    function agregarDiasCalendario(fechaInicial, dias) {
+        if (dias < 0) dias = 0;
+        let fecha = new Date(fechaInicial.valueOf());
+        fecha.setDate(fecha.getDate() + dias);
+        return fecha;
+    }
+
+    function calcularFechaVencimiento() {
+        const fechaPublicacionValor = fechaPublicacionInput.value;
+        const plazoEntregaValor = parseInt(plazoEntregaInput.value, 10);
+        const tipoPlazoValor = tipoPlazoInput.value;
+
+        if (!fechaPublicacionValor || isNaN(plazoEntregaValor) || plazoEntregaValor < 0 || !tipoPlazoValor) {
+            vencimientoInput.value = '';
+            return;
+        }
+
+        const fechaBase = new Date(fechaPublicacionValor + 'T00:00:00');
+        let fechaFinal;
+        const fechaConDiasBase = agregarDiasHabiles(fechaBase, 2);
+
+        if (tipoPlazoValor === 'Habiles') {
+            fechaFinal = agregarDiasHabiles(fechaConDiasBase, plazoEntregaValor);
+        } else if (tipoPlazoValor === 'Calendario') {
+            fechaFinal = agregarDiasCalendario(fechaConDiasBase, plazoEntregaValor);
+        } else {
+            vencimientoInput.value = '';
+            return;
+        }
+        
+        const anio = fechaFinal.getFullYear();
+        const mes = String(fechaFinal.getMonth() + 1).padStart(2, '0');
+        const dia = String(fechaFinal.getDate()).padStart(2, '0');
+        
+        vencimientoInput.value = `${anio}-${mes}-${dia}`;
+    }
+
+    if(fechaPublicacionInput && plazoEntregaInput && tipoPlazoInput) {
+        fechaPublicacionInput.addEventListener('change', calcularFechaVencimiento);
+        plazoEntregaInput.addEventListener('input', calcularFechaVencimiento);
+        tipoPlazoInput.addEventListener('change', calcularFechaVencimiento);
+        calcularFechaVencimiento();
+    }
+});
@@ -0,0 +1,191 @@
+# solicitudes/tasks.py
+"""
+Tareas en segundo plano de solicitudes (se ejecutan con run_workers).
+Ver jobs/registry.py para cómo se registran.
+"""
+import tempfile
+from datetime import timedelta
+
+from django.core.files import File
+from django.utils import timezone
+
+from jobs.registry import tarea
+from lraa_project import limites
+from lraa_project.routers import leer_de_replica
+
+from . import adjuntos, calendario, predefinidos
+from .archivo import archivar
+from .cambios import exportar_cambios
+from .exports import CHUNK_SIZE, filas_csv
+from .forms import SeguimientoFilterForm
+from .models import SeguimientoCompra
+from .queries import seguimientos_del_alcance, seguimientos_reporte
+
+
+def _guardar_csv(job, queryset, nombre_archivo):
+    """Escribe el CSV en disco por bloques, informando el avance, y lo adjunta al job."""
+    total = queryset.count()
+    with tempfile.TemporaryFile() as tmp:
+        escritas = 0
+        for bloque in filas_csv(queryset):
+            tmp.write(bloque.encode('utf-8'))
+            escritas += bloque.count('\n')
+            if total:
+                job.reportar_progreso(99 * min(escritas, total) / total, f"{min(escritas, total)} de {total} filas")
+        tmp.seek(0)
+        job.archivo.save(nombre_archivo, File(tmp), save=False)
+    job.mensaje_progreso = f"{total} filas"
+
+
+def _seguimientos_del_job(job, filter_form):
+    """
+    Los seguimientos que ve quien encoló el job. Los que se encolan con
+    ``manage.py encolar_tarea`` no tienen usuario: ven todos, como desde el
+    admin.
+    """
+    if job.creado_por is None:
+        return seguimientos_del_alcance(None, filter_form)
+    return seguimientos_reporte(job.creado_por, filter_form)
+
+
+@tarea('exportar_reporte_csv', descripcion='Exportación del reporte de seguimientos (CSV)')
+def exportar_reporte_csv(job):
+    """parametros: los filtros GET del reporte (los mismos de SeguimientoFilterForm)."""
+    with leer_de_replica():
+        queryset = _seguimientos_del_job(job, SeguimientoFilterForm(job.parametros))
+        _guardar_csv(job, queryset, f"reporte_seguimientos_{job.pk}.csv")
+
+
+@tarea('resumen_vencimientos', descripcion='Resumen de OC próximas a vencer (CSV)')
+def resumen_vencimientos(job):
+    """parametros: {'dias': N} -> OC que vencen entre hoy y hoy + N días (default 15)."""
+    hoy = timezone.localdate()
+    dias = int(job.parametros.get('dias', 15))
+    with leer_de_replica():
+        queryset = _seguimientos_del_job(job, SeguimientoFilterForm({})).filter(
+            vencimiento_oc__range=(hoy, hoy + timedelta(days=dias)),
+        ).order_by('vencimiento_oc', 'id')
+        _guardar_csv(job, queryset, f"vencimientos_{hoy:%Y%m%d}_{job.pk}.csv")
+
+
+@tarea('recalcular_vencimientos', descripcion='Recálculo masivo del vencimiento de las OC')
+def recalcular_vencimientos(job):
+    """Vuelve a calcular vencimiento_oc de todos los seguimientos con datos de plazo."""
+    queryset = (
+        SeguimientoCompra.objects
+        .filter(fecha_publicacion_oc__isnull=False, plazo_entrega__isnull=False)
+        .exclude(tipo_plazo='')
+        .only('id', 'fecha_publicacion_oc', 'plazo_entrega', 'tipo_plazo', 'vencimiento_oc', 'fecha_actualizacion')
+        .order_by('id')
+    )
+    total = queryset.count()
+    revisados = 0
+    cambiados = []
+    actualizados = 0
+    ahora = timezone.now()
+    for seguimiento in queryset.iterator(chunk_size=CHUNK_SIZE):
+        nuevo = seguimiento.calcular_vencimiento()
+        if nuevo != seguimiento.vencimiento_oc:
+            seguimiento.vencimiento_oc = nuevo
+            # bulk_update no actualiza los campos auto_now
+            seguimiento.fecha_actualizacion = ahora
+            cambiados.append(seguimiento)
+        revisados += 1
+        if len(cambiados) >= CHUNK_SIZE:
+            actualizados += SeguimientoCompra.objects.bulk_update(cambiados, ['vencimiento_oc', 'fecha_actualizacion'])
+            cambiados = []
+        if revisados % CHUNK_SIZE == 0:
+            job.reportar_progreso(99 * revisados / total, f"{revisados} de {total} revisados")
+    if cambiados:
+        actualizados += SeguimientoCompra.objects.bulk_update(cambiados, ['vencimiento_oc', 'fecha_actualizacion'])
+    if actualizados:
+        # bulk_update no envía post_save: los calendarios ICS no se enteran solos
+        calendario.invalidar()
+    job.mensaje_progreso = f"{revisados} revisados, {actualizados} actualizados"
+
+
+@tarea('archivar_solicitudes', descripcion='Archivo de solicitudes cerradas de años anteriores')
+def archivar_solicitudes(job):
+    """
+    Mueve al archivo histórico las solicitudes finalizadas o anuladas de años
+    anteriores (ver archivo.py).
+
+    parametros: {'anios_activos': N, 'lote': M, 'repetir_horas': H}, todos
+    opcionales (por defecto ARCHIVO_ANIOS_ACTIVOS y ARCHIVO_LOTE). Con
+    repetir_horas se vuelve a encolar sola, p. ej. una vez al día:
+
+        python manage.py encolar_tarea archivar_solicitudes --parametros '{"repetir_horas": 24}'
+    """
+    archivadas = archivar(
+        anios_activos=job.parametros.get('anios_activos'),
+        lote=job.parametros.get('lote'),
+        progreso=lambda hechas, total: job.reportar_progreso(99 * hechas / total, f"{hechas} de {total} archivadas"),
+    )
+    job.mensaje_progreso = f"{archivadas} solicitudes archivadas"
+    job.reprogramar()
+
+
+@tarea('exportar_cambios', descripcion='Exportación incremental de cambios para finanzas')
+def exportar_cambios_tarea(job):
+    """
+    Igual que el comando exportar_cambios (ver cambios.py).
+
+    parametros: {'destino': ..., 'formato': 'jsonl'|'csv', 'completo': bool,
+    'repetir_horas': H}, todos opcionales. Para la copia nocturna:
+
+        python manage.py encolar_tarea exportar_cambios --parametros '{"repetir_horas": 24}'
+    """
+    manifiesto = exportar_cambios(
+        nombre=job.parametros.get('destino', 'default'),
+        formato=job.parametros.get('formato', 'jsonl'),
+        completo=bool(job.parametros.get('completo')),
+        progreso=lambda tabla, filas: job.reportar_progreso(job.progreso, f"{tabla}: {filas} filas"),
+    )
+    job.mensaje_progreso = ', '.join(f"{tabla}: {datos['filas']}" for tabla, datos in manifiesto['tablas'].items())
+    job.reprogramar()
+
+
+@tarea('limpiar_adjuntos', descripcion='Limpieza de subidas abandonadas y adjuntos sin uso')
+def limpiar_adjuntos(job):
+    """
+    Borra las subidas por partes sin actividad, los adjuntos de seguimientos
+    eliminados y los archivos que ya no usa ningún adjunto (ver adjuntos.py).
+
+    parametros: {'horas_subidas': N, 'repetir_horas': H}, opcionales.
+    """
+    subidas, huerfanos, contenidos = adjuntos.limpiar(job.parametros.get('horas_subidas', 24))
+    job.mensaje_progreso = f"{subidas} subida(s), {huerfanos} adjunto(s) y {contenidos} archivo(s) eliminados"
+    job.reprogramar()
+
+
+@tarea('refrescar_reportes_predefinidos', descripcion='Refresco de las instantáneas de los reportes predefinidos')
+def refrescar_reportes_predefinidos(job):
+    """
+    Recalcula las instantáneas afectadas por los cambios desde su cálculo
+    (ver predefinidos.py). Con 'todos' las recalcula todas.
+
+    parametros: {'todos': bool, 'repetir_horas': H}, opcionales. Para
+    mantenerlas al día durante la jornada:
+
+        python manage.py encolar_tarea refrescar_reportes_predefinidos --parametros '{"repetir_horas": 0.25}'
+    """
+    revisadas, recalculadas = predefinidos.refrescar(
+        todos=bool(job.parametros.get('todos')),
+        progreso=lambda hechas, total: job.reportar_progreso(99 * hechas / total, f"{hechas} de {total} revisadas"),
+    )
+    job.mensaje_progreso = f"{recalculadas} de {revisadas} instantáneas recalculadas"
+    job.reprogramar()
+
+
+@tarea('volcar_disparos_limites', descripcion='Volcado de los disparos de límites a la base')
+def volcar_disparos_limites(job):
+    """
+    Pasa a DisparoLimite los rechazos por límites de uso que se contaron en
+    la caché (ver lraa_project/limites.py).
+
+    parametros: {'repetir_horas': H}. Para volcarlos cada 15 minutos:
+
+        python manage.py encolar_tarea volcar_disparos_limites --parametros '{"repetir_horas": 0.25}'
+    """
+    job.mensaje_progreso = f"{limites.volcar_disparos()} disparos volcados"
+    job.reprogramar()
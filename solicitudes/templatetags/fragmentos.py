@@ -0,0 +1,24 @@
+# solicitudes/templatetags/fragmentos.py
+from django import template
+
+from solicitudes import fragmentos
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def filas_solicitudes(context, solicitudes):
+    """``{% filas_solicitudes solicitudes %}`` -> las filas de la página, de la caché (ver solicitudes/fragmentos.py)."""
+    return fragmentos.filas_listado(solicitudes, context['capacidades'])
+
+
+@register.simple_tag
+def datos_solicitud(solicitud):
+    """``{% datos_solicitud object %}`` -> el panel de datos del detalle, de la caché."""
+    return fragmentos.datos_solicitud(solicitud)
+
+
+@register.simple_tag
+def seguimiento_lectura(seguimiento, adjuntos_por_etapa):
+    """``{% seguimiento_lectura seguimiento adjuntos_por_etapa %}`` -> los campos en solo lectura, de la caché."""
+    return fragmentos.seguimiento_lectura(seguimiento, adjuntos_por_etapa)
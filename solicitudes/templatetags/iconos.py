@@ -0,0 +1,25 @@
+# solicitudes/templatetags/iconos.py
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+register = template.Library()
+
+# Sprite con solo los iconos que usan las plantillas. Para agregar uno, copiar
+# su <symbol> (id "bi-<nombre>" o "fa-<nombre>") a static/icons/iconos.svg.
+SPRITE = 'icons/iconos.svg'
+
+
+@register.simple_tag
+def icono(nombre, clase=''):
+    """
+    ``{% icono 'bi-eye' %}`` -> <svg> que referencia el símbolo del sprite.
+
+    El sprite es un archivo estático con hash en el nombre: se descarga una
+    vez y queda en caché del navegador, en lugar de cargar una fuente o un
+    script con miles de iconos.
+    """
+    return format_html(
+        '<svg class="icono {}" aria-hidden="true" focusable="false"><use href="{}#{}"></use></svg>',
+        clase, static(SPRITE), nombre,
+    )
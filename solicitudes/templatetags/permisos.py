@@ -0,0 +1,10 @@
+# solicitudes/templatetags/permisos.py
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def puede_editar(capacidades, solicitud):
+    """``{% if capacidades|puede_editar:solicitud %}`` (ver solicitudes/permisos.py)."""
+    return capacidades.puede_editar(solicitud)
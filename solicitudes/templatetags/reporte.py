@@ -0,0 +1,37 @@
+# solicitudes/templatetags/reporte.py
+from django import template
+from django.utils.html import format_html
+
+from solicitudes.queries import ORDEN_REPORTE_DEFECTO
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def orden_columna(context, clave, titulo):
+    """
+    ``{% orden_columna 'monto_oc' 'MONTO' %}`` -> encabezado que ordena el
+    reporte por esa columna (ver queries.ORDENES_REPORTE), conservando los
+    filtros. Si ya se ordena por ella invierte el sentido y muestra la flecha.
+    """
+    request = context['request']
+    actual = request.GET.get('orden') or ORDEN_REPORTE_DEFECTO
+    if actual == clave:
+        siguiente, flecha = f'-{clave}', ' ▲'
+    elif actual == f'-{clave}':
+        siguiente, flecha = clave, ' ▼'
+    else:
+        siguiente, flecha = clave, ''
+
+    parametros = request.GET.copy()
+    # Otro orden empieza en la primera página
+    for nombre in ('page', 'despues', 'antes'):
+        parametros.pop(nombre, None)
+    if siguiente == ORDEN_REPORTE_DEFECTO:
+        parametros.pop('orden', None)
+    else:
+        parametros['orden'] = siguiente
+    return format_html(
+        '<a href="?{}" class="text-reset text-decoration-none" data-fragmento-enlace>{}{}</a>',
+        parametros.urlencode(), titulo, flecha,
+    )
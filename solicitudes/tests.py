@@ -1,3 +1,487 @@
-from django.test import TestCase
+import fcntl
+import gzip
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser, Departamento
+from lraa_project import limites
+from solicitudes import adjuntos, archivo, cambios, duplicados, eventos
+from solicitudes.models import (
+    Adjunto, ContenidoAdjunto, CubetaLSH, DisparoLimite, EventoSolicitud, PuntoControlCambios, RegistroBorrado,
+    SeguimientoCompra, SeguimientoCompraArchivado, Solicitud, SolicitudArchivada, SubidaAdjunto,
+)
+
+CACHE_LOCAL = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'pruebas-{alias}'}
+    for alias in ('default', 'fragmentos')
+}
+
+
+@override_settings(
+    CACHES=CACHE_LOCAL,
+    # Sin el manifiesto de collectstatic
+    STORAGES={**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}},
+    # Las lecturas del listado, de 'default' (la réplica de SQLite no ve la transacción de la prueba)
+    DATABASE_REPLICAS=[],
+    LIMITES_ACTIVOS=True,
+    LIMITES_PETICIONES={'solicitud-list': {'peticiones': 2, 'segundos': 60}},
+)
+class LimitesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        departamento = Departamento.objects.create(nombre='Pruebas', prefijo='P')
+        cls.usuario = CustomUser.objects.create_user('limites', password='pw', department=departamento)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+
+    def test_429_con_retry_after_al_superar_la_ventana(self):
+        url = reverse('solicitud-list')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 60)
+
+    def test_disparo_queda_en_la_base(self):
+        url = reverse('solicitud-list')
+        for _ in range(4):
+            self.client.get(url)
+
+        hoy = timezone.localdate()
+        fila = (hoy, 'solicitud-list', 'ventana')
+        # Antes de volcarlos solo están en la caché
+        self.assertFalse(DisparoLimite.objects.exists())
+        self.assertEqual(limites.disparos(7), {fila: 2})
+
+        self.assertEqual(limites.volcar_disparos(), 2)
+        self.assertEqual(DisparoLimite.objects.get().veces, 2)
+        self.assertEqual(limites.disparos(7), {fila: 2})
+
+        self.client.get(url)
+        self.assertEqual(limites.volcar_disparos(), 1)
+        self.assertEqual(limites.volcar_disparos(), 0)
+        self.assertEqual(DisparoLimite.objects.get().veces, 3)
+
+    def test_disparos_de_dias_anteriores(self):
+        hoy = timezone.localdate()
+        DisparoLimite.objects.create(dia=hoy - timedelta(days=5), nombre='login', tipo='ventana', veces=3)
+
+        self.assertEqual(limites.disparos(7), {(hoy - timedelta(days=5), 'login', 'ventana'): 3})
+        self.assertEqual(limites.disparos(1), {})
+
+    def test_incr_conserva_el_vencimiento_del_contador(self):
+        limites.tomar_turno('prueba', 5)
+        clave = cache.make_and_validate_key(f"{limites.PREFIJO}:c:prueba")
+        vence = cache._expire_info[clave]
+
+        limites.tomar_turno('prueba', 5)
+        limites.liberar_turno('prueba')
+
+        self.assertEqual(cache._expire_info[clave], vence)
+        self.assertEqual(cache.get(f"{limites.PREFIJO}:c:prueba"), 1)
+
+    def test_turnos_concurrentes(self):
+        self.assertTrue(limites.tomar_turno('prueba', 1))
+        self.assertFalse(limites.tomar_turno('prueba', 1))
+        limites.liberar_turno('prueba')
+        self.assertTrue(limites.tomar_turno('prueba', 1))
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/lraa-pruebas-limites',
+    }})
+    def test_no_arranca_con_cache_en_archivos(self):
+        with self.assertRaises(ImproperlyConfigured):
+            limites.LimitesMiddleware(lambda request: None)
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class EventosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.departamento = Departamento.objects.create(nombre='Pruebas', prefijo='P')
+        cls.usuario = CustomUser.objects.create_user('eventos', password='pw', department=cls.departamento)
+
+    def setUp(self):
+        cache.clear()
+
+    def crear_solicitud(self):
+        return Solicitud.objects.create(
+            solicitante=self.usuario, departamento=self.departamento,
+            descripcion_pedido='reactivo', monto_comprometido_sbs=10, tipo_compra='Bien',
+        )
+
+    def test_evento_al_confirmar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            solicitud = self.crear_solicitud()
+
+        evento = EventoSolicitud.objects.get()
+        self.assertEqual((evento.solicitud_pk, evento.datos['tipo']), (solicitud.pk, 'creada'))
+
+    def test_fallo_del_evento_no_interrumpe_el_guardado(self):
+        with mock.patch('solicitudes.eventos.registrar_evento', side_effect=RuntimeError):
+            with self.assertLogs(level='ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    solicitud = self.crear_solicitud()
+
+        self.assertTrue(Solicitud.objects.filter(pk=solicitud.pk).exists())
+        self.assertFalse(EventoSolicitud.objects.exists())
+
+    def test_fallo_del_calendario_no_interrumpe_el_guardado(self):
+        with mock.patch('solicitudes.calendario.cambio_solicitud', side_effect=ConnectionError):
+            with self.assertLogs(level='ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    solicitud = self.crear_solicitud()
+
+        self.assertTrue(Solicitud.objects.filter(pk=solicitud.pk).exists())
+
+    def crear_eventos(self, cantidad):
+        EventoSolicitud.objects.bulk_create(
+            EventoSolicitud(solicitud_pk=i, departamento=self.departamento, datos={'tipo': 'actualizada', 'solicitud': i})
+            for i in range(cantidad)
+        )
+        return list(EventoSolicitud.objects.order_by('id').values_list('id', flat=True))
+
+    @override_settings(LIVE_UPDATES_STREAM_SECONDS=0, LIVE_UPDATES_POLL_SECONDS=0)
+    def test_reconexion_reenvia_mas_de_un_bloque(self):
+        ids = self.crear_eventos(eventos.BLOQUE_PENDIENTES * 2 + 10)
+        self.client.force_login(self.usuario)
+
+        response = self.client.get(reverse('solicitud-eventos'), HTTP_LAST_EVENT_ID=str(ids[0]))
+        cuerpo = b''.join(response.streaming_content).decode()
+        response.close()
+
+        self.assertEqual(cuerpo.count('event: cambio'), len(ids) - 1)
+        self.assertIn(f"id: {ids[-1]}\n", cuerpo)
+        self.assertFalse(eventos.broker._suscriptores)
+
+    @override_settings(LIVE_UPDATES_CONEXIONES_WSGI=1, LIVE_UPDATES_POLL_SECONDS=0)
+    def test_sin_hilos_libres_responde_204(self):
+        self.client.force_login(self.usuario)
+        abierta = self.client.get(reverse('solicitud-eventos'))
+
+        self.assertEqual(self.client.get(reverse('solicitud-eventos')).status_code, 204)
+        abierta.close()
+        self.assertFalse(eventos.broker._suscriptores)
+
+
+@override_settings(CACHES=CACHE_LOCAL, DATABASE_REPLICAS=[])
+class DuplicadosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.departamento = Departamento.objects.create(nombre='Pruebas', prefijo='P')
+        cls.usuario = CustomUser.objects.create_user('duplicados', password='pw', department=cls.departamento)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+
+    def test_monto_no_finito_no_falla(self):
+        descripcion = 'Reactivo de grado analítico para cromatografía'
+        for monto in ('NaN', 'Infinity', '-Infinity', '1e400', 'sNaN', 'abc'):
+            with self.subTest(monto=monto):
+                response = self.client.get(reverse('solicitud-duplicados'), {'descripcion': descripcion, 'monto': monto})
+                self.assertEqual(response.status_code, 200)
+
+    def crear_solicitud(self, descripcion, monto=100):
+        return Solicitud.objects.create(
+            solicitante=self.usuario, departamento=self.departamento,
+            descripcion_pedido=descripcion, monto_comprometido_sbs=monto, tipo_compra='Bien',
+        )
+
+    def test_el_corte_de_candidatos_prioriza_las_bandas_coincidentes(self):
+        descripcion = 'Columna cromatográfica C18 de 250 mm para HPLC marca Agilent'
+        clave = min(duplicados.claves_lsh(duplicados.minhash(descripcion)))
+        # Creadas antes, comparten solo una banda: la de menor clave, que el índice recorre primero
+        for i in range(5):
+            senuelo = self.crear_solicitud(f'Guantes de nitrilo talla {i} caja de cien unidades')
+            CubetaLSH.objects.create(solicitud=senuelo, clave=clave)
+        original = self.crear_solicitud(descripcion)
+
+        with mock.patch.object(duplicados, 'MAX_CANDIDATOS', 3):
+            encontradas = duplicados.candidatos(descripcion, 100)
+
+        self.assertEqual([solicitud for solicitud, _ in encontradas], [original])
+
+
+class AdjuntosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        departamento = Departamento.objects.create(nombre='Pruebas', prefijo='P')
+        cls.usuario = CustomUser.objects.create_user('adjuntos', password='pw', department=departamento)
+        solicitud = Solicitud.objects.create(
+            solicitante=cls.usuario, departamento=departamento,
+            descripcion_pedido='reactivo', monto_comprometido_sbs=10, tipo_compra='Bien',
+        )
+        cls.seguimiento = SeguimientoCompra.objects.create(solicitud=solicitud)
+
+    def setUp(self):
+        raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, raiz)
+        configuracion = override_settings(ADJUNTOS_ROOT=raiz, ADJUNTOS_X_ACCEL_PREFIX='')
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+
+    def iniciar(self, tamano):
+        return adjuntos.iniciar_subida(self.seguimiento, self.usuario, 'sbs', 'oc.pdf', tamano)
+
+    def trozo(self, subida, datos, inicio, total, longitud=None):
+        fin = inicio + (len(datos) if longitud is None else longitud) - 1
+        return adjuntos.recibir_trozo(
+            subida.pk, self.usuario, f"bytes {inicio}-{fin}/{total}", fin - inicio + 1, io.BytesIO(datos),
+        )
+
+    def subir(self, contenido, tamano_trozo=4):
+        subida = self.iniciar(len(contenido))
+        for inicio in range(0, len(contenido), tamano_trozo):
+            _, adjunto = self.trozo(subida, contenido[inicio:inicio + tamano_trozo], inicio, len(contenido))
+        return adjunto
+
+    # --- Subida ---
+
+    def test_trozos_en_orden_crean_el_adjunto(self):
+        adjunto = self.subir(b'0123456789')
+
+        self.assertEqual(adjunto.contenido.sha256, hashlib.sha256(b'0123456789').hexdigest())
+        self.assertEqual(adjuntos.ruta_contenido(adjunto.contenido).read_bytes(), b'0123456789')
+        self.assertFalse(SubidaAdjunto.objects.exists())
+
+    def test_trozo_fuera_de_lugar_responde_409(self):
+        subida = self.iniciar(10)
+        self.trozo(subida, b'0123', 0, 10)
+
+        for inicio in (0, 8):
+            with self.subTest(inicio=inicio), self.assertRaises(adjuntos.SubidaInvalida) as error:
+                self.trozo(subida, b'89', inicio, 10)
+            self.assertEqual(error.exception.estado, 409)
+        self.assertEqual(SubidaAdjunto.objects.get().recibido, 4)
+
+    def test_trozo_simultaneo_responde_409(self):
+        subida = self.iniciar(10)
+        with open(adjuntos.ruta_parcial(subida), 'rb') as parcial:
+            fcntl.flock(parcial, fcntl.LOCK_EX)
+            with self.assertRaises(adjuntos.SubidaInvalida) as error:
+                self.trozo(subida, b'0123', 0, 10)
+        self.assertEqual(error.exception.estado, 409)
+        self.assertEqual(SubidaAdjunto.objects.get().recibido, 0)
+
+    def test_trozo_reintentado_descarta_lo_que_sobra(self):
+        subida = self.iniciar(10)
+        # El cliente se cortó a mitad del trozo 0-7: quedan 6 bytes escritos sin contar
+        with self.assertRaises(adjuntos.SubidaInvalida):
+            self.trozo(subida, b'abcdef', 0, 10, longitud=8)
+        self.assertEqual(SubidaAdjunto.objects.get().recibido, 0)
+
+        self.trozo(subida, b'0123', 0, 10)
+        self.assertEqual(adjuntos.ruta_parcial(subida).read_bytes(), b'0123')
+
+        _, adjunto = self.trozo(subida, b'456789', 4, 10)
+        self.assertEqual(adjuntos.ruta_contenido(adjunto.contenido).read_bytes(), b'0123456789')
+
+    def test_rango_que_no_corresponde_al_tamano(self):
+        subida = self.iniciar(10)
+        for inicio, total in ((0, 11), (8, 10)):
+            with self.subTest(total=total), self.assertRaises(adjuntos.SubidaInvalida) as error:
+                self.trozo(subida, b'0123', inicio, total)
+            self.assertEqual(error.exception.estado, 400)
+
+    # --- Deduplicación ---
+
+    def test_mismo_contenido_comparte_el_archivo(self):
+        primero = self.subir(b'mismo archivo')
+        segundo = self.subir(b'mismo archivo')
+
+        self.assertEqual(primero.contenido_id, segundo.contenido_id)
+        self.assertEqual(ContenidoAdjunto.objects.count(), 1)
+        self.assertEqual(Adjunto.objects.count(), 2)
+        self.assertEqual(list((adjuntos.raiz() / 'subidas').iterdir()), [])
+
+    def test_contenido_creado_a_la_vez_por_otra_subida(self):
+        contenido = b'subidas paralelas'
+        existente = ContenidoAdjunto.objects.create(
+            sha256=hashlib.sha256(contenido).hexdigest(), tamano=len(contenido), tipo_contenido='application/pdf',
+        )
+        # La otra subida creó la fila pero todavía no movió su archivo
+        with mock.patch.object(ContenidoAdjunto.objects, 'get_or_create', side_effect=IntegrityError):
+            adjunto = self.subir(contenido)
+
+        self.assertEqual(adjunto.contenido_id, existente.pk)
+        self.assertEqual(adjuntos.ruta_contenido(existente).read_bytes(), contenido)
+
+    # --- Descarga ---
+
+    def test_rango(self):
+        casos = {
+            'bytes=2-5': (2, 5),
+            'bytes=2-': (2, 9),
+            'bytes=2-100': (2, 9),
+            'bytes=-3': (7, 9),
+            'bytes=-20': (0, 9),
+            'bytes=-': None,
+            'bytes=0-1,4-5': None,
+            'items=0-1': None,
+        }
+        for cabecera, esperado in casos.items():
+            with self.subTest(cabecera=cabecera):
+                self.assertEqual(adjuntos._rango(cabecera, 10), esperado)
+        for cabecera in ('bytes=10-', 'bytes=5-3', 'bytes=-0'):
+            with self.subTest(cabecera=cabecera), self.assertRaises(ValueError):
+                adjuntos._rango(cabecera, 10)
+
+    def descargar(self, adjunto, **cabeceras):
+        response = adjuntos.respuesta_descarga(RequestFactory().get('/', headers=cabeceras), adjunto)
+        self.addCleanup(response.close)
+        return response
+
+    def test_descarga_parcial(self):
+        adjunto = self.subir(b'0123456789')
+        etag = f'"{adjunto.contenido.sha256}"'
+
+        response = self.descargar(adjunto, Range='bytes=-3', If_Range=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 7-9/10')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+
+        # Otra versión en el cliente: el archivo completo
+        response = self.descargar(adjunto, Range='bytes=-3', If_Range='"otro"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+        response = self.descargar(adjunto, Range='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+
+class CambiosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        departamento = Departamento.objects.create(nombre='Pruebas', prefijo='P')
+        usuario = CustomUser.objects.create_user('cambios', password='pw', department=departamento)
+        cls.solicitudes = [
+            Solicitud.objects.create(
+                solicitante=usuario, departamento=departamento,
+                descripcion_pedido=f'reactivo {i}', monto_comprometido_sbs=10, tipo_compra='Bien',
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        configuracion = override_settings(CAMBIOS_DIR=directorio, CAMBIOS_MARGEN_SEGUNDOS=0)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+
+    def leer(self, directorio, archivos):
+        filas = []
+        for nombre in archivos:
+            with gzip.open(directorio / nombre, 'rt', encoding='utf-8') as entrada:
+                filas += [json.loads(linea) for linea in entrada]
+        return filas
+
+    def test_retoma_la_corrida_tras_un_corte_a_mitad_de_tabla(self):
+        escribir = cambios._escribir
+
+        def cortar_en_el_segundo_bloque(ruta, columnas, filas, formato):
+            if ruta.name.startswith('solicitudes-00002'):
+                ruta.with_name(ruta.name + '.tmp').write_bytes(b'a medias')
+                raise RuntimeError('corte')
+            escribir(ruta, columnas, filas, formato)
+
+        with mock.patch.object(cambios, '_escribir', cortar_en_el_segundo_bloque):
+            with self.assertRaises(RuntimeError):
+                cambios.exportar_cambios(lote=2)
+
+        punto = PuntoControlCambios.objects.get()
+        self.assertTrue(punto.en_curso)
+        self.assertEqual(punto.avance['solicitudes']['archivos'], ['solicitudes-00001.jsonl.gz'])
+        self.assertEqual(punto.avance['solicitudes']['ultimo_pk'], self.solicitudes[1].pk)
+        directorio = cambios.directorio_corrida(punto)
+        primero = (directorio / 'solicitudes-00001.jsonl.gz').stat().st_mtime_ns
+
+        manifiesto = cambios.exportar_cambios(lote=2)
+
+        archivos = manifiesto['tablas']['solicitudes']['archivos']
+        self.assertEqual(archivos, [f'solicitudes-0000{n}.jsonl.gz' for n in (1, 2, 3)])
+        self.assertEqual(
+            [fila['id'] for fila in self.leer(directorio, archivos)],
+            [solicitud.pk for solicitud in self.solicitudes],
+        )
+        # El bloque completo no se reescribe; el temporal a medias se reemplaza
+        self.assertEqual((directorio / 'solicitudes-00001.jsonl.gz').stat().st_mtime_ns, primero)
+        self.assertEqual(list(directorio.glob('*.tmp')), [])
+        punto.refresh_from_db()
+        self.assertFalse(punto.en_curso)
+        self.assertEqual(punto.marca_agua, manifiesto['hasta'])
+
+
+class ArchivoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.departamento = Departamento.objects.create(nombre='Pruebas', prefijo='P')
+        cls.usuario = CustomUser.objects.create_user('archivo', password='pw', department=cls.departamento)
+
+    def crear(self, condicion, anios_atras):
+        solicitud = Solicitud.objects.create(
+            solicitante=self.usuario, departamento=self.departamento,
+            descripcion_pedido='reactivo', monto_comprometido_sbs=10, tipo_compra='Bien',
+        )
+        SeguimientoCompra.objects.create(solicitud=solicitud, condicion=condicion)
+        # La referencia queda con el año actual; solo se mueve la fecha de creación
+        Solicitud.objects.filter(pk=solicitud.pk).update(
+            fecha_creacion=timezone.now() - timedelta(days=366 * anios_atras),
+        )
+        return Solicitud.objects.get(pk=solicitud.pk)
+
+    def test_archivar(self):
+        cerradas = [self.crear('evaluado,finalizado', 3), self.crear('anulado', 3)]
+        abierta = self.crear('evaluado', 3)
+        reciente = self.crear('finalizado', 0)
+
+        self.assertEqual(archivo.archivar(anios_activos=2, lote=1), 2)
+
+        ids = [solicitud.pk for solicitud in cerradas]
+        self.assertEqual(set(Solicitud.objects.values_list('pk', flat=True)), {abierta.pk, reciente.pk})
+        archivadas = SolicitudArchivada.objects.order_by('pk')
+        self.assertEqual(
+            list(archivadas.values_list('pk', 'ref_departamento')),
+            [(solicitud.pk, solicitud.ref_departamento) for solicitud in cerradas],
+        )
+        self.assertEqual(
+            set(SeguimientoCompraArchivado.objects.values_list('solicitud_id', 'condicion')),
+            {(ids[0], 'evaluado,finalizado'), (ids[1], 'anulado')},
+        )
+        # Las lápidas del borrado quedan como archivadas, no como bajas
+        self.assertEqual(
+            set(RegistroBorrado.objects.values_list('tabla', 'motivo')),
+            {('solicitudes', RegistroBorrado.ARCHIVADA), ('seguimientos', RegistroBorrado.ARCHIVADA)},
+        )
+        self.assertEqual(RegistroBorrado.objects.filter(tabla='solicitudes').count(), 2)
+
+    def test_la_referencia_sigue_la_secuencia_de_las_archivadas(self):
+        referencias = [self.crear('finalizado', 3).ref_departamento for _ in range(3)]
+        anio = referencias[0].rsplit('-', 1)[1]
+        self.assertEqual(referencias, [f"P-0{n}-{anio}" for n in (1, 2, 3)])
+        self.assertEqual(archivo.archivar(anios_activos=2), 3)
+        self.assertFalse(Solicitud.objects.exists())
+
+        nueva = Solicitud.objects.create(
+            solicitante=self.usuario, departamento=self.departamento,
+            descripcion_pedido='reactivo', monto_comprometido_sbs=10, tipo_compra='Bien',
+        )
+        self.assertEqual(nueva.ref_departamento, f"P-04-{anio}")
@@ -0,0 +1,25 @@
+# solicitudes/textos.py
+"""
+Normalización de textos libres para agruparlos (p. ej. proveedores escritos
+de varias formas). Funciones puras: también las usan las migraciones.
+"""
+import re
+import unicodedata
+
+_NO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+
+
+def normalizar_nombre(texto):
+    """
+    Clave de comparación: sin acentos, en minúsculas y con la puntuación y
+    los espacios repetidos reducidos a un espacio.
+
+        'Suministros  Médicos, S.A.' -> 'suministros medicos s a'
+    """
+    if not texto:
+        return ''
+    sin_acentos = ''.join(
+        c for c in unicodedata.normalize('NFKD', texto)
+        if not unicodedata.combining(c)
+    )
+    return _NO_ALFANUMERICO.sub(' ', sin_acentos.casefold()).strip()
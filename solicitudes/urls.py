@@ -1,5 +1,6 @@
 # solicitudes/urls.py
 
+from django.conf import settings
 from django.urls import path
 from .views import (
     SolicitudListView,
@@ -9,19 +10,60 @@ from .views import (
     SolicitudDeleteView,
     SeguimientoUpdateView,
     SeguimientoReportView,
+    SeguimientoExportView,
+    ProveedorAutocompleteView,
+    SolicitudDuplicadosView,
+    AdjuntoSubidaCrearView,
+    AdjuntoSubidaView,
+    AdjuntoDescargaView,
+    ReportePredefinidoCrearView,
+    ReportePredefinidoView,
+    ReportePredefinidoActualizarView,
+    ReportePredefinidoExportView,
+    ReportePredefinidoDeleteView,
+    CalendarioView,
+    CalendarioFeedView,
+    SolicitudEventosView,
 )
 
+# Con ASGI (lraa_project/asgi.py) las vistas de lectura pesadas y la conexión
+# larga de actualizaciones en vivo son async
+if settings.ASYNC_VIEWS:
+    from .async_views import (
+        AsyncSolicitudListView as SolicitudListView,
+        AsyncSeguimientoReportView as SeguimientoReportView,
+        AsyncSeguimientoExportView as SeguimientoExportView,
+        SolicitudEventosView,
+    )
+
 urlpatterns = [
     # URLs para Solicitudes
     path('', SolicitudListView.as_view(), name='solicitud-list'),
         
     path('solicitud/<int:pk>/', SolicitudDetailView.as_view(), name='solicitud-detail'),
     path('solicitud/nueva/', SolicitudCreateView.as_view(), name='solicitud-create'),
+    path('solicitud/duplicados/', SolicitudDuplicadosView.as_view(), name='solicitud-duplicados'),
     path('solicitud/<int:pk>/editar/', SolicitudUpdateView.as_view(), name='solicitud-update'),
     path('solicitud/<int:pk>/eliminar/', SolicitudDeleteView.as_view(), name='solicitud-delete'),
     
     # URL para el Seguimiento
     path('solicitud/<int:solicitud_pk>/seguimiento/editar/', SeguimientoUpdateView.as_view(), name='seguimiento-update'),
+    # Adjuntos del seguimiento (subida por partes y descarga)
+    path('solicitud/<int:solicitud_pk>/adjuntos/', AdjuntoSubidaCrearView.as_view(), name='adjunto-subida-crear'),
+    path('adjuntos/subidas/<uuid:pk>/', AdjuntoSubidaView.as_view(), name='adjunto-subida'),
+    path('adjuntos/<int:pk>/', AdjuntoDescargaView.as_view(), name='adjunto-descarga'),
     # --- 2. AÑADE LA NUEVA URL PARA REPORTES ---
     path('reportes/', SeguimientoReportView.as_view(), name='seguimiento-report'),
+    path('reportes/exportar/', SeguimientoExportView.as_view(), name='seguimiento-export'),
+    # Reportes predefinidos (filtros guardados con resultado precalculado)
+    path('reportes/guardados/nuevo/', ReportePredefinidoCrearView.as_view(), name='reporte-predefinido-create'),
+    path('reportes/guardados/<int:pk>/', ReportePredefinidoView.as_view(), name='reporte-predefinido'),
+    path('reportes/guardados/<int:pk>/actualizar/', ReportePredefinidoActualizarView.as_view(), name='reporte-predefinido-refresh'),
+    path('reportes/guardados/<int:pk>/exportar/', ReportePredefinidoExportView.as_view(), name='reporte-predefinido-export'),
+    path('reportes/guardados/<int:pk>/eliminar/', ReportePredefinidoDeleteView.as_view(), name='reporte-predefinido-delete'),
+    # Calendario ICS de vencimientos y servicios (suscripción con token, sin sesión)
+    path('calendario/', CalendarioView.as_view(), name='calendario'),
+    path('calendario/<str:token>.ics', CalendarioFeedView.as_view(), name='calendario-feed'),
+    path('eventos/', SolicitudEventosView.as_view(), name='solicitud-eventos'),
+    path('proveedores/autocompletar/', ProveedorAutocompleteView.as_view(), name='proveedor-autocomplete'),
 ]
\ No newline at end of file
@@ -1,46 +1,49 @@
 # solicitudes/views.py
-from django.shortcuts import render, get_object_or_404
+from decimal import Decimal
+from urllib.parse import urlencode
+import queue
+import time
+
+from django.conf import settings
+from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
 from django.db.models import Sum
-
-from .models import Solicitud, SeguimientoCompra
-from .forms import SolicitudForm, SeguimientoCompraForm, SeguimientoFilterForm
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views import View
+
+from lraa_project.routers import alias_de_lectura
+
+from . import adjuntos, calendario, duplicados, eventos, predefinidos
+from .models import Adjunto, Proveedor, ReportePredefinido, Solicitud, SeguimientoCompra, SubidaAdjunto, TokenCalendario
+from .forms import (
+    DuplicadosForm, SolicitudForm, SeguimientoCompraForm, SeguimientoFilterForm, SeguimientoLectura,
+    formulario_seguimiento,
+)
+from .exports import NOMBRE_ARCHIVO_CSV, filas_csv
+from .impresion import nombre_usuario, partes_impresion, respuesta_impresion
+from .mixins import FragmentTemplateMixin, ReplicaReadMixin, SolicitudEditableMixin
+from .permisos import capacidades
+from .queries import pagina_por_cursor, solicitudes_listado, seguimientos_reporte
+from .textos import normalizar_nombre
 
 # --- Vistas para Solicitud ---
-from django.db.models import Q
 
-class SolicitudListView(LoginRequiredMixin, ListView):
+class SolicitudListView(LoginRequiredMixin, ReplicaReadMixin, FragmentTemplateMixin, ListView):
     model = Solicitud
     template_name = 'solicitudes/solicitud_list.html'
+    fragment_template_name = 'solicitudes/partials/solicitud_list_resultados.html'
     context_object_name = 'solicitudes'
     paginate_by = 10
     ordering = ['-id']
 
     def get_queryset(self):
-        user = self.request.user
-        # Optimizamos con select_related('seguimiento')
-        queryset = super().get_queryset().select_related('seguimiento')
-
-        # --- Lógica de Permisos ---
-        job_position_con_acceso_total = ['Asistente Administrativo']
-        departamentos_con_acceso_total = ['Dirección']
-
-        if user.job_position not in job_position_con_acceso_total and user.department not in departamentos_con_acceso_total:
-            queryset = queryset.filter(departamento=user.department)
-
-        # --- Lógica de Búsqueda ---
-        query = self.request.GET.get('q')
-        if query:
-            queryset = queryset.filter(
-                Q(descripcion_pedido__icontains=query) | 
-                Q(ref_departamento__icontains=query) |
-                # OPCIONAL: Permitir buscar también por número de SBS
-                Q(seguimiento__sbs_numero__icontains=query) 
-            )
-        
-        return queryset
+        return solicitudes_listado(self.request.user, self.request.GET.get('q'))
 
 class SolicitudCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView): # 🌟 IMPORTANTE: Añadir UserPassesTestMixin aquí para usar test_func 🌟
     model = Solicitud
@@ -66,77 +69,65 @@ class SolicitudCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         form.instance.solicitante = self.request.user
         return super().form_valid(form)
 
-class SolicitudUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class SolicitudUpdateView(LoginRequiredMixin, SolicitudEditableMixin, UpdateView):
     model = Solicitud
     form_class = SolicitudForm
     template_name = 'solicitudes/solicitud_form.html'
     success_url = reverse_lazy('solicitud-list')
 
-    def test_func(self):
-        solicitud = self.get_object()
-        user = self.request.user
-        
-        # Lista de cargos con super-permisos de edición
-        cargos_permitidos = ['Asistente Administrativo', 'Director Encargado']
-        
-        # ✅ CORRECCIÓN: Permitir la edición si es el creador O si tiene uno de los cargos autorizados
-        tiene_cargo_autorizado = user.job_position in cargos_permitidos
-        es_el_solicitante = solicitud.solicitante == user
-
-        return es_el_solicitante or tiene_cargo_autorizado
 
-
-class SolicitudDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class SolicitudDeleteView(LoginRequiredMixin, SolicitudEditableMixin, DeleteView):
     model = Solicitud
     template_name = 'solicitudes/solicitud_confirm_delete.html'
     success_url = reverse_lazy('solicitud-list')
 
-    def test_func(self):
-        solicitud = self.get_object()
-        user = self.request.user
-        
-        # Lista de cargos con super-permisos de eliminación
-        cargos_permitidos = ['Asistente Administrativo', 'Director Encargado']
-        
-        # ✅ CORRECCIÓN: Permitir la eliminación si es el creador O si tiene uno de los cargos autorizados
-        tiene_cargo_autorizado = user.job_position in cargos_permitidos
-        es_el_solicitante = solicitud.solicitante == user
-        
-        return es_el_solicitante or tiene_cargo_autorizado
-
-class SolicitudDetailView(LoginRequiredMixin, DetailView):
+class SolicitudDetailView(LoginRequiredMixin, ReplicaReadMixin, DetailView):
     model = Solicitud
     template_name = 'solicitudes/solicitud_detail.html'
+
+    def get_queryset(self):
+        return Solicitud.objects.visible_to(self.request.user)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        solicitud = self.get_object()
-        seguimiento, created = SeguimientoCompra.objects.get_or_create(solicitud=solicitud)
+        seguimiento, created = SeguimientoCompra.objects.get_or_create(solicitud=self.object)
         
-        # Le pasamos el request.user al formulario al instanciarlo
-        context['seguimiento_form'] = SeguimientoCompraForm(
-            instance=seguimiento, 
-            user=self.request.user
-        )
+        # Quien no puede editar (la mayoría) solo ve los valores, sin formulario
+        if capacidades(self.request.user).puede_editar_seguimiento:
+            context['seguimiento_form'] = SeguimientoCompraForm(instance=seguimiento)
+        else:
+            context['seguimiento_form'] = SeguimientoLectura(seguimiento)
         
         context['seguimiento'] = seguimiento
+        context.update(contexto_adjuntos(seguimiento))
         return context
 
+
+def contexto_adjuntos(seguimiento):
+    return {
+        'adjuntos_por_etapa': adjuntos.adjuntos_por_etapa(seguimiento),
+        'adjuntos_extensiones': ','.join(settings.ADJUNTOS_EXTENSIONES),
+    }
+
+
 class SeguimientoUpdateView(LoginRequiredMixin, UpdateView):
     model = SeguimientoCompra
-    form_class = SeguimientoCompraForm
     template_name = 'solicitudes/solicitud_detail.html' 
 
-    # 🌟 ESTO ES LO QUE FALTA Y CAUSA EL ERROR:
-    def get_form_kwargs(self):
-        kwargs = super().get_form_kwargs()
-        # Aquí le pasamos el usuario actual al formulario
-        kwargs['user'] = self.request.user 
-        return kwargs
+    def get_form_class(self):
+        # Editor o solo lectura según el cargo, ya preparados en forms.py
+        return formulario_seguimiento(self.request.user)
+
+    def post(self, request, *args, **kwargs):
+        # El formulario se muestra en solo lectura a quien no puede editarlo,
+        # pero el POST también se rechaza aquí
+        if not capacidades(request.user).puede_editar_seguimiento:
+            raise PermissionDenied
+        return super().post(request, *args, **kwargs)
 
     def get_object(self, queryset=None):
         solicitud_pk = self.kwargs.get('solicitud_pk')
-        solicitud = get_object_or_404(Solicitud, pk=solicitud_pk)
+        solicitud = get_object_or_404(Solicitud.objects.visible_to(self.request.user), pk=solicitud_pk)
         seguimiento, created = SeguimientoCompra.objects.get_or_create(solicitud=solicitud)
         return seguimiento
 
@@ -144,66 +135,58 @@ class SeguimientoUpdateView(LoginRequiredMixin, UpdateView):
         context = super().get_context_data(**kwargs)
         context['object'] = self.object.solicitud 
         context['seguimiento_form'] = context['form'] 
+        context.update(contexto_adjuntos(self.object))
         return context
 
     def get_success_url(self):
         return reverse_lazy('solicitud-detail', kwargs={'pk': self.object.solicitud.pk})
 
 
-class SeguimientoReportView(LoginRequiredMixin, ListView):
+class SeguimientoReportView(LoginRequiredMixin, ReplicaReadMixin, FragmentTemplateMixin, ListView):
     model = SeguimientoCompra
     template_name = 'solicitudes/seguimiento_report.html'
+    fragment_template_name = 'solicitudes/partials/seguimiento_report_resultados.html'
     context_object_name = 'seguimientos'
     paginate_by = 10
 
-    def get_paginate_by(self, queryset):
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('print'):
+            return self.imprimir(request)
+        return super().get(request, *args, **kwargs)
+
+    def imprimir(self, request):
         """
-        Si detecta el parámetro 'print' en la URL, desactiva la paginación
-        devolviendo None. De lo contrario, usa el valor por defecto (10).
+        ?print=1: todo el reporte, sin paginación, enviado por partes y
+        comprimido (ver impresion.py).
         """
-        if self.request.GET.get('print'):
-            return None
-        return self.paginate_by
+        queryset = self.get_queryset()
+        # El cuerpo se genera después de que dispatch sale de leer_de_replica()
+        queryset = queryset.using(alias_de_lectura(queryset.model))
+        return respuesta_impresion(request, partes_impresion(queryset, nombre_usuario(request.user)))
 
     def get_queryset(self):
         """
         Este método aplica los permisos de departamento y los filtros de búsqueda.
         """
-        user = self.request.user
-        queryset = SeguimientoCompra.objects.select_related('solicitud').all()
-
-        cargos_con_acceso_total = ['Asistente Administrativo', 'Director Encargado']
-        if user.job_position not in cargos_con_acceso_total:
-            queryset = queryset.filter(solicitud__departamento=user.department)
-
         self.filter_form = SeguimientoFilterForm(self.request.GET)
-        if self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
+        return seguimientos_reporte(self.request.user, self.filter_form)
 
-            if cleaned_data.get('sbs_numero'):
-                queryset = queryset.filter(sbs_numero__icontains=cleaned_data['sbs_numero'])
-        
-            if cleaned_data.get('oc_numero'):
-                queryset = queryset.filter(oc_numero__icontains=cleaned_data['oc_numero'])
-
-            if cleaned_data.get('condicion'):
-                queryset = queryset.filter(condicion=cleaned_data['condicion'])
-            if cleaned_data.get('status_final_compra'):
-                queryset = queryset.filter(status_final_compra=cleaned_data['status_final_compra'])
-            if cleaned_data.get('tipo_compra'):
-                queryset = queryset.filter(solicitud__tipo_compra=cleaned_data['tipo_compra'])
-            if cleaned_data.get('proveedor'):
-                queryset = queryset.filter(proveedor__icontains=cleaned_data['proveedor'])
-            
-            # Lógica de filtro por año
-            if cleaned_data.get('anio'):
-                queryset = queryset.filter(solicitud__fecha_creacion__year=cleaned_data['anio'])
-            
-            # Filtro por referencia
-            if cleaned_data.get('ref_departamento'):
-                queryset = queryset.filter(solicitud__ref_departamento__icontains=cleaned_data['ref_departamento'])
-        
-        return queryset.order_by('-solicitud__fecha_creacion')
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Con ?despues=<id> o ?antes=<id> (enlaces Siguiente/Anterior) las filas
+        salen de pagina_por_cursor en lugar de OFFSET; ?page= sigue dando el
+        número de página que se muestra.
+        """
+        paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+        orden = self.filter_form.cleaned_data.get('orden') if self.filter_form.is_valid() else ''
+        filas = pagina_por_cursor(
+            queryset, orden, self.request.GET.get('despues'), self.request.GET.get('antes'), page_size,
+        )
+        if filas is None:
+            # Lista para que la plantilla tome el id de la primera y la última fila sin otra consulta
+            filas = list(page.object_list)
+        page.object_list = filas
+        return paginator, page, filas, is_paginated
 
     def get_context_data(self, **kwargs):
         """
@@ -211,6 +194,7 @@ class SeguimientoReportView(LoginRequiredMixin, ListView):
         """
         context = super().get_context_data(**kwargs)
         context['filter_form'] = self.filter_form
+        context['predefinidos'] = ReportePredefinido.objects.disponibles_para(self.request.user)
         
         # --- 👇 AJUSTE PARA EL TOTAL 👇 ---
         # Calculamos el total sobre el queryset completo filtrado (get_queryset),
@@ -220,4 +204,332 @@ class SeguimientoReportView(LoginRequiredMixin, ListView):
         context['total_monto_oc'] = total_monto_oc
         # --- 👆 FIN DEL AJUSTE ---
 
-        return context
\ No newline at end of file
+        return context
+
+
+class SeguimientoExportView(LoginRequiredMixin, View):
+    """
+    Exporta a CSV el reporte con los mismos permisos y filtros que
+    SeguimientoReportView. Se envía por partes con .iterator().
+    """
+
+    def get(self, request, *args, **kwargs):
+        queryset = seguimientos_reporte(request.user, SeguimientoFilterForm(request.GET))
+        queryset = queryset.using(alias_de_lectura(queryset.model))
+        response = StreamingHttpResponse(filas_csv(queryset), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{NOMBRE_ARCHIVO_CSV}"'
+        return response
+
+
+class ReportePredefinidoCrearView(LoginRequiredMixin, View):
+    """
+    Guarda los filtros del reporte que se está viendo (campos ocultos del
+    formulario, como "Exportar en segundo plano") como reporte predefinido y
+    calcula su instantánea.
+    """
+
+    def post(self, request, *args, **kwargs):
+        nombre = request.POST.get('nombre', '').strip()
+        parametros = predefinidos.parametros_de(request.POST)
+        if not nombre:
+            messages.error(request, "Indique un nombre para el reporte.")
+            return redirect(f"{reverse('seguimiento-report')}?{urlencode(parametros)}")
+
+        reporte = ReportePredefinido.objects.create(
+            nombre=nombre[:100],
+            parametros=parametros,
+            propietario=request.user,
+            departamento_id=request.user.department_id if request.POST.get('compartir') else None,
+        )
+        predefinidos.construir(reporte, capacidades(request.user).departamento_visible)
+        messages.success(request, f"Se guardó el reporte «{reporte.nombre}».")
+        return redirect('reporte-predefinido', pk=reporte.pk)
+
+
+class ReportePredefinidoView(LoginRequiredMixin, View):
+    """
+    Muestra la instantánea de un reporte predefinido: filas, totales y
+    exportación precalculados. Cada página es un rango de posiciones del
+    índice (instantanea, posicion), sin COUNT ni OFFSET.
+    """
+    template_name = 'solicitudes/reporte_predefinido.html'
+    paginate_by = 10
+
+    def get(self, request, pk, *args, **kwargs):
+        reporte = get_object_or_404(ReportePredefinido.objects.disponibles_para(request.user), pk=pk)
+        instantanea = predefinidos.instantanea_para(reporte, request.user)
+        paginator = Paginator(range(instantanea.total_filas), self.paginate_by)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        inicio = (page_obj.number - 1) * self.paginate_by
+        filas = instantanea.filas.filter(
+            posicion__gte=inicio, posicion__lt=inicio + self.paginate_by,
+        ).order_by('posicion')
+        return render(request, self.template_name, {
+            'reporte': reporte,
+            'instantanea': instantanea,
+            'filas': filas,
+            'page_obj': page_obj,
+            'is_paginated': page_obj.has_other_pages(),
+            'puede_borrar': reporte.propietario_id == request.user.pk,
+            'url_reporte': f"{reverse('seguimiento-report')}?{urlencode(reporte.parametros)}",
+        })
+
+
+class ReportePredefinidoActualizarView(LoginRequiredMixin, View):
+    """Botón "Actualizar ahora": recalcula la instantánea del usuario sin esperar al refresco."""
+
+    def post(self, request, pk, *args, **kwargs):
+        reporte = get_object_or_404(ReportePredefinido.objects.disponibles_para(request.user), pk=pk)
+        predefinidos.construir(reporte, capacidades(request.user).departamento_visible)
+        messages.success(request, "Reporte actualizado.")
+        return redirect('reporte-predefinido', pk=reporte.pk)
+
+
+class ReportePredefinidoExportView(LoginRequiredMixin, View):
+    """Descarga el CSV que se generó junto con la instantánea."""
+
+    def get(self, request, pk, *args, **kwargs):
+        reporte = get_object_or_404(ReportePredefinido.objects.disponibles_para(request.user), pk=pk)
+        instantanea = predefinidos.instantanea_para(reporte, request.user)
+        if not instantanea.archivo:
+            raise Http404("La instantánea no tiene exportación.")
+        return FileResponse(instantanea.archivo.open('rb'), as_attachment=True, filename=NOMBRE_ARCHIVO_CSV)
+
+
+class ReportePredefinidoDeleteView(LoginRequiredMixin, View):
+    """Solo el propietario borra el reporte (también si está compartido)."""
+
+    def post(self, request, pk, *args, **kwargs):
+        reporte = get_object_or_404(ReportePredefinido, pk=pk, propietario=request.user)
+        predefinidos.eliminar(reporte)
+        messages.success(request, f"Se eliminó el reporte «{reporte.nombre}».")
+        return redirect('seguimiento-report')
+
+
+class ProveedorAutocompleteView(LoginRequiredMixin, ReplicaReadMixin, View):
+    """
+    Sugerencias de proveedores para los campos de texto (?q=...). Busca por
+    prefijo de la clave normalizada, que resuelve el índice único de
+    Proveedor.clave, y devuelve pocas filas.
+    """
+    limite = 10
+    min_caracteres = 2
+
+    def get(self, request, *args, **kwargs):
+        clave = normalizar_nombre(request.GET.get('q', ''))
+        resultados = []
+        if len(clave) >= self.min_caracteres:
+            # istartswith -> LIKE 'clave%' con la collation de la columna: usa el
+            # índice en MariaDB (startswith usaría LIKE BINARY). La clave ya está
+            # en minúsculas, así que el resultado es el mismo.
+            resultados = list(
+                Proveedor.objects.filter(clave__istartswith=clave)
+                .order_by('clave')
+                .values('id', 'nombre')[:self.limite]
+            )
+        response = JsonResponse({'resultados': resultados})
+        patch_cache_control(response, private=True, max_age=300)
+        return response
+
+
+class SolicitudDuplicadosView(LoginRequiredMixin, ReplicaReadMixin, View):
+    """
+    Aviso de posibles duplicados mientras se escribe una solicitud
+    (?descripcion=...&monto=...&excluir=<pk al editar>). Lo pide
+    duplicados.js y devuelve el fragmento HTML. La búsqueda usa el índice LSH
+    (ver duplicados.py), no recorre las solicitudes.
+
+    Abarca todos los departamentos, que es el caso que interesa; de las que
+    el usuario no puede ver solo se muestra la referencia y el departamento.
+    """
+    min_caracteres = 20
+    max_resultados = 5
+
+    def get(self, request, *args, **kwargs):
+        form = DuplicadosForm(request.GET)
+        form.is_valid()
+        # Un parámetro inválido se ignora (el monto cuenta como 0), sin error
+        descripcion = form.cleaned_data.get('descripcion', '')
+        monto = form.cleaned_data.get('monto') or Decimal(0)
+        resultados = []
+        if len(descripcion) >= self.min_caracteres:
+            caps = capacidades(request.user)
+            encontrados = duplicados.candidatos(descripcion, monto, excluir=form.cleaned_data.get('excluir'))
+            resultados = [
+                {'solicitud': solicitud, 'similitud': valor, 'visible': caps.puede_ver(solicitud)}
+                for solicitud, valor in encontrados[:self.max_resultados]
+            ]
+        response = render(request, 'solicitudes/partials/solicitud_duplicados.html', {'duplicados': resultados})
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+# --- Adjuntos (ver adjuntos.py) ---
+
+def _estado_subida(subida):
+    return {
+        'id': str(subida.pk),
+        'url': reverse('adjunto-subida', args=[subida.pk]),
+        'recibido': subida.recibido,
+        'tamano': subida.tamano,
+        'trozo_max': settings.ADJUNTOS_TROZO_MAX_BYTES,
+    }
+
+
+class AdjuntoSubidaCrearView(LoginRequiredMixin, View):
+    """Inicia la subida por partes de un adjunto (POST etapa, nombre, tamano)."""
+
+    def post(self, request, solicitud_pk, *args, **kwargs):
+        if not capacidades(request.user).puede_editar_seguimiento:
+            raise PermissionDenied
+        solicitud = get_object_or_404(Solicitud.objects.visible_to(request.user), pk=solicitud_pk)
+        seguimiento, _ = SeguimientoCompra.objects.get_or_create(solicitud=solicitud)
+        try:
+            subida = adjuntos.iniciar_subida(
+                seguimiento, request.user, request.POST.get('etapa'), request.POST.get('nombre'), request.POST.get('tamano'),
+            )
+        except adjuntos.SubidaInvalida as e:
+            return JsonResponse({'error': str(e)}, status=e.estado)
+        return JsonResponse(_estado_subida(subida), status=201)
+
+
+class AdjuntoSubidaView(LoginRequiredMixin, View):
+    """
+    GET: cuánto se recibió (para retomar). PUT: un trozo con Content-Range.
+    El cuerpo se lee por bloques desde la petición (no se usa request.body).
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        subida = get_object_or_404(SubidaAdjunto, pk=pk, subido_por=request.user)
+        return JsonResponse(_estado_subida(subida))
+
+    def put(self, request, pk, *args, **kwargs):
+        try:
+            longitud = int(request.META.get('CONTENT_LENGTH') or 0)
+            subida, adjunto = adjuntos.recibir_trozo(pk, request.user, request.headers.get('Content-Range'), longitud, request)
+        except SubidaAdjunto.DoesNotExist:
+            raise Http404
+        except (adjuntos.SubidaInvalida, ValueError) as e:
+            estado = getattr(e, 'estado', 400)
+            recibido = SubidaAdjunto.objects.filter(pk=pk).values_list('recibido', flat=True).first()
+            return JsonResponse({'error': str(e), 'recibido': recibido}, status=estado)
+
+        if adjunto is None:
+            return JsonResponse(_estado_subida(subida))
+        # La subida terminada ya no existe; se devuelve el adjunto creado
+        return JsonResponse({
+            'id': str(pk),
+            'recibido': subida.recibido,
+            'tamano': subida.tamano,
+            'adjunto': {
+                'id': adjunto.pk,
+                'nombre': adjunto.nombre,
+                'url': reverse('adjunto-descarga', args=[adjunto.pk]),
+            },
+        }, status=201)
+
+
+class AdjuntoDescargaView(LoginRequiredMixin, View):
+    """
+    Descarga un adjunto si el usuario puede ver la solicitud (también
+    archivada). El archivo lo envía nginx (X-Accel-Redirect) o gunicorn con
+    sendfile(); ver adjuntos.respuesta_descarga.
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        adjunto = get_object_or_404(Adjunto.objects.select_related('contenido'), pk=pk)
+        solicitud = adjuntos.solicitud_de(adjunto)
+        if solicitud is None or not capacidades(request.user).puede_ver(solicitud):
+            raise Http404
+        return adjuntos.respuesta_descarga(request, adjunto)
+
+
+# --- Calendario ICS (ver calendario.py) ---
+
+class CalendarioView(LoginRequiredMixin, View):
+    """Enlace de suscripción al calendario del usuario; el POST genera uno nuevo."""
+    template_name = 'solicitudes/calendario.html'
+
+    def get(self, request, *args, **kwargs):
+        token = TokenCalendario.objects.filter(usuario=request.user).values_list('token', flat=True).first()
+        url = request.build_absolute_uri(reverse('calendario-feed', args=[token])) if token else None
+        return render(request, self.template_name, {
+            'url_calendario': url,
+            'dias_atras': settings.CALENDARIO_DIAS_ATRAS,
+            'dias_adelante': settings.CALENDARIO_DIAS_ADELANTE,
+        })
+
+    def post(self, request, *args, **kwargs):
+        existia = TokenCalendario.objects.filter(usuario=request.user).exists()
+        calendario.nuevo_token(request.user)
+        if existia:
+            messages.success(request, "Se generó un enlace nuevo; el anterior ya no funciona.")
+        else:
+            messages.success(request, "Se generó el enlace del calendario.")
+        return redirect('calendario')
+
+
+class CalendarioFeedView(View):
+    """
+    El calendario ICS, sin sesión: el token identifica al usuario y su
+    alcance de permisos. Responde 304 si el cliente ya tiene esta versión.
+    """
+
+    def get(self, request, token, *args, **kwargs):
+        user = calendario.usuario_del_token(token)
+        if user is None:
+            raise Http404
+        entrada = calendario.calendario(
+            capacidades(user).departamento_visible,
+            lambda pk: request.build_absolute_uri(reverse('solicitud-detail', args=[pk])),
+        )
+        response = HttpResponse(entrada['ics'], content_type='text/calendar; charset=utf-8')
+        response['ETag'] = entrada['etag']
+        # El enlace es personal: que no lo guarden cachés compartidas
+        patch_cache_control(response, private=True, no_cache=True)
+        return get_conditional_response(request, etag=entrada['etag'], response=response)
+
+
+class SolicitudEventosView(LoginRequiredMixin, View):
+    """
+    Server-sent events de las actualizaciones en vivo con WSGI (con ASGI se
+    usa la versión de async_views.py; ver eventos.py). La conexión ocupa un
+    hilo de gunicorn y espera en una cola del broker. Si el proceso ya tiene
+    LIVE_UPDATES_CONEXIONES_WSGI abiertas responde 204, y el navegador no
+    reintenta: la página sigue funcionando sin actualizaciones en vivo.
+    """
+    intervalo_ping = 20
+
+    def get(self, request, *args, **kwargs):
+        suscriptor = eventos.broker.suscribir_hilo(settings.LIVE_UPDATES_CONEXIONES_WSGI)
+        if suscriptor is None:
+            return HttpResponse(status=204)
+        departamento = capacidades(request.user).departamento_visible
+        flujo = self._flujo(suscriptor, departamento, eventos.ultimo_recibido(request))
+        return eventos.respuesta_sse(eventos.FlujoHilo(suscriptor, flujo))
+
+    def _flujo(self, suscriptor, departamento, desde):
+        # Suscrito antes de leer los pendientes, para no perder nada entre medio
+        _, cola = suscriptor
+        try:
+            yield "retry: 5000\n\n"
+            while desde:
+                bloque = eventos.pendientes(desde, departamento)
+                for evento in bloque:
+                    desde = evento.pk
+                    yield eventos.mensaje_sse(evento.como_mensaje())
+                if len(bloque) < eventos.BLOQUE_PENDIENTES:
+                    break
+
+            fin = time.monotonic() + settings.LIVE_UPDATES_STREAM_SECONDS
+            while (restante := fin - time.monotonic()) > 0:
+                try:
+                    mensaje = cola.get(timeout=min(self.intervalo_ping, restante))
+                except queue.Empty:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield ": ping\n\n"
+                    continue
+                if eventos.corresponde(mensaje, desde, departamento):
+                    yield eventos.mensaje_sse(mensaje)
+        finally:
+            eventos.broker.desuscribir(suscriptor)